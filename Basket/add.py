@@ -1,10 +1,17 @@
 from data import basket
+from shards import InsufficientQuantity
 
 def add_fruit():
     fruit = input("Enter fruit name to add: ").strip().capitalize()
-    qty = int(input(f"Enter quantity of {fruit}: "))
-    if fruit in basket:
-        basket[fruit] += qty
-    else:
-        basket[fruit] = qty
+    try:
+        qty = int(input(f"Enter quantity of {fruit}: "))
+    except ValueError:
+        print("Quantity must be a number.")
+        return
+    try:
+        basket.add(fruit, qty)
+    except InsufficientQuantity as e:
+        # the in-memory basket never goes below 0
+        print(e)
+        return
     print(f"{qty} {fruit}(s) added to basket.")
\ No newline at end of file
@@ -1 +1,26 @@
-basket = {}
\ No newline at end of file
+import os
+
+from eventlog import BasketLog
+from shards import ShardedBaskets
+from store import BasketStore
+
+
+def _crud():
+    # the basket lives in Postgres when the app's DB_* variables are set, in memory otherwise
+    if not os.getenv('DB_HOST'):
+        return None
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    from app.crud import create_crud_manager_from_env
+    return create_crud_manager_from_env()
+
+
+# BASKET_LOG names a directory for the event-sourced basket: every change is
+# logged durably, and compaction keeps only the latest snapshot and the log after it
+if os.getenv('BASKET_LOG'):
+    basket = BasketLog(os.getenv('BASKET_LOG'))
+elif os.getenv('DB_HOST'):
+    basket = BasketStore(_crud(), os.getenv('BASKET_ID', 'default'))
+else:
+    # in memory, one user's basket of a store that can hold many
+    basket = ShardedBaskets().basket(os.getenv('BASKET_ID', 'default'))
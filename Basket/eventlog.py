@@ -0,0 +1,427 @@
+# the basket as an append-only log of changes, with snapshots to restart from
+#
+#     basket = BasketLog('basket-log')    # recovers whatever the directory holds
+#     basket.add('Apple', 3)              # returns once the change is on disk
+#     basket['Pear'] = 2; del basket['Pear']
+#
+# files in the directory:
+# - log-<lsn>.bin: changes from event number <lsn> on, one fixed 15 byte
+#   header (crc32, op, name length, quantity) plus the fruit name each
+# - snapshot-<lsn>.bin: the whole basket before event <lsn>, as an array of
+#   quantities, an array of name offsets and one blob of names
+#
+# group commit: a change is encoded into a shared buffer and its writer waits;
+# one background thread writes everything buffered so far and fsyncs once for
+# all of it, so concurrent writers share fsyncs instead of queueing for their own.
+# When a segment passes `segment_bytes` the next one is started and the basket at
+# that point goes to a background compactor, which writes it as a snapshot and
+# deletes the segments and snapshots it replaces. Recovery loads the newest
+# snapshot and replays only the log after it, so restart time depends on the
+# segment size, not on how much history there has been.
+#
+#     python eventlog.py      # group commit throughput and recovery times
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from collections.abc import MutableMapping
+
+ADD, SET, DELETE = 1, 2, 3
+_RECORD = struct.Struct('<IBHq')            # crc32 of the rest, op, name length, quantity
+_SNAPSHOT = struct.Struct('<4sqI')          # magic, lsn, fruits
+_MAGIC = b'BSK1'
+_NAME_MAX = 0xFFFF
+_QTY_MIN, _QTY_MAX = -2**63, 2**63 - 1
+
+
+class BasketLog(MutableMapping):
+
+    def __init__(self, directory, segment_bytes=1 << 20):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.commits = 0                    # fsyncs, fewer than events under concurrent writes
+        os.makedirs(directory, exist_ok=True)
+        self._items = {}
+        self._lsn = 0                       # number of the next event
+        self.recovered_events = self._recover()
+
+        self._lock = threading.Lock()
+        self._has_work = threading.Condition(self._lock)
+        self._committed = threading.Condition(self._lock)
+        self._durable_lsn = self._lsn
+        self._chunks = [bytearray()]        # buffered events, one chunk per segment
+        self._rotations = []                # (lsn, basket) where each later chunk starts
+        self._segment_size = 0
+        self._segment_start = self._lsn
+        self._file = None
+        self._error = None
+        self._closing = False
+        self._snapshots = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name='basket-log-writer', daemon=True)
+        self._compactor = threading.Thread(target=self._compact_loop, name='basket-log-compactor', daemon=True)
+        self._writer.start()
+        self._compactor.start()
+
+    # mapping API, the same as BasketStore
+
+    def __getitem__(self, fruit):
+        return self._items[fruit]
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._items)
+
+    # every change is encoded (and so checked) before the lock, and the basket is
+    # only changed once nothing can fail, so a refused change leaves no trace
+
+    def __setitem__(self, fruit, qty):
+        record = _encode(SET, fruit, qty)
+        with self._lock:
+            self._check_open()
+            self._items[fruit] = qty
+            lsn = self._append(record)
+        self._wait(lsn)
+
+    def __delitem__(self, fruit):
+        record = _encode(DELETE, fruit, 0)
+        with self._lock:
+            self._check_open()
+            del self._items[fruit]
+            lsn = self._append(record)
+        self._wait(lsn)
+
+    def replace(self, fruit, qty):
+        # set a fruit already in the basket; False if it is not there
+        record = _encode(SET, fruit, qty)
+        with self._lock:
+            self._check_open()
+            if fruit not in self._items:
+                return False
+            self._items[fruit] = qty
+            lsn = self._append(record)
+        self._wait(lsn)
+        return True
+
+    def discard(self, fruit):
+        # remove a fruit if it is there; returns whether it was
+        record = _encode(DELETE, fruit, 0)
+        with self._lock:
+            self._check_open()
+            if fruit not in self._items:
+                return False
+            del self._items[fruit]
+            lsn = self._append(record)
+        self._wait(lsn)
+        return True
+
+    def add(self, fruit, qty):
+        record = _encode(ADD, fruit, qty)
+        with self._lock:
+            self._check_open()
+            total = self._items.get(fruit, 0) + qty
+            if not _QTY_MIN <= total <= _QTY_MAX:
+                raise ValueError(f'{fruit} would reach {total}, outside a 64 bit quantity')
+            self._items[fruit] = total
+            lsn = self._append(record)
+        self._wait(lsn)
+        return total
+
+    # writing
+
+    def _check_open(self):
+        # a failed writer has stopped, nothing would reach the log any more
+        if self._error is not None:
+            raise self._error
+        if self._closing:
+            raise ValueError('basket log is closed')
+
+    def _append(self, record):
+        # called with the lock held, after the change is applied to _items
+        self._chunks[-1] += record
+        self._segment_size += len(record)
+        lsn = self._lsn
+        self._lsn += 1
+        if self._segment_size >= self.segment_bytes:
+            self._rotations.append((self._lsn, dict(self._items)))
+            self._chunks.append(bytearray())
+            self._segment_size = 0
+        self._has_work.notify()
+        return lsn
+
+    def _wait(self, lsn):
+        with self._lock:
+            while self._durable_lsn <= lsn and self._error is None:
+                self._committed.wait()
+            if self._error is not None:
+                raise self._error
+
+    def _write_loop(self):
+        while True:
+            with self._lock:
+                while self._lsn == self._durable_lsn and not self._rotations and not self._closing:
+                    self._has_work.wait()
+                if self._lsn == self._durable_lsn and not self._rotations:
+                    return
+                chunks, rotations, target = self._chunks, self._rotations, self._lsn
+                self._chunks, self._rotations = [bytearray()], []
+            try:
+                for n, chunk in enumerate(chunks):
+                    if n:
+                        self._start_segment(rotations[n - 1][0])
+                    if chunk:
+                        self._segment().write(chunk)
+                if self._file is not None:
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+            except OSError as e:
+                with self._lock:
+                    self._error = e
+                    self._committed.notify_all()
+                return
+            with self._lock:
+                self._durable_lsn = target
+                self.commits += 1
+                self._committed.notify_all()
+            for rotation in rotations:
+                self._snapshots.put(rotation)
+
+    def _segment(self):
+        if self._file is None:
+            self._file = open(self._path('log', self._segment_start), 'ab')
+            _fsync_directory(self.directory)
+        return self._file
+
+    def _start_segment(self, lsn):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+        self._segment_start = lsn
+
+    # snapshots and compaction
+
+    def _compact_loop(self):
+        while True:
+            job = self._snapshots.get()
+            if job is None:
+                return
+            lsn, items = job
+            self._write_snapshot(lsn, items)
+            for kind, start in self._files():
+                # segments before the snapshot only hold events it already contains
+                if start < lsn:
+                    os.remove(self._path(kind, start))
+
+    def _write_snapshot(self, lsn, items):
+        names = [fruit.encode() for fruit in items]
+        ends = array('I')
+        end = 0
+        for name in names:
+            end += len(name)
+            ends.append(end)
+        body = (_SNAPSHOT.pack(_MAGIC, lsn, len(items)) + _little(array('q', items.values()))
+                + _little(ends) + b''.join(names))
+        path = self._path('snapshot', lsn)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(body + struct.pack('<I', zlib.crc32(body)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
+        _fsync_directory(self.directory)
+
+    def compact(self):
+        # snapshot the basket as of now and drop the log behind it; returns the snapshot's lsn
+        with self._lock:
+            self._check_open()
+            lsn, items = self._lsn, dict(self._items)
+            self._rotations.append((lsn, items))
+            self._chunks.append(bytearray())
+            self._segment_size = 0
+            self._has_work.notify()
+        self._wait(lsn - 1)
+        return lsn
+
+    # recovery
+
+    def _files(self):
+        # [(kind, lsn)] of the log segments and snapshots, oldest first
+        found = []
+        for name in os.listdir(self.directory):
+            kind, _, rest = name.partition('-')
+            if kind in ('log', 'snapshot') and rest.endswith('.bin'):
+                found.append((kind, int(rest[:-4])))
+        return sorted(found, key=lambda item: item[1])
+
+    def _path(self, kind, lsn):
+        return os.path.join(self.directory, f'{kind}-{lsn:012d}.bin')
+
+    def _recover(self):
+        files = self._files()
+        for kind, lsn in reversed(files):
+            if kind == 'snapshot':
+                self._items = _read_snapshot(self._path(kind, lsn))
+                self._lsn = lsn
+                break
+        replayed = 0
+        for kind, start in files:
+            if kind != 'log':
+                continue
+            path = self._path(kind, start)
+            with open(path, 'rb') as f:
+                data = f.read()
+            lsn, offset = start, 0
+            for op, fruit, qty, offset in _decode(data):
+                if lsn >= self._lsn:
+                    _apply(self._items, op, fruit, qty)
+                    replayed += 1
+                lsn += 1
+            if offset < len(data):
+                # a write torn by a crash: the events before it are all that was committed
+                os.truncate(path, offset)
+            self._lsn = max(self._lsn, lsn)
+        return replayed
+
+    def close(self, snapshot=True):
+        # with snapshot, the next start loads one snapshot and replays nothing;
+        # after a write error the threads are still stopped and the error raised
+        try:
+            if snapshot and not self._closing:
+                self.compact()
+        finally:
+            with self._lock:
+                self._closing = True
+                self._has_work.notify()
+            self._writer.join()
+            self._snapshots.put(None)
+            self._compactor.join()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _encode(op, fruit, qty):
+    # ValueError for what a record cannot hold
+    name = fruit.encode()
+    if len(name) > _NAME_MAX:
+        raise ValueError(f'fruit name of {len(name)} bytes, at most {_NAME_MAX} fit in the log')
+    if not _QTY_MIN <= qty <= _QTY_MAX:
+        raise ValueError(f'quantity {qty} does not fit in 64 bits')
+    rest = _RECORD.pack(0, op, len(name), qty)[4:] + name
+    return struct.pack('<I', zlib.crc32(rest)) + rest
+
+
+def _decode(data):
+    # (op, fruit, qty, end offset) per record, stopping at the first incomplete or corrupt one
+    offset, size = 0, _RECORD.size
+    while offset + size <= len(data):
+        crc, op, length, qty = _RECORD.unpack_from(data, offset)
+        end = offset + size + length
+        if end > len(data) or zlib.crc32(data[offset + 4:end]) != crc:
+            return
+        yield op, data[offset + size:end].decode(), qty, end
+        offset = end
+
+
+def _apply(items, op, fruit, qty):
+    if op == ADD:
+        items[fruit] = items.get(fruit, 0) + qty
+    elif op == SET:
+        items[fruit] = qty
+    else:
+        items.pop(fruit, None)
+
+
+def _read_snapshot(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    body, (crc,) = data[:-4], struct.unpack('<I', data[-4:])
+    magic, lsn, count = _SNAPSHOT.unpack_from(body)
+    if magic != _MAGIC or zlib.crc32(body) != crc:
+        raise ValueError(f'corrupt basket snapshot {path}')
+    offset = _SNAPSHOT.size
+    quantities = _native('q', body[offset:offset + 8 * count])
+    ends = _native('I', body[offset + 8 * count:offset + 12 * count])
+    names = body[offset + 12 * count:]
+    starts = [0] + list(ends[:-1])
+    return {names[start:end].decode(): qty for start, end, qty in zip(starts, ends, quantities)}
+
+
+def _little(values):
+    # snapshot arrays are little-endian on disk, like the log records
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _native(typecode, data):
+    values = array(typecode, data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def _fsync_directory(directory):
+    # makes a file's creation or rename durable, where the platform allows it
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+if __name__ == '__main__':
+    import random
+    import shutil
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    FRUITS = ['Apple', 'Banana', 'Cherry', 'Mango', 'Orange', 'Pear', 'Plum', 'Kiwi']
+    directory = tempfile.mkdtemp()
+
+    for threads in (1, 8, 64):
+        path = os.path.join(directory, f'group-{threads}')
+        log = BasketLog(path)
+        events = 4000
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(lambda n: log.add(FRUITS[n % len(FRUITS)], 1), range(events)))
+        elapsed = time.perf_counter() - start
+        print(f"{threads:>2} writer thread(s): {events / elapsed:>8,.0f} durable adds/s, "
+              f"{events / log.commits:5.1f} adds per fsync")
+        log.close()
+
+    # history keeps growing, but restarts only replay the tail after the latest snapshot
+    path = os.path.join(directory, 'history')
+    rng = random.Random(0)
+    for rounds in range(1, 5):
+        log = BasketLog(path, segment_bytes=256 << 10)
+        with ThreadPoolExecutor(32) as pool:
+            list(pool.map(lambda n: log.add(rng.choice(FRUITS), rng.randint(-2, 5)), range(50_000)))
+        expected = log.snapshot()
+        log.close(snapshot=False)       # as after a crash: no final snapshot
+        start = time.perf_counter()
+        log = BasketLog(path, segment_bytes=256 << 10)
+        elapsed = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+        print(f"after {log._lsn:>7,} events: recovered in {elapsed * 1000:5.1f} ms, replayed {log.recovered_events:,}, "
+              f"{size / 1024:.0f} KB on disk, state intact: {log.snapshot() == expected}")
+        log.close(snapshot=False)
+
+    shutil.rmtree(directory)
@@ -2,6 +2,7 @@ from add import add_fruit
 from show import show_fruits
 from update import update_fruit
 from delete import delete_fruit
+from data import basket
 
 def menu():
     while True:
@@ -23,6 +24,7 @@ def menu():
         elif choice == '4':
             delete_fruit()
         elif choice == '5':
+            basket.close()
             break
         else:
             print("Invalid choice. Please try again.")
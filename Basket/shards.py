@@ -0,0 +1,260 @@
+# baskets of many users at once, safe to change from many threads
+#
+# users are spread over `stripes` dicts, each behind its own lock, so threads
+# working on different users rarely wait for each other, and every change is
+# one read-modify-write under the lock instead of check-then-act on a shared dict:
+#
+#     baskets = ShardedBaskets()
+#     baskets.increment('ana', 'Apple', 3)
+#     baskets.decrement('ana', 'Apple', 5)   # InsufficientQuantity, nothing changed
+#     baskets.apply([('ana', 'Apple', -1), ('bo', 'Pear', 2)])   # all or nothing
+#     baskets.snapshot('ana')                # {'Apple': 2}, a copy
+#     basket = baskets.basket('ana')         # one user's basket, with BasketStore's API
+#
+# for processes, partition() routes each user to one owner process, which
+# keeps its own ShardedBaskets; nothing is shared between processes
+#
+#     python shards.py        # throughput as threads and processes are added
+import os
+import random
+import threading
+import time
+import zlib
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class InsufficientQuantity(ValueError):
+    pass
+
+
+def partition(user, parts):
+    # the same user always goes to the same part, in every process (unlike hash() of a str)
+    return zlib.crc32(str(user).encode()) % parts
+
+
+class ShardedBaskets:
+
+    def __init__(self, stripes=64):
+        self.stripes = stripes
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._baskets = [{} for _ in range(stripes)]    # per stripe: user -> {fruit: qty}
+
+    def _stripe(self, user):
+        return hash(user) % self.stripes
+
+    def increment(self, user, fruit, qty, floor=0):
+        # returns the new quantity; a fruit that reaches 0 leaves the basket
+        i = self._stripe(user)
+        with self._locks[i]:
+            basket = self._baskets[i].setdefault(user, {})
+            total = basket.get(fruit, 0) + qty
+            if total < floor:
+                if not basket:
+                    del self._baskets[i][user]
+                raise InsufficientQuantity(f"{user} has {basket.get(fruit, 0)} {fruit}, cannot take {-qty}")
+            self._store(i, user, basket, fruit, total)
+            return total
+
+    def decrement(self, user, fruit, qty, floor=0):
+        return self.increment(user, fruit, -qty, floor)
+
+    def set(self, user, fruit, qty):
+        i = self._stripe(user)
+        with self._locks[i]:
+            self._store(i, user, self._baskets[i].setdefault(user, {}), fruit, qty)
+
+    def replace(self, user, fruit, qty):
+        # set a fruit the user already has; False, and nothing changed, if they don't
+        i = self._stripe(user)
+        with self._locks[i]:
+            basket = self._baskets[i].get(user)
+            if basket is None or fruit not in basket:
+                return False
+            self._store(i, user, basket, fruit, qty)
+            return True
+
+    def delete(self, user, fruit):
+        i = self._stripe(user)
+        with self._locks[i]:
+            basket = self._baskets[i].get(user)
+            if basket is None or fruit not in basket:
+                return False
+            self._store(i, user, basket, fruit, 0)
+            return True
+
+    def get(self, user, fruit, default=0):
+        # a single dict lookup is atomic, no lock needed
+        return self._baskets[self._stripe(user)].get(user, {}).get(fruit, default)
+
+    def _store(self, i, user, basket, fruit, qty):
+        if qty:
+            basket[fruit] = qty
+        else:
+            basket.pop(fruit, None)
+        if not basket:
+            del self._baskets[i][user]
+
+    def apply(self, changes, floor=0):
+        # [(user, fruit, delta)], applied together or not at all; returns how many.
+        # only the totals after every change must stay at or above floor, so
+        # [(u, f, -2), (u, f, 5)] on 0 is fine
+        changes = list(changes)
+        by_stripe = {}
+        for user, fruit, delta in changes:
+            by_stripe.setdefault(self._stripe(user), []).append((user, fruit, delta))
+        # locks taken in stripe order, so two apply() calls cannot deadlock
+        stripes = sorted(by_stripe)
+        for i in stripes:
+            self._locks[i].acquire()
+        try:
+            totals = {}
+            for i in stripes:
+                for user, fruit, delta in by_stripe[i]:
+                    key = (i, user, fruit)
+                    if key not in totals:
+                        totals[key] = self._baskets[i].get(user, {}).get(fruit, 0)
+                    totals[key] += delta
+            for (i, user, fruit), total in totals.items():
+                if total < floor:
+                    raise InsufficientQuantity(f"{user} would have {total} {fruit}, below {floor}")
+            for (i, user, fruit), total in totals.items():
+                self._store(i, user, self._baskets[i].setdefault(user, {}), fruit, total)
+            return len(changes)
+        finally:
+            for i in stripes:
+                self._locks[i].release()
+
+    def snapshot(self, user):
+        # a copy of one basket as it was at one moment
+        i = self._stripe(user)
+        with self._locks[i]:
+            return dict(self._baskets[i].get(user, {}))
+
+    def snapshot_all(self):
+        # every basket at one moment: all stripes locked (in order) while copying
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            return {user: dict(basket) for stripe in self._baskets for user, basket in stripe.items()}
+        finally:
+            for lock in self._locks:
+                lock.release()
+
+    def __len__(self):
+        return sum(len(stripe) for stripe in self._baskets)
+
+    def basket(self, user):
+        return UserBasket(self, user)
+
+
+class UserBasket(MutableMapping):
+    # one user's basket inside a ShardedBaskets, with the API of BasketStore and
+    # BasketLog; every method is one locked step on the shared store
+
+    def __init__(self, baskets, user):
+        self.baskets = baskets
+        self.user = user
+
+    def __getitem__(self, fruit):
+        qty = self.baskets.get(self.user, fruit, None)
+        if qty is None:
+            raise KeyError(fruit)
+        return qty
+
+    def __setitem__(self, fruit, qty):
+        self.baskets.set(self.user, fruit, qty)
+
+    def __delitem__(self, fruit):
+        if not self.baskets.delete(self.user, fruit):
+            raise KeyError(fruit)
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+    def __len__(self):
+        return len(self.snapshot())
+
+    def snapshot(self):
+        return self.baskets.snapshot(self.user)
+
+    def add(self, fruit, qty):
+        # InsufficientQuantity if that would take the fruit below 0
+        return self.baskets.increment(self.user, fruit, qty)
+
+    def replace(self, fruit, qty):
+        return self.baskets.replace(self.user, fruit, qty)
+
+    def discard(self, fruit):
+        return self.baskets.delete(self.user, fruit)
+
+    def close(self):
+        pass
+
+
+FRUITS = ['Apple', 'Banana', 'Cherry', 'Mango', 'Orange', 'Pear', 'Plum', 'Kiwi']
+
+
+def _workload(baskets, users, ops, seed):
+    # 60% adds, 30% removals (some hit the floor), 10% snapshots
+    rng = random.Random(seed)
+    refused = 0
+    for _ in range(ops):
+        user = rng.choice(users)
+        r = rng.random()
+        try:
+            if r < 0.6:
+                baskets.increment(user, rng.choice(FRUITS), rng.randint(1, 5))
+            elif r < 0.9:
+                baskets.decrement(user, rng.choice(FRUITS), rng.randint(1, 5))
+            else:
+                baskets.snapshot(user)
+        except InsufficientQuantity:
+            refused += 1
+    return refused
+
+
+def _process_workload(part, parts, users, ops, seed):
+    # one owner process: its own store, only the users partition() gives it
+    mine = [user for user in users if partition(user, parts) == part]
+    return _workload(ShardedBaskets(), mine, ops, seed)
+
+
+def bench(users=10_000, ops=200_000):
+    names = [f'user{n}' for n in range(users)]
+    counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    print(f"{ops:,} basket operations over {users:,} users, {os.cpu_count()} CPU(s)")
+
+    for stripes in (1, 64):
+        for threads in counts:
+            baskets = ShardedBaskets(stripes)
+            start = time.perf_counter()
+            with ThreadPoolExecutor(threads) as pool:
+                list(pool.map(_workload, [baskets] * threads, [names] * threads,
+                              [ops // threads] * threads, range(threads)))
+            elapsed = time.perf_counter() - start
+            print(f"  {threads} thread(s), {stripes:>2} stripe(s): {ops / elapsed:>10,.0f} ops/s")
+
+    for processes in counts:
+        start = time.perf_counter()
+        with ProcessPoolExecutor(processes) as pool:
+            list(pool.map(_process_workload, range(processes), [processes] * processes, [names] * processes,
+                          [ops // processes] * processes, range(processes)))
+        elapsed = time.perf_counter() - start
+        print(f"  {processes} process(es), users partitioned: {ops / elapsed:>10,.0f} ops/s (startup included)")
+
+    # invariant under contention: concurrent +1/-1 pairs leave every count where it started
+    baskets = ShardedBaskets()
+    def churn(seed):
+        rng = random.Random(seed)
+        for _ in range(20_000):
+            user, fruit = rng.choice(names[:50]), rng.choice(FRUITS)
+            baskets.apply([(user, fruit, 1), (user, 'Apple', 1)])
+            baskets.apply([(user, fruit, -1), (user, 'Apple', -1)])
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(churn, range(8)))
+    print("  no lost updates under 8 threads:", baskets.snapshot_all() == {})
+
+
+if __name__ == '__main__':
+    bench()
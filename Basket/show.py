@@ -1,9 +1,10 @@
 from data import basket
 
 def show_fruits():
-    if not basket:
+    fruits = basket.snapshot()
+    if not fruits:
         print("Basket is empty.")
         return
     print("\nCurrent Fruits in Basket:")
-    for fruit, qty in basket.items():
+    for fruit, qty in fruits.items():
         print(f"- {fruit}: {qty}")
\ No newline at end of file
@@ -0,0 +1,179 @@
+# the basket kept in Postgres through app/crud.py, written behind
+#
+# reads come from an in-memory copy loaded once at start; writes change that
+# copy at once and queue the change, and the queue goes out as a few grouped
+# statements instead of one round trip per keystroke:
+# - add() queues an increment, increments to the same fruit are summed
+# - basket[fruit] = qty and del basket[fruit] queue the final value (or a
+#   delete), replacing whatever was queued for that fruit before
+# a flush happens once `batch_size` fruits are queued, every `flush_interval`
+# seconds from a background thread, and on close() / at exit
+#
+# increments are added to the stored quantity instead of overwriting it, so
+# two processes adding to the same basket don't lose each other's adds
+#
+# without a CRUDManager the store keeps everything in memory, like the old dict
+import atexit
+import logging
+import threading
+from collections.abc import MutableMapping
+
+logger = logging.getLogger(__name__)
+
+TABLE = 'basket_items'
+SCHEMA = {
+    'basket_id': 'TEXT NOT NULL',
+    'fruit': 'TEXT NOT NULL',
+    'quantity': 'INTEGER NOT NULL',
+    'PRIMARY KEY': '(basket_id, fruit)',
+}
+KEY = ('basket_id', 'fruit')
+
+
+class BasketStore(MutableMapping):
+
+    def __init__(self, crud=None, basket_id='default', batch_size=100, flush_interval=2.0):
+        self.crud = crud
+        self.basket_id = basket_id
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.flushes = 0
+        self._items = {}
+        self._increments = {}     # fruit -> quantity to add to the stored one
+        self._writes = {}         # fruit -> quantity to store, None to delete
+        self._lock = threading.Lock()
+        # one flush at a time, so an older batch can never land after a newer one
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        if crud is None:
+            return
+
+        crud.create_table(TABLE, SCHEMA)
+        for row in crud.get_items(TABLE, {'basket_id': basket_id}, order_by='fruit'):
+            self._items[row['fruit']] = row['quantity']
+        threading.Thread(target=self._flush_every, name='basket-flush', daemon=True).start()
+        atexit.register(self.close)
+
+    def __getitem__(self, fruit):
+        return self._items[fruit]
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def snapshot(self):
+        # a copy taken under the lock, for listing while other threads write
+        with self._lock:
+            return dict(self._items)
+
+    def __setitem__(self, fruit, qty):
+        with self._lock:
+            self._items[fruit] = qty
+            self._queue_write(fruit, qty)
+        self._maybe_flush()
+
+    def __delitem__(self, fruit):
+        with self._lock:
+            del self._items[fruit]
+            self._queue_write(fruit, None)
+        self._maybe_flush()
+
+    def replace(self, fruit, qty):
+        # set a fruit already in the basket, checked and changed under one lock;
+        # False if it is not there
+        with self._lock:
+            if fruit not in self._items:
+                return False
+            self._items[fruit] = qty
+            self._queue_write(fruit, qty)
+        self._maybe_flush()
+        return True
+
+    def discard(self, fruit):
+        # remove a fruit if it is there, under one lock; returns whether it was
+        with self._lock:
+            if fruit not in self._items:
+                return False
+            del self._items[fruit]
+            self._queue_write(fruit, None)
+        self._maybe_flush()
+        return True
+
+    def add(self, fruit, qty):
+        # returns the new quantity
+        with self._lock:
+            total = self._items[fruit] = self._items.get(fruit, 0) + qty
+            if self.crud is not None:
+                if fruit in self._writes:
+                    # a queued value or delete is already absolute, fold the add into it
+                    self._writes[fruit] = total
+                else:
+                    self._increments[fruit] = self._increments.get(fruit, 0) + qty
+        self._maybe_flush()
+        return total
+
+    def _queue_write(self, fruit, qty):
+        if self.crud is not None:
+            self._increments.pop(fruit, None)
+            self._writes[fruit] = qty
+
+    @property
+    def pending(self):
+        return len(self._increments) + len(self._writes)
+
+    def _maybe_flush(self):
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        # the queued changes in one transaction; returns how many fruits were written
+        if self.crud is None:
+            return 0
+        with self._flush_lock:
+            with self._lock:
+                increments, writes = self._increments, self._writes
+                self._increments, self._writes = {}, {}
+            if not increments and not writes:
+                return 0
+            try:
+                with self.crud.transaction() as cursor:
+                    self.crud.delete_items(TABLE, [(self.basket_id, fruit) for fruit, qty in writes.items() if qty is None],
+                                           KEY, cursor=cursor)
+                    self.crud.upsert_items(TABLE, self._rows(writes), KEY, cursor=cursor)
+                    self.crud.upsert_items(TABLE, self._rows(increments), KEY, increment_columns=('quantity',),
+                                           cursor=cursor)
+            except Exception:
+                self._requeue(increments, writes)
+                raise
+            self.flushes += 1
+            return len(increments) + len(writes)
+
+    def _rows(self, changes):
+        return [{'basket_id': self.basket_id, 'fruit': fruit, 'quantity': qty}
+                for fruit, qty in changes.items() if qty is not None]
+
+    def _requeue(self, increments, writes):
+        # a failed batch goes back under whatever was queued since
+        with self._lock:
+            for fruit in writes:
+                # the in-memory copy already holds the value after every later change
+                self._increments.pop(fruit, None)
+                self._writes[fruit] = self._items.get(fruit)
+            for fruit, qty in increments.items():
+                if fruit not in self._writes:
+                    self._increments[fruit] = self._increments.get(fruit, 0) + qty
+
+    def _flush_every(self):
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Basket flush failed, retrying in {self.flush_interval}s: {e}")
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self.flush()
@@ -1,21 +1,26 @@
 from data import basket
 
 def update_fruit():
-    if not basket:
+    fruits = basket.snapshot()
+    if not fruits:
         print("Basket is empty. Nothing to update.")
         return
 
     print("\nCurrent Basket Contents:")
-    for fruit, qty in basket.items():
+    for fruit, qty in fruits.items():
         print(f"- {fruit}: {qty}")
 
     fruit = input("\nEnter fruit name to update: ").strip().capitalize()
-    if fruit in basket:
-        try:
-            qty = int(input(f"Enter new quantity for {fruit}: "))
-            basket[fruit] = qty
-            print(f"{fruit} updated to {qty}.")
-        except ValueError:
-            print("Quantity must be a number.")
+    if fruit not in basket:
+        print(f"{fruit} is not in the basket.")
+        return
+    try:
+        qty = int(input(f"Enter new quantity for {fruit}: "))
+    except ValueError:
+        print("Quantity must be a number.")
+        return
+    # checked again as it is set: the fruit may have been deleted while we asked
+    if basket.replace(fruit, qty):
+        print(f"{fruit} updated to {qty}.")
     else:
         print(f"{fruit} is not in the basket.")
@@ -1,26 +1,488 @@
 # implement decorator to handle multiple callings with cache logic set cache values so that function need not to execute again
-import time 
-
-def cache(func):
-    cache_value = {}
-    def wrapper(*args):
-        start = time.time()
-        if args in cache_value:
-            return cache_value[args]
-        result = func(*args)
-        cache_value[args] = result
-        end = time.time()
-        print(f'time taken {end-start}')
-        return result
+#
+# cache keeps results in an LRU per lock stripe:
+# - maxsize / max_bytes bound the entries and their estimated size, across all stripes
+# - ttl expires entries after the given number of seconds
+# - kwargs and unhashable arguments (lists, dicts, sets) are part of the key
+# - concurrent misses on one key share a single call (single-flight)
+# - stale_ttl serves expired entries while one background refresh runs
+# - cache_info() reports hits, misses, evictions and expirations
+# - disk adds a persistent second tier (see disk_cache.DiskCache)
+# async_cache does the same for coroutine functions, caching awaited results
+import asyncio
+import functools
+import inspect
+import math
+import pickle
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'expirations', 'coalesced', 'stale_hits',
+                                     'maxsize', 'currsize', 'max_bytes', 'currbytes'])
+
+_MISSING = object()
+_KWARGS_MARK = object()
+_FROZEN = object()  # starts every frozen value, so none can equal an argument passed as is
+_SCRAMBLE = 0x9E3779B97F4A7C15  # 2**64 / golden ratio, odd
+_MASK64 = (1 << 64) - 1
+
+
+def _freeze(value):
+    # turn unhashable containers into hashable equivalents, tagged by type
+    if isinstance(value, (list, tuple)):
+        return (_FROZEN, type(value), tuple(_freeze(v) for v in value))
+    if isinstance(value, dict):
+        return (_FROZEN, type(value), frozenset((_freeze(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return (_FROZEN, type(value), frozenset(_freeze(v) for v in value))
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        pass
+    try:
+        return (_FROZEN, type(value), pickle.dumps(value))
+    except Exception:
+        raise TypeError(f"cannot build a cache key from {type(value).__name__!r} argument") from None
+
+
+def make_key(args, kwargs):
+    # returns (key, hash); a lone str/int argument is its own key, as in functools
+    if not kwargs:
+        if len(args) == 1 and type(args[0]) in (int, str):
+            key = args[0]
+            return key, hash(key)
+        key = args
+    else:
+        key = args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+    try:
+        return key, hash(key)
+    except TypeError:
+        key = _freeze(key)
+        return key, hash(key)
+
+
+def _sizeof(value, _seen=None):
+    # rough deep size of a cached value, used for the byte budget
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_sizeof(k, _seen) + _sizeof(v, _seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_sizeof(v, _seen) for v in value)
+    return size
+
+
+class _Flight:
+    # one in-progress call; callers that miss on the same key wait for it
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class _Stripe:
+    __slots__ = ('lock', 'entries', 'flights', 'bytes', 'hits', 'misses', 'evictions', 'expirations',
+                 'coalesced', 'stale_hits')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (value, expires_at, size)
+        self.flights = {}             # key -> _Flight
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+        self.stale_hits = 0
+
+    def pop(self, key):
+        value, expires_at, size = self.entries.pop(key)
+        self.bytes -= size
+
+    def evict(self):
+        self.pop(next(iter(self.entries)))
+        self.evictions += 1
+
+
+class Cache:
+    # the storage behind one decorated function, split into lock stripes
+    # maxsize counts entries across all stripes: a full cache evicts the oldest
+    # entry of the stripe being written, or of the fullest other stripe when that
+    # one holds nothing else, so uneven keys never leave room unused.
+    # Keys pick their stripe by the high bits of a multiplied hash, since
+    # hash(n) == n and strided ints would otherwise share their low bits.
+    # A byte budget is kept as one LRU (a single stripe), so any value that fits
+    # in max_bytes can be cached
+
+    def __init__(self, maxsize=1024, max_bytes=None, ttl=None, stripes=8, sizeof=_sizeof, stale_ttl=None):
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("maxsize must be at least 1 or None")
+        if stale_ttl is not None and ttl is None:
+            raise ValueError("stale_ttl needs a ttl")
+        if max_bytes is not None:
+            stripes = 1
+        elif maxsize is not None:
+            stripes = min(stripes, maxsize)
+        stripes = 1 << max(0, math.ceil(math.log2(max(1, stripes))))
+        if maxsize is not None and stripes > maxsize:
+            stripes >>= 1
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.sizeof = sizeof
+        self.shift = 64 - (stripes.bit_length() - 1)
+        self.stripes = [_Stripe() for _ in range(stripes)]
+        self.count_lock = threading.Lock()
+        self.currsize = 0  # entries in all stripes, changed under count_lock
+
+    def _stripe(self, hashvalue):
+        return self.stripes[((hashvalue * _SCRAMBLE) & _MASK64) >> self.shift]
+
+    def _drop(self, stripe, key):
+        # the caller holds stripe.lock
+        stripe.pop(key)
+        with self.count_lock:
+            self.currsize -= 1
+
+    def _claim_eviction(self):
+        # True when the cache is over maxsize; currsize already counts the entry the caller evicts
+        with self.count_lock:
+            if self.maxsize is None or self.currsize <= self.maxsize:
+                return False
+            self.currsize -= 1
+            return True
+
+    def get(self, key, hashvalue):
+        # returns the cached value or _MISSING, counting a hit or a miss
+        stripe = self._stripe(hashvalue)
+        with stripe.lock:
+            entries = stripe.entries
+            entry = entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at = entry[1]
+                if expires_at is None or expires_at > time.monotonic():
+                    entries.move_to_end(key)
+                    stripe.hits += 1
+                    return entry[0]
+                self._drop(stripe, key)
+                stripe.expirations += 1
+            stripe.misses += 1
+            return _MISSING
+
+    def call(self, key, hashvalue, func, args, kwargs, load=None):
+        # cached value, or the result of the one call computing it right now
+        # load(args, kwargs) -> (found, value, ttl) is tried before func on a miss,
+        # but not by a stale refresh, which always runs func
+        stripe = self._stripe(hashvalue)
+        with stripe.lock:
+            entry = stripe.entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at = entry[1]
+                if expires_at is None:
+                    stripe.entries.move_to_end(key)
+                    stripe.hits += 1
+                    return entry[0]
+                now = time.monotonic()
+                if expires_at > now:
+                    stripe.entries.move_to_end(key)
+                    stripe.hits += 1
+                    return entry[0]
+                if self.stale_ttl is not None and expires_at + self.stale_ttl > now:
+                    stripe.stale_hits += 1
+                    if key not in stripe.flights:
+                        flight = stripe.flights[key] = _Flight()
+                        threading.Thread(target=self._refresh, daemon=True,
+                                         args=(stripe, key, hashvalue, flight, func, args, kwargs)).start()
+                    return entry[0]
+                self._drop(stripe, key)
+                stripe.expirations += 1
+            flight = stripe.flights.get(key)
+            leader = flight is None
+            if leader:
+                stripe.misses += 1
+                flight = stripe.flights[key] = _Flight()
+            else:
+                stripe.coalesced += 1
+        if not leader:
+            return flight.wait()
+        return self._run(stripe, key, hashvalue, flight, func, args, kwargs, load)
+
+    def _run(self, stripe, key, hashvalue, flight, func, args, kwargs, load=None):
+        try:
+            found, value, ttl = load(args, kwargs) if load is not None else (False, None, None)
+            if not found:
+                value, ttl = func(*args, **kwargs), self.ttl
+            flight.value = value
+            self.set(key, hashvalue, value, ttl)
+            return value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            # the entry is stored before the flight goes away, so no caller falls in between
+            with stripe.lock:
+                stripe.flights.pop(key, None)
+            flight.done.set()
+
+    def _refresh(self, stripe, key, hashvalue, flight, func, args, kwargs):
+        try:
+            self._run(stripe, key, hashvalue, flight, func, args, kwargs)
+        except Exception:
+            pass  # the stale value keeps being served until stale_ttl runs out
+
+    def set(self, key, hashvalue, value, ttl=_MISSING):
+        # ttl defaults to the cache's own; a negative one stores the value already expired
+        size = self.sizeof(value) if self.max_bytes else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        if ttl is _MISSING:
+            ttl = self.ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        stripe = self._stripe(hashvalue)
+        with stripe.lock:
+            if key in stripe.entries:
+                stripe.pop(key)
+            else:
+                with self.count_lock:
+                    self.currsize += 1
+            stripe.entries[key] = (value, expires_at, size)
+            stripe.bytes += size
+            while self.max_bytes is not None and stripe.bytes > self.max_bytes:
+                stripe.evict()
+                with self.count_lock:
+                    self.currsize -= 1
+            while len(stripe.entries) > 1 and self._claim_eviction():
+                stripe.evict()
+        if self.maxsize is not None and self.currsize > self.maxsize:
+            # this stripe holds only the new entry, so the room comes from another one
+            # (taken after releasing our lock, so two writers never wait on each other)
+            others = sorted((other for other in self.stripes if other is not stripe),
+                            key=lambda other: len(other.entries), reverse=True)
+            for other in others:
+                with other.lock:
+                    while other.entries and self._claim_eviction():
+                        other.evict()
+                if self.currsize <= self.maxsize:
+                    break
+
+    def info(self):
+        totals = [0] * 8
+        for stripe in self.stripes:
+            with stripe.lock:
+                counts = (stripe.hits, stripe.misses, stripe.evictions, stripe.expirations,
+                          stripe.coalesced, stripe.stale_hits, len(stripe.entries), stripe.bytes)
+            totals = [t + c for t, c in zip(totals, counts)]
+        hits, misses, evictions, expirations, coalesced, stale_hits, currsize, currbytes = totals
+        return CacheInfo(hits, misses, evictions, expirations, coalesced, stale_hits,
+                         self.maxsize, currsize, self.max_bytes, currbytes)
+
+    def clear(self):
+        for stripe in self.stripes:
+            with stripe.lock:
+                with self.count_lock:
+                    self.currsize -= len(stripe.entries)
+                stripe.entries.clear()
+                stripe.bytes = stripe.hits = stripe.misses = stripe.evictions = stripe.expirations = 0
+                stripe.coalesced = stripe.stale_hits = 0
+
+
+def cache(func=None, *, maxsize=1024, max_bytes=None, ttl=None, stale_ttl=None, stripes=8, sizeof=_sizeof,
+          disk=None):
+    # usable bare (@cache) or with options (@cache(maxsize=100, ttl=60, stale_ttl=30))
+    if func is None:
+        return lambda f: cache(f, maxsize=maxsize, max_bytes=max_bytes, ttl=ttl, stale_ttl=stale_ttl,
+                               stripes=stripes, sizeof=sizeof, disk=disk)
+
+    if inspect.iscoroutinefunction(func):
+        raise TypeError(f"{func.__qualname__} is a coroutine function, decorate it with async_cache")
+
+    store = Cache(maxsize=maxsize, max_bytes=max_bytes, ttl=ttl, stripes=stripes, sizeof=sizeof, stale_ttl=stale_ttl)
+    compute, load = func, None
+
+    if disk is not None:
+        namespace = f'{func.__module__}.{func.__qualname__}'
+        # disk rows outlive ttl by stale_ttl, so a restarted process can still serve them stale
+        extra = stale_ttl or 0
+
+        def compute(*args, **kwargs):
+            value = func(*args, **kwargs)
+            disk.set(disk.key(namespace, args, kwargs), value, ttl + extra if ttl is not None else None)
+            return value
+
+        # memory misses read the disk tier before calling func; single-flight covers both.
+        # A disk hit keeps the time it has left, stale refreshes skip the disk
+        def load(args, kwargs):
+            found, value, expires_at = disk.lookup(disk.key(namespace, args, kwargs))
+            if not found:
+                return False, None, None
+            return True, value, expires_at - extra - time.time() if expires_at is not None else None
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key, hashvalue = make_key(args, kwargs)
+        return store.call(key, hashvalue, compute, args, kwargs, load)
+
+    wrapper.cache_info = store.info
+    wrapper.cache_clear = store.clear
+    wrapper.cache = store
+    wrapper.disk = disk
     return wrapper
 
+
+class _AsyncFlight:
+    # one task filling a key, shared by every coroutine awaiting that key
+    __slots__ = ('task', 'waiters')
+
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+def async_cache(func=None, *, maxsize=1024, max_bytes=None, ttl=None, sizeof=_sizeof):
+    # cache for async def functions: awaited results are stored, not coroutine objects
+    # concurrent awaits of one key share one task; a waiter being cancelled never
+    # cancels the others, and the task is only cancelled once nobody awaits it
+    if func is None:
+        return lambda f: async_cache(f, maxsize=maxsize, max_bytes=max_bytes, ttl=ttl, sizeof=sizeof)
+
+    if not inspect.iscoroutinefunction(func):
+        raise TypeError(f"{func.__qualname__} is not a coroutine function, decorate it with cache")
+
+    # one event loop runs on one thread, so a single stripe is enough
+    store = Cache(maxsize=maxsize, max_bytes=max_bytes, ttl=ttl, stripes=1, sizeof=sizeof)
+    loop_flights = weakref.WeakKeyDictionary()  # event loop -> {key: _AsyncFlight}
+    coalesced = 0
+
+    async def fill(flights, key, hashvalue, args, kwargs):
+        try:
+            value = await func(*args, **kwargs)
+            store.set(key, hashvalue, value)
+            return value
+        finally:
+            # a cancelled fill may finish after a newer flight took its key
+            flight = flights.get(key)
+            if flight is not None and flight.task is asyncio.current_task():
+                del flights[key]
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        nonlocal coalesced
+        key, hashvalue = make_key(args, kwargs)
+        value = store.get(key, hashvalue)
+        if value is not _MISSING:
+            return value
+
+        loop = asyncio.get_running_loop()
+        flights = loop_flights.setdefault(loop, {})
+        flight = flights.get(key)
+        if flight is None:
+            flight = flights[key] = _AsyncFlight(loop.create_task(fill(flights, key, hashvalue, args, kwargs)))
+        else:
+            coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # the key is free before the task is told to stop, so the next
+                # caller starts a fresh call instead of awaiting a cancelled one
+                if flights.get(key) is flight:
+                    del flights[key]
+                flight.task.cancel()
+
+    def cache_info():
+        info = store.info()
+        return info._replace(misses=info.misses - coalesced, coalesced=coalesced)
+
+    def cache_clear():
+        nonlocal coalesced
+        store.clear()
+        coalesced = 0
+
+    wrapper.cache_info = cache_info
+    wrapper.cache_clear = cache_clear
+    wrapper.cache = store
+    return wrapper
+
+
+def benchmark_hit_path(calls=200_000):
+    # hit-path cost per call against functools.lru_cache
+    def plain(a, b):
+        return a + b
+
+    contenders = {
+        'functools.lru_cache': functools.lru_cache(maxsize=1024)(plain),
+        'cache': cache(maxsize=1024)(plain),
+        'cache (kwargs)': cache(maxsize=1024)(plain),
+    }
+    for name, func in contenders.items():
+        if name.endswith('(kwargs)'):
+            func(1, b=2)
+            start = time.perf_counter_ns()
+            for _ in range(calls):
+                func(1, b=2)
+        else:
+            func(1, 2)
+            start = time.perf_counter_ns()
+            for _ in range(calls):
+                func(1, 2)
+        elapsed = time.perf_counter_ns() - start
+        print(f'{name:<22} {elapsed / calls:8.1f} ns per hit')
+
+
 @cache
 def long_run(a, b):
     time.sleep(5)
     return a + b
 
-print(long_run(89, 50))
-print(long_run(89, 50))
-print(long_run(89, 50))
-print(long_run(89, 50))
-print(long_run(3, 57))
\ No newline at end of file
+
+@async_cache(ttl=60)
+async def long_run_async(a, b):
+    await asyncio.sleep(5)
+    return a + b
+
+
+async def async_demo():
+    # 50 concurrent awaits share one 5 second call
+    results = await asyncio.gather(*(long_run_async(89, 50) for _ in range(50)))
+    print(results[0], long_run_async.cache_info())
+
+
+if __name__ == '__main__':
+    for a, b in [(89, 50), (89, 50), (89, 50), (89, 50), (3, 57)]:
+        start = time.perf_counter()
+        print(long_run(a, b), f'time taken {time.perf_counter() - start:.6f}')
+    print(long_run.cache_info())
+
+    # 50 threads missing on the same key share one 5 second call
+    start = time.perf_counter()
+    threads = [threading.Thread(target=long_run, args=(1, 2)) for _ in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f'50 concurrent calls took {time.perf_counter() - start:.2f}s', long_run.cache_info())
+
+    asyncio.run(async_demo())
+
+    benchmark_hit_path()
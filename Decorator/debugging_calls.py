@@ -1,21 +1,172 @@
 # print function name and the values of its arguments everytime the function is called
+#
+# debugging records calls instead of printing them, so it can stay on in busy services:
+# - calls go into a fixed-size ring buffer as short strings, every argument
+#   cut down to maxstring / maxother characters by reprlib
+# - arguments are repr'd when the call is recorded, not when the buffer is
+#   dumped: holding the objects until then would keep up to capacity calls'
+#   arguments alive (DataFrames, request bodies), and a mutated argument would
+#   show its later value
+# - sample_rate=0.1 records one call in ten
+# - tracer.disable('greet') / tracer.enable('greet') switch single functions
+# - dump_on_error prints the last calls when a traced function raises
+import functools
+import itertools
+import reprlib
+import sys
+import threading
+import time
+from collections import deque
 
-def debugging(func):
-    def wrapper(*args, **kwargs):   
-        args_value = ", ".join(str(arg) for arg in args)
-        kwargs_value = ", ".join(f'{k} = {v}' for k, v in kwargs.items())
-        print(f'calling {func.__name__} with args {args_value} and kwargs {kwargs_value}')
-        result = func(*args, **kwargs)
+
+class _BoundedRepr(reprlib.Repr):
+    # reprlib with huge ints and long bytes cut down before their repr is built
+
+    def repr_int(self, x, level):
+        if x.bit_length() > 4 * self.maxother:
+            return f'<int of {x.bit_length()} bits>'
+        return super().repr_int(x, level)
+
+    def repr_bytes(self, x, level):
+        if len(x) <= self.maxstring:
+            return repr(x)
+        return repr(x[:self.maxstring])[:-1] + '...' + repr(x[-1:])[-1]
+
+
+class Tracer:
+
+    def __init__(self, capacity=1000, error_context=20, maxstring=80, maxother=80):
+        # each call: (started, thread, name, arguments, elapsed, error), all strings but the times
+        self.calls = deque(maxlen=capacity)  # appends are atomic, the oldest call drops out
+        self.enabled = True
+        self.disabled = set()
+        self.error_context = error_context
+        self.repr = _BoundedRepr()
+        self.repr.maxstring = maxstring
+        self.repr.maxother = maxother
+        self.repr.maxlist = self.repr.maxtuple = self.repr.maxdict = self.repr.maxset = 10
+
+    def enable(self, name=None):
+        if name is None:
+            self.enabled = True
+        else:
+            self.disabled.discard(name)
+
+    def disable(self, name=None):
+        if name is None:
+            self.enabled = False
+        else:
+            self.disabled.add(name)
+
+    def clear(self):
+        self.calls.clear()
+
+    def safe_repr(self, value):
+        try:
+            return self.repr.repr(value)
+        except Exception as e:
+            return f'<{type(value).__name__} repr failed: {type(e).__name__}>'
+
+    def arguments(self, args, kwargs):
+        arguments = [self.safe_repr(arg) for arg in args]
+        arguments += [f'{k}={self.safe_repr(v)}' for k, v in kwargs.items()]
+        return ', '.join(arguments)
+
+    def error(self, error):
+        try:
+            message = str(error)
+        except Exception:
+            message = '<str() failed>'
+        return f'{type(error).__name__}: {self.safe_repr(message)}'
+
+    def format(self, call):
+        started, thread, name, arguments, elapsed, error = call
+        stamp = time.strftime('%H:%M:%S', time.localtime(started)) + f'.{int(started % 1 * 1000):03d}'
+        line = f'{stamp} [{thread}] {name}({arguments}) {elapsed * 1000:.3f}ms'
+        if error is not None:
+            line += f' raised {error}'
+        return line
+
+    def dump(self, last=None):
+        calls = list(self.calls)
+        if last is not None:
+            calls = calls[-last:]
+        return [self.format(call) for call in calls]
+
+    def print_last(self, last=None, file=None):
+        for line in self.dump(last):
+            print(line, file=file or sys.stderr)
+
+
+tracer = Tracer()
+
+
+def debugging(func=None, *, sample_rate=1.0, dump_on_error=False, tracer=tracer):
+    # usable bare (@debugging) or with options (@debugging(sample_rate=0.1, dump_on_error=True))
+    if func is None:
+        return lambda f: debugging(f, sample_rate=sample_rate, dump_on_error=dump_on_error, tracer=tracer)
+
+    if not 0 < sample_rate <= 1:
+        raise ValueError(f"sample_rate must be in (0, 1], got {sample_rate!r}")
+    name = func.__qualname__
+    every = max(1, round(1 / sample_rate))
+    counter = itertools.count(1)  # next() on it is atomic, unlike += on a shared int
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not tracer.enabled or name in tracer.disabled:
+            return func(*args, **kwargs)
+        sampled = every == 1 or next(counter) % every == 0
+        if not sampled and not dump_on_error:
+            return func(*args, **kwargs)
+
+        # repr'd before the call, so the trace shows the arguments as passed
+        arguments = tracer.arguments(args, kwargs) if sampled else None
+        started = time.time()
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            elapsed = time.perf_counter() - start
+            if arguments is None:
+                arguments = tracer.arguments(args, kwargs)
+            tracer.calls.append((started, threading.current_thread().name, name, arguments, elapsed,
+                                 tracer.error(e)))
+            if dump_on_error:
+                print(f'--- {name} raised, last {tracer.error_context} calls ---', file=sys.stderr)
+                tracer.print_last(tracer.error_context)
+            raise
+        # with dump_on_error every call is timed, but only sampled ones are kept
+        if sampled:
+            tracer.calls.append((started, threading.current_thread().name, name, arguments,
+                                 time.perf_counter() - start, None))
         return result
+
     return wrapper
 
+
 @debugging
 def hello():
     print('hello!!')
 
+
 @debugging
-def greet(name, greeting = 'Namaste'):
+def greet(name, greeting='Namaste'):
     print(f'{greeting}, {name}')
-    
-hello()
-greet('Riya', greeting='Namaste, happy to see you coding :)')
\ No newline at end of file
+
+
+@debugging(dump_on_error=True)
+def divide(a, b):
+    return a / b
+
+
+if __name__ == '__main__':
+    hello()
+    greet('Riya', greeting='Namaste, happy to see you coding :)')
+    greet('x' * 10_000)
+    tracer.print_last(file=sys.stdout)
+
+    try:
+        divide(1, 0)
+    except ZeroDivisionError:
+        pass
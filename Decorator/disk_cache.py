@@ -0,0 +1,158 @@
+# second cache tier on local disk, so cached results survive restarts and are
+# shared by every worker process on the host
+#
+# - entries live in one SQLite file in WAL mode (many readers, one writer at a time)
+# - max_bytes bounds the stored size, least recently used entries are evicted first
+# - serializer is any object with dumps/loads (pickle by default, json works too)
+# - keys are content hashes, stable across processes unlike hash()
+#
+# use it through cache_return.cache:
+#     @cache(ttl=3600, disk=DiskCache('results.db', max_bytes=256 * 1024 * 1024))
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+
+def _canonical(value):
+    # byte encoding that does not depend on hash seeds or dict/set order
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        return f'{type(value).__name__}:{value!r}'.encode()
+    if isinstance(value, (list, tuple)):
+        return type(value).__name__.encode() + b'[' + b','.join(_canonical(v) for v in value) + b']'
+    if isinstance(value, dict):
+        items = sorted(_canonical(k) + b'=' + _canonical(v) for k, v in value.items())
+        return b'dict{' + b','.join(items) + b'}'
+    if isinstance(value, (set, frozenset)):
+        return b'set{' + b','.join(sorted(_canonical(v) for v in value)) + b'}'
+    return b'pickle:' + pickle.dumps(value)
+
+
+class DiskCache:
+    # one instance per process and file; safe to share between threads
+
+    def __init__(self, path, max_bytes=512 * 1024 * 1024, serializer=pickle, touch_interval=60, timeout=30):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.serializer = serializer
+        self.touch_interval = touch_interval  # seconds between access-time updates of one entry
+        self.timeout = timeout
+        self.local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        with self.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO meta VALUES ('total_bytes', 0)")
+
+    def connection(self):
+        # one connection per thread, reopened after a fork
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    def transaction(self):
+        return _Transaction(self.connection())
+
+    @staticmethod
+    def key(namespace, args, kwargs):
+        payload = _canonical((namespace, args, tuple(sorted(kwargs.items()))))
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, key):
+        # returns (found, value)
+        found, value, expires_at = self.lookup(key)
+        return found, value
+
+    def lookup(self, key):
+        # returns (found, value, expires_at), expires_at in time.time() seconds or None
+        now = time.time()
+        conn = self.connection()
+        row = conn.execute("SELECT value, expires_at, accessed_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= now):
+            self.misses += 1
+            return False, None, None
+        if now - row[2] > self.touch_interval:
+            try:
+                conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            except sqlite3.OperationalError:
+                pass  # a busy database only costs us LRU precision
+        self.hits += 1
+        return True, self.serializer.loads(row[0]), row[1]
+
+    def set(self, key, value, ttl=None):
+        data = self.serializer.dumps(value)
+        if isinstance(data, str):
+            data = data.encode()
+        size = len(data)
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self.transaction() as conn:
+            old = conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)", (key, data, size, expires_at, now))
+            total = self._add_bytes(conn, size - (old[0] if old else 0))
+            if total > self.max_bytes:
+                self._evict(conn, total - self.max_bytes, now)
+
+    def _add_bytes(self, conn, delta):
+        conn.execute("UPDATE meta SET value = value + ? WHERE name = 'total_bytes'", (delta,))
+        return conn.execute("SELECT value FROM meta WHERE name = 'total_bytes'").fetchone()[0]
+
+    def _evict(self, conn, excess, now):
+        # expired entries go first, then the least recently used
+        freed = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries WHERE expires_at <= ?", (now,)).fetchone()[0]
+        conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        victims = []
+        if freed < excess:
+            for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+                victims.append((key,))
+                freed += size
+                if freed >= excess:
+                    break
+            conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self._add_bytes(conn, -freed)
+
+    def info(self):
+        conn = self.connection()
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {'hits': self.hits, 'misses': self.misses, 'entries': count,
+                'bytes': total, 'max_bytes': self.max_bytes}
+
+    def clear(self):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("UPDATE meta SET value = 0 WHERE name = 'total_bytes'")
+        self.hits = self.misses = 0
+
+
+class _Transaction:
+    # BEGIN IMMEDIATE takes the write lock up front, so read-modify-write
+    # sequences from several processes cannot interleave
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
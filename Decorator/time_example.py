@@ -1,17 +1,236 @@
 # Write a decorator which measures the time a function takes to execute itself
+#
+# timer aggregates instead of printing on every call, so it can stay on in production:
+# - perf_counter_ns timings, per function count / total / min / max
+# - latency percentiles from a log-linear (HDR-style) histogram, ~6% precision
+# - sample_rate=0.01 times one call in a hundred, every call is still counted
+# - inclusive time (the whole call) and exclusive time (minus timed callees);
+#   a recursive function's inclusive time counts only its outermost call
+# - profiler.disable() leaves one attribute check per call
+# - report('text') or report('json') dumps the aggregates
+import functools
+import json
+import threading
 import time
+from time import perf_counter_ns
 
-def timer(func):
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_MASK = (1 << SUB_BUCKET_BITS) - 1
+
+
+def bucket_index(ns):
+    # values below 32ns are exact, above that keep the top 5 bits
+    shift = ns.bit_length() - SUB_BUCKET_BITS
+    if shift <= 0:
+        return ns
+    return (shift << SUB_BUCKET_BITS) | (ns >> shift)
+
+
+def bucket_bounds(index):
+    if index <= SUB_BUCKET_MASK:
+        return index, index
+    shift = index >> SUB_BUCKET_BITS
+    mantissa = index & SUB_BUCKET_MASK
+    return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+
+class FunctionStats:
+    __slots__ = ('calls', 'count', 'total', 'exclusive', 'elapsed', 'min', 'max', 'buckets', 'depth')
+
+    def __init__(self):
+        self.calls = 0      # every call while enabled
+        self.count = 0      # sampled calls, the ones timed
+        self.total = 0      # inclusive time of the outermost timed calls
+        self.exclusive = 0
+        self.elapsed = 0    # every timed call's duration, for the mean
+        self.min = None
+        self.max = 0
+        self.buckets = {}
+        self.depth = 0      # timed calls in progress on this thread
+
+    def add(self, elapsed, exclusive, outermost=True):
+        self.count += 1
+        if outermost:
+            self.total += elapsed
+        self.exclusive += exclusive
+        self.elapsed += elapsed
+        if self.min is None or elapsed < self.min:
+            self.min = elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        index = bucket_index(elapsed)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other):
+        self.calls += other.calls
+        self.count += other.count
+        self.total += other.total
+        self.exclusive += other.exclusive
+        self.elapsed += other.elapsed
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+        for index, count in list(other.buckets.items()):
+            self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def percentile(self, pct):
+        if not self.count:
+            return None
+        rank = max(1, round(pct / 100 * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                low, high = bucket_bounds(index)
+                return min(max((low + high) // 2, self.min), self.max)
+        return self.max
+
+
+class Profiler:
+    # each thread aggregates into its own dict, so the hot path takes no lock;
+    # report() merges them. Threads that have exited are folded into one retired
+    # dict whenever a new thread starts timing or a report is taken, so a pool
+    # that keeps replacing its threads does not grow thread_stats
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.thread_stats = {}  # thread -> {name: FunctionStats}
+        self.retired = {}       # name -> FunctionStats of exited threads
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def function_stats(self, name):
+        # slow path of the wrapper: first call of a function on this thread
+        local = self.local
+        if not hasattr(local, 'stats'):
+            local.stats = {}
+            local.stack = []
+            with self.lock:
+                self.retire_exited()
+                self.thread_stats[threading.current_thread()] = local.stats
+        return local.stats.setdefault(name, FunctionStats())
+
+    def retire_exited(self):
+        # called under self.lock; an exited thread no longer writes its stats
+        for thread in [thread for thread in self.thread_stats if not thread.is_alive()]:
+            for name, stats in self.thread_stats.pop(thread).items():
+                self.retired.setdefault(name, FunctionStats()).merge(stats)
+
+    def reset(self):
+        with self.lock:
+            for stats in self.thread_stats.values():
+                stats.clear()
+            self.retired.clear()
+
+    def snapshot(self):
+        merged = {}
+        with self.lock:
+            self.retire_exited()
+            for name, stats in self.retired.items():
+                merged.setdefault(name, FunctionStats()).merge(stats)
+            per_thread = [list(stats.items()) for stats in self.thread_stats.values()]
+        for items in per_thread:
+            for name, stats in items:
+                merged.setdefault(name, FunctionStats()).merge(stats)
+        return merged
+
+    def report(self, format='text'):
+        rows = []
+        for name, stats in sorted(self.snapshot().items(), key=lambda item: item[1].total, reverse=True):
+            scale = stats.calls / stats.count if stats.count else 0
+            rows.append({
+                'function': name,
+                'calls': stats.calls,
+                'sampled': stats.count,
+                'total_ms': round(stats.total * scale / 1e6, 3),
+                'exclusive_ms': round(stats.exclusive * scale / 1e6, 3),
+                'mean_us': round(stats.elapsed / stats.count / 1e3, 3) if stats.count else None,
+                'min_us': round(stats.min / 1e3, 3) if stats.count else None,
+                'p50_us': round(stats.percentile(50) / 1e3, 3) if stats.count else None,
+                'p90_us': round(stats.percentile(90) / 1e3, 3) if stats.count else None,
+                'p99_us': round(stats.percentile(99) / 1e3, 3) if stats.count else None,
+                'max_us': round(stats.max / 1e3, 3) if stats.count else None,
+            })
+        if format == 'json':
+            return json.dumps(rows, indent=2)
+        if not rows:
+            return 'no timed calls'
+        columns = list(rows[0])
+        widths = {c: max(len(c), *(len(str(row[c])) for row in rows)) for c in columns}
+        lines = ['  '.join(c.ljust(widths[c]) for c in columns)]
+        lines += ['  '.join(str(row[c]).ljust(widths[c]) for c in columns) for row in rows]
+        return '\n'.join(lines)
+
+    def dump(self, path, format='text'):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.report(format))
+
+
+profiler = Profiler()
+
+
+def timer(func=None, *, sample_rate=1.0, name=None, profiler=profiler):
+    # usable bare (@timer) or with options (@timer(sample_rate=0.01))
+    if func is None:
+        return lambda f: timer(f, sample_rate=sample_rate, name=name, profiler=profiler)
+
+    if not 0 < sample_rate <= 1:
+        raise ValueError(f"sample_rate must be in (0, 1], got {sample_rate!r}")
+    name = name or f'{func.__module__}.{func.__qualname__}'
+    every = max(1, round(1 / sample_rate))
+
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        start = time.time()
-        result = func(*args, **kwargs)
-        end = time.time()
-        print(f"{func.__name__} ran in {end-start} time")
-        return result
+        if not profiler.enabled:
+            return func(*args, **kwargs)
+        local = profiler.local
+        try:
+            stats = local.stats[name]
+        except (AttributeError, KeyError):
+            stats = profiler.function_stats(name)
+        stats.calls += 1
+        if every > 1 and stats.calls % every:
+            return func(*args, **kwargs)
+
+        # frame[0] collects the time of timed callees, for exclusive time
+        stack = local.stack
+        frame = [0]
+        stack.append(frame)
+        stats.depth += 1
+        start = perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = perf_counter_ns() - start
+            stats.depth -= 1
+            stack.pop()
+            if stack:
+                stack[-1][0] += elapsed
+            stats.add(elapsed, elapsed - frame[0], stats.depth == 0)
+
     return wrapper
 
+
 @timer
 def example_function(t):
     time.sleep(t)
 
-example_function(2)
\ No newline at end of file
+
+@timer
+def outer(t):
+    example_function(t)
+    time.sleep(t)
+
+
+if __name__ == '__main__':
+    example_function(2)
+    for _ in range(5):
+        outer(0.01)
+    print(profiler.report())
+    print(profiler.report('json'))
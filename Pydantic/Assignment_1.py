@@ -11,6 +11,7 @@ class Model(BaseModel):
 data = [{'id': 1, 'name': 'Esp32', 'price':500, 'in_stock':'True'},
         {'id': 2, 'name': 'Esp8266', 'price':900, 'in_stock':'False'}]
 
-for n in data:
-    model = Model(**n)
-    print(model)
\ No newline at end of file
+if __name__ == '__main__':
+    for n in data:
+        model = Model(**n)
+        print(model)
@@ -0,0 +1,129 @@
+# many bookings at once, stored column by column in NumPy arrays
+#
+# Booking (Assignment_3) stays the type for a single booking; BookingBatch is
+# for reporting over a season, where building a model per booking and calling
+# total_price on each is the slow part:
+# - validate() checks nights >= 1 and whole for the whole batch in one comparison;
+#   nights is kept as float64 so 1.5 is flagged, as Booking rejects it, instead of
+#   being truncated to 1
+# - columns take what Booking takes: numbers, numeric strings, bools
+# - total_price is one multiplication over the columns
+# - group_by('room_id') / group_by('user_id') sums revenue and nights per key
+from dataclasses import dataclass
+import time
+
+import annotated_types
+import numpy as np
+
+from Assignment_3 import Booking
+
+COLUMNS = ('user_id', 'room_id', 'nights', 'rate_per_night')
+# same bound as Booking.nights = Field(..., ge=1)
+MIN_NIGHTS = next(constraint.ge for constraint in Booking.model_fields['nights'].metadata
+                  if isinstance(constraint, annotated_types.Ge))
+
+
+def _ids(values, column):
+    # ids are whole numbers; anything but integers is parsed as float first, so '12'
+    # and 12.0 pass and 12.5 is refused instead of truncated
+    values = np.asarray(values)
+    if values.dtype.kind in 'iub':
+        return values.astype(np.int64, copy=False)
+    values = values.astype(np.float64)
+    if not np.array_equal(values, np.floor(values)):
+        raise ValueError(f'{column} must hold whole numbers')
+    return values.astype(np.int64)
+
+
+@dataclass
+class BookingBatch:
+    user_id: np.ndarray
+    room_id: np.ndarray
+    nights: np.ndarray
+    rate_per_night: np.ndarray
+
+    def __post_init__(self):
+        self.user_id = _ids(self.user_id, 'user_id')
+        self.room_id = _ids(self.room_id, 'room_id')
+        self.nights = np.asarray(self.nights, dtype=np.float64)
+        self.rate_per_night = np.asarray(self.rate_per_night, dtype=np.float64)
+        lengths = {len(getattr(self, column)) for column in COLUMNS}
+        if len(lengths) > 1:
+            raise ValueError(f'columns have different lengths: {sorted(lengths)}')
+
+    @classmethod
+    def from_records(cls, records):
+        # records: dicts with Booking's fields; numeric strings are parsed as Booking would
+        records = list(records)
+        return cls(*(np.fromiter((record[column] for record in records), dtype=np.float64, count=len(records))
+                     for column in COLUMNS))
+
+    @classmethod
+    def from_bookings(cls, bookings):
+        return cls.from_records([booking.__dict__ for booking in bookings])
+
+    def __len__(self):
+        return len(self.nights)
+
+    def __getitem__(self, index):
+        # one booking as a Booking model, a slice or mask as a smaller batch
+        if isinstance(index, (int, np.integer)):
+            return Booking(**{column: getattr(self, column)[index].item() for column in COLUMNS})
+        return BookingBatch(*(getattr(self, column)[index] for column in COLUMNS))
+
+    def invalid_mask(self):
+        # NaN fails both comparisons, so it is flagged too
+        return ~(self.nights >= MIN_NIGHTS) | (self.nights != np.floor(self.nights))
+
+    def validate(self):
+        # returns (valid batch, row indices that break Booking's constraints)
+        invalid = self.invalid_mask()
+        return self[~invalid], np.flatnonzero(invalid)
+
+    @property
+    def total_price(self):
+        return self.nights * self.rate_per_night
+
+    def revenue(self):
+        return float(self.total_price.sum())
+
+    def group_by(self, column):
+        # per distinct user_id or room_id: bookings, nights and revenue, keys sorted
+        keys, inverse = np.unique(getattr(self, column), return_inverse=True)
+        return {
+            column: keys,
+            'bookings': np.bincount(inverse, minlength=len(keys)),
+            'nights': np.rint(np.bincount(inverse, weights=self.nights, minlength=len(keys))).astype(np.int64),
+            'revenue': np.bincount(inverse, weights=self.total_price, minlength=len(keys)),
+        }
+
+
+def random_batch(size, rooms=500, users=100_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return BookingBatch(
+        user_id=rng.integers(1, users, size),
+        room_id=rng.integers(1, rooms, size),
+        nights=rng.integers(0, 14, size),  # some zero-night bookings to reject
+        rate_per_night=rng.uniform(50, 400, size).round(2),
+    )
+
+
+if __name__ == '__main__':
+    batch = random_batch(1_000_000)
+
+    start = time.perf_counter()
+    valid, rejected = batch.validate()
+    per_room = valid.group_by('room_id')
+    print(f'BookingBatch: {time.perf_counter() - start:.3f}s  {len(valid)} bookings, '
+          f'{len(rejected)} rejected, revenue {valid.revenue():,.2f}')
+    print('top room:', per_room['room_id'][per_room['revenue'].argmax()], f"{per_room['revenue'].max():,.2f}")
+
+    sample = 100_000
+    start = time.perf_counter()
+    revenue = 0.0
+    for i in range(sample):
+        if batch.nights[i] >= MIN_NIGHTS:
+            revenue += Booking(user_id=int(batch.user_id[i]), room_id=int(batch.room_id[i]),
+                               nights=int(batch.nights[i]), rate_per_night=float(batch.rate_per_night[i])).total_price
+    print(f'Booking per record: {time.perf_counter() - start:.3f}s for the first {sample} only')
+    print(valid[0])
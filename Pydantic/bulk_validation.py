@@ -0,0 +1,192 @@
+# validate millions of records without a Python loop of Model(**row)
+#
+# - records are read in chunks and each chunk is validated by one cached
+#   TypeAdapter(list[Model]) call, JSONL chunks straight from the raw bytes
+#   (validate_json, no json.loads per line)
+# - a bad record never raises: valid models and errors come back separately
+# - workers=4 validates chunks in 4 processes, results keep file order
+#
+#     for chunk in validate_file('products.jsonl', Model, workers=4):
+#         save(chunk.valid)
+#         log(chunk.errors)
+import csv
+import functools
+import json
+import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Union
+
+from typing_extensions import Annotated
+
+from pydantic import Field, TypeAdapter, ValidationError
+
+from Assignment_1 import Model
+from Assignment_2 import Employee
+from Assignment_3 import Booking
+
+MODELS = {'product': Model, 'employee': Employee, 'booking': Booking}
+
+
+@dataclass
+class ChunkResult:
+    start: int                                                  # line of the chunk's first record
+    valid: List[Any] = field(default_factory=list)              # models, or dicts with as_dict=True
+    errors: List[Dict[str, Any]] = field(default_factory=list)  # {'line': 7, 'errors': [...]}
+
+
+@functools.lru_cache(maxsize=None)
+def list_adapter(model):
+    # building the validator is the expensive part, so it happens once per model and process
+    return TypeAdapter(List[model])
+
+
+@functools.lru_cache(maxsize=None)
+def lenient_adapter(model):
+    # a record that is not a valid model falls through to Any and comes back
+    # as parsed data, so one bad record does not fail the whole chunk
+    return TypeAdapter(List[Annotated[Union[model, Any], Field(union_mode='left_to_right')]])
+
+
+@functools.lru_cache(maxsize=None)
+def row_adapter(model):
+    return TypeAdapter(model)
+
+
+def _record_errors(validate, line, record, result):
+    try:
+        result.valid.append(validate(record))
+    except ValidationError as e:
+        result.errors.append({'line': line, 'errors': e.errors(include_url=False)})
+
+
+def validate_chunk(model, numbered, is_json=True, as_dict=False):
+    # numbered: [(line, record)], records are raw JSON bytes or dicts
+    result = ChunkResult(numbered[0][0] if numbered else 0)
+    adapter = row_adapter(model)
+    try:
+        if is_json:
+            items = lenient_adapter(model).validate_json(b'[' + b','.join(record for _, record in numbered) + b']')
+        else:
+            items = lenient_adapter(model).validate_python([record for _, record in numbered])
+    except ValidationError:
+        # not valid JSON somewhere in the chunk, find the line
+        validate = adapter.validate_json if is_json else adapter.validate_python
+        for line, record in numbered:
+            _record_errors(validate, line, record, result)
+    else:
+        # only the records that fell through are validated again, to get their errors
+        for (line, _), item in zip(numbered, items):
+            if isinstance(item, model):
+                result.valid.append(item)
+            else:
+                _record_errors(adapter.validate_python, line, item, result)
+
+    if as_dict:
+        # plain dicts are much cheaper than models to send back from a worker
+        result.valid = list_adapter(model).dump_python(result.valid)
+    return result
+
+
+def validate_many(model, records, as_dict=False):
+    # in-memory records, like the data list of Assignment_1; 'line' is the list index
+    return validate_chunk(model, list(enumerate(records)), is_json=False, as_dict=as_dict)
+
+
+def read_jsonl_chunks(path, chunk_size):
+    chunk = []
+    with open(path, 'rb') as f:
+        for line, raw in enumerate(f, start=1):
+            raw = raw.strip()
+            if not raw:
+                continue
+            chunk.append((line, raw))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def read_csv_chunks(path, chunk_size):
+    chunk = []
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            # empty cells count as missing, so defaults like department='General' apply
+            chunk.append((reader.line_num, {k: v for k, v in row.items() if v != ''}))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_file(path, model, chunk_size=10_000, workers=None, as_dict=False):
+    # yields one ChunkResult per chunk, in file order
+    is_json = not path.endswith('.csv')
+    chunks = read_jsonl_chunks(path, chunk_size) if is_json else read_csv_chunks(path, chunk_size)
+
+    if not workers or workers == 1:
+        for chunk in chunks:
+            yield validate_chunk(model, chunk, is_json, as_dict)
+        return
+
+    # a few chunks in flight per worker keeps every process busy without
+    # reading the whole file ahead
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(validate_chunk, model, chunk, is_json, as_dict))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _write_products(path, count, bad_every=100):
+    with open(path, 'w', encoding='utf-8') as f:
+        for n in range(count):
+            record = {'id': n, 'name': f'Esp{n}', 'price': 500 + n % 400, 'in_stock': n % 3 != 0}
+            if n % bad_every == 0:
+                record['price'] = 'free'
+            f.write(json.dumps(record) + '\n')
+
+
+def benchmark(count=200_000, chunk_size=10_000):
+    path = os.path.join(tempfile.mkdtemp(), 'products.jsonl')
+    _write_products(path, count)
+
+    start = time.perf_counter()
+    valid = errors = 0
+    with open(path, 'rb') as f:
+        for raw in f:
+            try:
+                Model(**json.loads(raw))
+                valid += 1
+            except ValidationError:
+                errors += 1
+    print(f'Model(**row) loop:   {time.perf_counter() - start:.2f}s  {valid} valid, {errors} errors')
+
+    for workers in sorted({1, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        valid = errors = 0
+        for chunk in validate_file(path, Model, chunk_size, workers, as_dict=workers > 1):
+            valid += len(chunk.valid)
+            errors += len(chunk.errors)
+        print(f'validate_file x{workers}: {time.perf_counter() - start:.2f}s  {valid} valid, {errors} errors')
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    result = validate_many(Employee, [
+        {'id': 1, 'name': 'Riya Devaliya', 'salary': 25000},
+        {'id': 2, 'name': 'Al', 'salary': 5000},
+        {'id': 3, 'name': 'Kapil', 'department': 'Sales', 'salary': '18000'},
+    ])
+    print(result.valid)
+    print(result.errors)
+    benchmark()
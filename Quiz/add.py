@@ -3,10 +3,19 @@ from data import Question_bank
 def add_questions():
     question = input(f"Write question >> ").strip().capitalize()
     
-    if question in Question_bank:
-        print("This question already exists.")
+    duplicate = Question_bank.find_duplicate(question)
+    if duplicate:
+        print(f"This question already exists: {duplicate}")
         return 
     
+    similar = Question_bank.near_duplicates(question)
+    if similar:
+        print("Similar questions already exist:")
+        for que, score in similar[:3]:
+            print(f"  {que} ({score:.0%} alike)")
+        if input("Add it anyway? (y/n) ").strip().lower() != 'y':
+            return
+    
     options = []
     for i in range(1,5):
         choices = input(f"Enter option {i}: ").strip().capitalize()
@@ -25,5 +34,5 @@ def add_questions():
     options.remove(correct)
     options.insert(0, correct)
     
-    Question_bank[question] = options
+    Question_bank.add(question, options)
     
\ No newline at end of file
@@ -1,4 +1,11 @@
-Question_bank = {
+import os
+
+from store import QuestionStore
+
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'questions.db')
+
+# seeds questions.db the first time the quiz runs
+DEFAULT_QUESTIONS = {
     "What is the capital of Australia?": ["Canberra", "Sydney", "Melbourne", "Brisbane"],
     "Which country recently hosted the 2024 Summer Olympics?": ["France", "Japan", "USA", "Brazil"],
     "What is the currency of Japan?": ["Yen", "Won", "Dollar", "Ruble"],
@@ -10,3 +17,20 @@ Question_bank = {
     "Which city is known as the tech hub of India?": ["Bengaluru", "Hyderabad", "Mumbai", "Delhi"],
     "What is the capital of South Korea?": ["Seoul", "Busan", "Incheon", "Daegu"]
 }
+
+_bank = None
+
+
+def question_bank():
+    # the store is opened (and questions.db created) on first use, not on import
+    global _bank
+    if _bank is None:
+        _bank = QuestionStore(PATH, seed=DEFAULT_QUESTIONS)
+    return _bank
+
+
+def __getattr__(name):
+    # `from data import Question_bank` still works, and opens the store then
+    if name == 'Question_bank':
+        return question_bank()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,107 @@
+# quiz state without any input() or print(), so one process can run many quizzes
+#
+# a QuizSession only holds a reference to the shared questions, a seed and two
+# counters; question order and option shuffles are derived from the seed when
+# needed instead of being stored, which keeps a session around a hundred bytes
+#
+#     session = QuizSession(load_questions())
+#     view = session.current()          # number, question, [(label, option)]
+#     result = session.answer('b')      # correct?, score, finished?
+import random
+from array import array
+from collections import namedtuple
+from itertools import permutations
+from string import ascii_lowercase
+
+QuestionView = namedtuple('QuestionView', 'number total question options')
+# option_index: the chosen option's place in the bank's list (0 is correct), what scoring.py grades
+AnswerResult = namedtuple('AnswerResult', 'correct correct_answer chosen option_index score answered finished')
+
+# every ordering of up to 6 options, so a shuffle is one table lookup
+_PERMUTATIONS = {n: list(permutations(range(n))) for n in range(1, 7)}
+
+
+class InvalidOption(ValueError):
+    pass
+
+
+def load_questions(bank=None):
+    # one read of the bank, shared by every session: ((question, [correct, ...]), ...)
+    if bank is None:
+        from data import Question_bank as bank
+    return tuple(bank.items())
+
+
+class QuizSession:
+    __slots__ = ('questions', 'order', 'seed', 'position', 'score')
+
+    def __init__(self, questions, length=None, seed=None, shuffle_questions=False):
+        count = len(questions) if length is None else min(length, len(questions))
+        self.questions = questions
+        self.seed = random.getrandbits(32) if seed is None else seed
+        # bank order needs nothing stored; a sample stores 4 bytes per question
+        if shuffle_questions or count < len(questions):
+            self.order = array('I', random.Random(self.seed).sample(range(len(questions)), count))
+        else:
+            self.order = None
+        self.position = 0
+        self.score = 0
+
+    def __len__(self):
+        return len(self.questions) if self.order is None else len(self.order)
+
+    @property
+    def finished(self):
+        return self.position >= len(self)
+
+    def _options(self):
+        # shuffled options of the current question, the same on every call
+        question, options = self.questions[self.position if self.order is None else self.order[self.position]]
+        key = hash((self.seed, self.position))
+        table = _PERMUTATIONS.get(len(options))
+        if table is None:
+            shuffled = options[:]
+            random.Random(key).shuffle(shuffled)
+        else:
+            shuffled = [options[i] for i in table[key % len(table)]]
+        return question, options, list(zip(ascii_lowercase, shuffled))
+
+    def current(self):
+        if self.finished:
+            return None
+        question, _, labeled = self._options()
+        return QuestionView(self.position + 1, len(self), question, labeled)
+
+    def answer(self, label):
+        if self.finished:
+            raise InvalidOption('quiz already finished')
+        _, options, labeled = self._options()
+        correct = options[0]
+        chosen = dict(labeled).get(label.strip().lower())
+        if chosen is None:
+            raise InvalidOption(f"Please enter from the following {', '.join(label for label, _ in labeled)}")
+        self.position += 1
+        if chosen == correct:
+            self.score += 1
+        return AnswerResult(chosen == correct, correct, chosen, options.index(chosen), self.score, self.position,
+                            self.finished)
+
+
+# text for the console and the line protocol, same wording as the original quiz
+
+def render_question(view):
+    lines = [f"\n{view.number} {view.question}"]
+    lines += [f"{label} {option}" for label, option in view.options]
+    return '\n'.join(lines) + '\n'
+
+
+def render_answer(result):
+    if result.correct:
+        text = ":) Correct"
+    else:
+        text = f":( The correct answer was {result.correct_answer}, not {result.chosen}"
+    return f"{text}\nYou've scored {result.score} out of {result.answered}\n"
+
+
+def render_final(session):
+    return f"\nQuiz complete Final score: {session.score} out of {len(session)}\n"
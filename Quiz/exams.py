@@ -0,0 +1,134 @@
+# many different exams from one large bank, each reproducible from its seed
+#
+# an exam is two small arrays, never copies of questions:
+# - question_ids: which questions, drawn per stratum (topic or difficulty band)
+# - permutations: for every question the order its options are shown in,
+#   as indexes into the bank's option list (so 0 marks the correct answer)
+#
+#     strata = Question_bank.ids_by_topic()            # ids only, no question text
+#     batch = generate_exams(strata, {'capitals': 3, 'currency': 1}, exams=10_000, seed=7, workers=4)
+#     questions = exam_questions(Question_bank, batch, 42)
+#
+# exam i of a batch depends only on (seed, i), so it comes out the same whether
+# it was generated alone, in a batch, or by any worker process
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from string import ascii_lowercase
+
+import numpy as np
+
+
+@dataclass
+class ExamBatch:
+    seed: int
+    first: int                  # index of the batch's first exam
+    question_ids: np.ndarray    # exams x questions, int64
+    permutations: np.ndarray    # exams x questions x options, uint8
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def save(self, path):
+        np.savez_compressed(path, seed=self.seed, first=self.first,
+                            question_ids=self.question_ids, permutations=self.permutations)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(int(data['seed']), int(data['first']), data['question_ids'], data['permutations'])
+
+
+def difficulty_strata(question_ids, difficulty, edges=(0.4, 0.7)):
+    # bands of scoring.py's difficulty (share answering right): hard below 0.4, easy from 0.7
+    question_ids = np.asarray(question_ids)
+    band = np.digitize(difficulty, edges)
+    return {name: question_ids[band == i] for i, name in enumerate(('hard', 'medium', 'easy'))}
+
+
+def allocate(strata, questions):
+    # questions per stratum in proportion to its size (largest remainder)
+    sizes = {name: len(ids) for name, ids in strata.items() if len(ids)}
+    total = sum(sizes.values())
+    if questions > total:
+        raise ValueError(f'{questions} questions asked from a bank of {total}')
+    exact = {name: questions * size / total for name, size in sizes.items()}
+    counts = {name: int(share) for name, share in exact.items()}
+    for name in sorted(exact, key=lambda name: exact[name] - counts[name], reverse=True)[:questions - sum(counts.values())]:
+        counts[name] += 1
+    return counts
+
+
+def _exam(strata, counts, options, seed, index):
+    rng = np.random.default_rng([seed, index])
+    # strata in a fixed order (None is the untagged topic) so the draws don't depend on dict order
+    picked = [rng.choice(strata[name], size=count, replace=False)
+              for name, count in sorted(counts.items(), key=lambda item: str(item[0])) if count]
+    question_ids = rng.permutation(np.concatenate(picked))
+    permutations = np.argsort(rng.random((len(question_ids), options)), axis=1).astype(np.uint8)
+    return question_ids, permutations
+
+
+def _generate(strata, counts, options, seed, first, exams):
+    question_ids = np.empty((exams, sum(counts.values())), dtype=np.int64)
+    permutations = np.empty((exams, sum(counts.values()), options), dtype=np.uint8)
+    for i in range(exams):
+        question_ids[i], permutations[i] = _exam(strata, counts, options, seed, first + i)
+    return question_ids, permutations
+
+
+def generate_exams(strata, counts, exams, seed, options=4, first=0, workers=None, chunk=1000):
+    # counts: {stratum: questions}, or a total number spread with allocate()
+    if isinstance(counts, int):
+        counts = allocate(strata, counts)
+    for name, count in counts.items():
+        if count > len(strata.get(name, ())):
+            raise ValueError(f'stratum {name!r} has {len(strata.get(name, ()))} questions, {count} asked')
+
+    if not workers or workers == 1 or exams <= chunk:
+        question_ids, permutations = _generate(strata, counts, options, seed, first, exams)
+        return ExamBatch(seed, first, question_ids, permutations)
+
+    starts = range(first, first + exams, chunk)
+    with ProcessPoolExecutor(workers) as pool:
+        parts = list(pool.map(_generate, *zip(*[(strata, counts, options, seed, start, min(chunk, first + exams - start))
+                                                for start in starts])))
+    return ExamBatch(seed, first, np.concatenate([ids for ids, _ in parts]),
+                     np.concatenate([perms for _, perms in parts]))
+
+
+def exam_questions(store, batch, index):
+    # one exam as [(question, [(label, option)], correct label)], reading only its questions;
+    # questions with fewer options than the batch skip the missing ones, more is an error
+    position = index - batch.first
+    question_ids = batch.question_ids[position]
+    found = store.get_many(question_ids)
+    width = batch.permutations.shape[2]
+    exam = []
+    for question_id, permutation in zip(question_ids, batch.permutations[position]):
+        question, options = found[int(question_id)]
+        if len(options) > width:
+            raise ValueError(f'question {int(question_id)} has {len(options)} options, the batch was generated '
+                             f'for {width}; pass options={len(options)} to generate_exams')
+        shown = [options[i] for i in permutation if i < len(options)]
+        exam.append((question, list(zip(ascii_lowercase, shown)), ascii_lowercase[shown.index(options[0])]))
+    return exam
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    bank_ids = np.arange(1, 100_001)
+    strata = difficulty_strata(bank_ids, rng.beta(4, 3, len(bank_ids)))
+    counts = allocate(strata, 50)
+    print('questions per difficulty band:', counts)
+
+    for workers in sorted({1, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        batch = generate_exams(strata, counts, exams=20_000, seed=7, workers=workers)
+        print(f'{len(batch)} exams of {batch.question_ids.shape[1]} questions with {workers} worker(s): '
+              f'{time.perf_counter() - start:.2f}s, {(batch.question_ids.nbytes + batch.permutations.nbytes) / 1e6:.1f} MB')
+
+    again = generate_exams(strata, counts, exams=1, seed=7, first=12_345)
+    print('exam 12345 reproduced alone:', bool((again.question_ids[0] == batch.question_ids[12_345]).all()
+                                             and (again.permutations[0] == batch.permutations[12_345]).all()))
@@ -0,0 +1,157 @@
+# grade answer sheets in bulk and measure how well each question works
+#
+# an answer sheet is one row of option indices in the bank's own order, so
+# 0 is the correct answer of a Question_bank entry and -1 is unanswered:
+#
+#     analysis = ItemAnalysis(questions=10)
+#     scores = analysis.update(sheets)      # sheets: int array, takers x questions
+#     report = analysis.report()
+#
+# update() takes any number of chunks and keeps only per-question sums, so
+# score_file() grades files far larger than memory, 1M sheets in seconds.
+# report() gives, per question:
+# - difficulty: share of takers who got it right
+# - discrimination: correlation of the question with the rest of the test
+#   (item-rest point biserial); near zero or negative means a weak question
+# - choices: how often each option was picked, column 0 is unanswered,
+#   and the mean total score of the takers who picked it, which shows
+#   distractors that attract strong takers
+import time
+
+import numpy as np
+
+
+class ItemAnalysis:
+
+    def __init__(self, questions, options=4, key=None):
+        self.questions = questions
+        self.options = options
+        self.key = np.zeros(questions, dtype=np.int8) if key is None else np.asarray(key, dtype=np.int8)
+        self.takers = 0
+        self.score_sum = 0
+        self.score_squares = 0
+        self.correct = np.zeros(questions, dtype=np.int64)
+        self.correct_score = np.zeros(questions, dtype=np.int64)    # sum of total scores of takers right on the item
+        self.choices = np.zeros((questions, options + 1), dtype=np.int64)
+        self.choice_score = np.zeros((questions, options + 1), dtype=np.float64)
+        self.score_counts = np.zeros(questions + 1, dtype=np.int64)
+        # flat bincount slot of (question, choice): choice + 1 + question * (options + 1)
+        self._offsets = np.arange(questions, dtype=np.int64) * (options + 1) + 1
+
+    def update(self, sheets):
+        # grade one chunk of sheets; returns their scores
+        sheets = np.asarray(sheets)
+        if sheets.ndim != 2 or sheets.shape[1] != self.questions:
+            raise ValueError(f'expected sheets of {self.questions} answers, got shape {sheets.shape}')
+        if sheets.size and (sheets.min() < -1 or sheets.max() >= self.options):
+            raise ValueError(f'answers must be -1 (blank) or an option index below {self.options}')
+
+        right = sheets == self.key
+        scores = right.sum(axis=1, dtype=np.int64)
+        self.takers += len(sheets)
+        self.score_sum += int(scores.sum())
+        self.score_squares += int((scores * scores).sum())
+        self.correct += right.sum(axis=0)
+        self.correct_score += scores @ right
+
+        slots = (sheets.astype(np.int64) + self._offsets).ravel()
+        size = self.questions * (self.options + 1)
+        self.choices += np.bincount(slots, minlength=size).reshape(self.choices.shape)
+        self.choice_score += np.bincount(slots, weights=np.repeat(scores, self.questions).astype(np.float64),
+                                         minlength=size).reshape(self.choice_score.shape)
+        self.score_counts += np.bincount(scores, minlength=self.questions + 1)
+        return scores
+
+    def report(self):
+        n = self.takers
+        if not n:
+            raise ValueError('no answer sheets graded')
+        p = self.correct / n
+        mean = self.score_sum / n
+        variance = self.score_squares / n - mean ** 2
+
+        # item-rest correlation from the running sums, rest = score - item
+        rest_mean = (self.score_sum - self.correct) / n
+        rest_variance = (self.score_squares - 2 * self.correct_score + self.correct) / n - rest_mean ** 2
+        covariance = (self.correct_score - self.correct) / n - p * rest_mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            discrimination = covariance / np.sqrt(p * (1 - p) * rest_variance)
+            choice_mean_score = self.choice_score / self.choices
+        k = self.questions
+        return {
+            'takers': n,
+            'mean_score': mean,
+            'std_score': float(np.sqrt(variance)),
+            # KR-20 reliability of the whole test
+            'reliability': k / (k - 1) * (1 - (p * (1 - p)).sum() / variance) if k > 1 and variance else None,
+            'score_distribution': self.score_counts.copy(),
+            'difficulty': p,
+            'discrimination': discrimination,
+            'choices': self.choices / n,
+            'choice_mean_score': choice_mean_score,
+        }
+
+
+def iter_sheet_chunks(path, chunk_rows=100_000):
+    # .npy files are memory-mapped; CSV files hold one sheet per row with no header
+    # line, blank cells unanswered
+    if path.endswith('.npy'):
+        sheets = np.load(path, mmap_mode='r')
+        for start in range(0, len(sheets), chunk_rows):
+            yield np.asarray(sheets[start:start + chunk_rows])
+        return
+    import pandas as pd
+    for frame in pd.read_csv(path, header=None, chunksize=chunk_rows):
+        yield frame.fillna(-1).to_numpy(dtype=np.int8)
+
+
+def score_file(path, questions, options=4, key=None, chunk_rows=100_000, scores_path=None):
+    # grades a file chunk by chunk; scores_path receives one int16 per sheet (np.fromfile reads it back)
+    analysis = ItemAnalysis(questions, options, key)
+    out = open(scores_path, 'wb') if scores_path else None
+    try:
+        for chunk in iter_sheet_chunks(path, chunk_rows):
+            scores = analysis.update(chunk)
+            if out:
+                scores.astype(np.int16).tofile(out)
+    finally:
+        if out:
+            out.close()
+    return analysis
+
+
+def simulate_sheets(takers, questions, options=4, seed=0):
+    # takers with an ability, questions with a difficulty; weak takers guess more
+    rng = np.random.default_rng(seed)
+    ability = rng.normal(size=(takers, 1))
+    difficulty = rng.normal(size=questions)
+    knows = rng.random((takers, questions)) < 1 / (1 + np.exp(difficulty - ability))
+    guesses = rng.integers(0, options, size=(takers, questions))
+    sheets = np.where(knows, 0, guesses).astype(np.int8)
+    sheets[rng.random((takers, questions)) < 0.02] = -1
+    return sheets
+
+
+if __name__ == '__main__':
+    import os
+    import tempfile
+
+    takers, questions = 1_000_000, 50
+    path = os.path.join(tempfile.mkdtemp(), 'sheets.npy')
+    sheets = np.lib.format.open_memmap(path, mode='w+', dtype=np.int8, shape=(takers, questions))
+    for start in range(0, takers, 100_000):
+        sheets[start:start + 100_000] = simulate_sheets(100_000, questions, seed=start)
+    sheets.flush()
+    del sheets
+
+    start = time.perf_counter()
+    analysis = score_file(path, questions, scores_path=path + '.scores')
+    report = analysis.report()
+    print(f'graded {report["takers"]:,} sheets of {questions} questions in {time.perf_counter() - start:.2f}s')
+    print(f'mean {report["mean_score"]:.1f}, std {report["std_score"]:.1f}, KR-20 {report["reliability"]:.3f}')
+    np.set_printoptions(precision=2, suppress=True)
+    print('difficulty     ', report['difficulty'][:8])
+    print('discrimination ', report['discrimination'][:8])
+    print('choices of q1 (blank, a..d)', report['choices'][0])
+    os.remove(path)
+    os.remove(path + '.scores')
@@ -0,0 +1,155 @@
+# many players at once: one asyncio process, one QuizSession per TCP connection
+#
+# the protocol is plain lines, so `nc localhost 8765` is a working client:
+# the server sends a question and its options, the player answers with a
+# letter (or 'quit'), the server replies with the result and the next question
+#
+#     python server.py                   # serve on port 8765
+#     python server.py --bench 2000      # 2000 simulated players, answer latency
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+
+from engine import InvalidOption, QuizSession, load_questions, render_answer, render_final, render_question
+
+PROMPT = "Your Option __\n"
+
+
+class QuizServer:
+
+    def __init__(self, questions, length=None, shuffle_questions=False, idle_timeout=300):
+        self.questions = questions
+        self.length = length
+        self.shuffle_questions = shuffle_questions
+        self.idle_timeout = idle_timeout
+        self.active = 0
+        self.completed = 0
+        self.server = None
+
+    async def start(self, host='127.0.0.1', port=8765):
+        # backlog sized for a burst of connects
+        self.server = await asyncio.start_server(self.handle, host, port, backlog=4096)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def handle(self, reader, writer):
+        session = QuizSession(self.questions, self.length, shuffle_questions=self.shuffle_questions)
+        self.active += 1
+        try:
+            if session.finished:
+                writer.write(b"There are no questions in the bank yet\n")
+                await writer.drain()
+                return
+            writer.write((render_question(session.current()) + PROMPT).encode())
+            await writer.drain()
+            while not session.finished:
+                # an abandoned connection gives its session back after idle_timeout
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except ValueError:
+                    # a line over the stream limit; readline has dropped it from the buffer
+                    writer.write(f"Please answer with one letter\n{PROMPT}".encode())
+                    await writer.drain()
+                    continue
+                if not line or line.strip().lower() == b'quit':
+                    return
+                try:
+                    result = session.answer(line.decode(errors='replace'))
+                except InvalidOption as e:
+                    writer.write(f"{e}\n{PROMPT}".encode())
+                    await writer.drain()
+                    continue
+                reply = render_answer(result)
+                if not session.finished:
+                    reply += render_question(session.current()) + PROMPT
+                writer.write(reply.encode())
+                await writer.drain()
+            writer.write(render_final(session).encode())
+            await writer.drain()
+            self.completed += 1
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            self.active -= 1
+            writer.close()
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def _player(port, latencies, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            if line.decode() != PROMPT:
+                continue
+            start = time.perf_counter()
+            writer.write(rng.choice('abcd').encode() + b'\n')
+            # the reply is complete once the score line arrives
+            while not (await reader.readline()).startswith(b"You've scored"):
+                pass
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+def session_memory(questions, sessions=10_000):
+    # bytes held per session by the engine, sockets and buffers not counted
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [QuizSession(questions) for _ in range(sessions)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return used / sessions
+
+
+async def bench(players, questions, length=None):
+    # players run in this process and event loop too, so latency includes their share of the CPU
+    server = QuizServer(questions, length)
+    port = await server.start(port=0)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_player(port, latencies, n) for n in range(players)))
+    elapsed = time.perf_counter() - start
+    await server.close()
+
+    latencies.sort()
+    pick = lambda pct: latencies[min(len(latencies) - 1, int(pct / 100 * len(latencies)))] * 1000
+    print(f"{players} concurrent players, {server.completed} quizzes completed, {len(latencies)} answers "
+          f"in {elapsed:.2f}s ({len(latencies) / elapsed:,.0f} answers/s)")
+    print(f"answer latency ms: p50 {pick(50):.2f}  p90 {pick(90):.2f}  p99 {pick(99):.2f}  max {latencies[-1] * 1000:.2f}")
+    print(f"engine memory per session: {session_memory(questions):.0f} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the quiz to many players over TCP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--length', type=int, help="questions per quiz (default: the whole bank)")
+    parser.add_argument('--shuffle', action='store_true', help="shuffle question order per player")
+    parser.add_argument('--bench', type=int, metavar='PLAYERS', help="run simulated players instead of serving")
+    args = parser.parse_args()
+
+    questions = load_questions()
+    if args.bench:
+        asyncio.run(bench(args.bench, questions, args.length))
+        return
+
+    async def serve():
+        server = QuizServer(questions, args.length, args.shuffle)
+        port = await server.start(args.host, args.port)
+        print(f"Quiz server on {args.host}:{port} with {len(questions)} questions")
+        await server.server.serve_forever()
+
+    asyncio.run(serve())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,375 @@
+# question bank kept in a SQLite file, so added and updated questions survive restarts
+#
+# QuestionStore behaves like the old Question_bank dict (question -> [correct, 3 others]),
+# plus duplicate checks that stay fast with 100k questions:
+# - exact duplicates: questions are normalized (case, punctuation, spacing) and
+#   the normalized text's hash is a unique indexed column
+# - near duplicates: a MinHash signature over character 4-grams is split into
+#   bands; questions sharing a band bucket are candidates, and only those are
+#   compared, so a check looks at a handful of rows instead of the whole bank
+# - search: an inverted index (term, question_id) answers keyword and prefix
+#   queries, page() and search() page by id so every page costs the same
+# - every question has a stable id; update() edits in place and keeps its order
+# nothing is loaded at startup, opening the store is just opening the file
+# - seed questions go in once per file: a meta row records it, so a bank the
+#   user emptied stays empty
+import hashlib
+import json
+import re
+import sqlite3
+import unicodedata
+import zlib
+from collections.abc import MutableMapping
+
+import numpy as np
+
+SHINGLE_SIZE = 4
+NUM_PERM = 120
+BANDS = 20                      # 20 bands of 6 rows: pairs above ~0.6 similarity become candidates
+ROWS = NUM_PERM // BANDS
+NEAR_DUPLICATE = 0.7            # Jaccard similarity of shingles that counts as a near duplicate
+# words in nearly every question only make posting lists long, they are not indexed
+STOPWORDS = frozenset('a an and are for in is it of on or the to was'.split())
+
+_rng = np.random.default_rng(20240720)   # fixed seed: signatures must match across runs
+_A = _rng.integers(1, 2**63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2**63, NUM_PERM, dtype=np.uint64)
+
+
+class DuplicateQuestionError(ValueError):
+    pass
+
+
+def normalize(question):
+    text = unicodedata.normalize('NFKC', question).casefold()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return ' '.join(text.split())
+
+
+def terms(normalized):
+    return {word for word in normalized.split() if word not in STOPWORDS}
+
+
+def question_hash(normalized):
+    # signed 64 bits, what an SQLite INTEGER holds
+    return int.from_bytes(hashlib.blake2b(normalized.encode(), digest_size=8).digest(), 'big', signed=True)
+
+
+def shingles(normalized):
+    if len(normalized) <= SHINGLE_SIZE:
+        return {normalized}
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+
+def similarity(a, b):
+    a, b = shingles(a), shingles(b)
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def signature(normalized):
+    # one min per hash function; (a * x + b) wraps mod 2**64, the top 32 bits are the hash
+    x = np.fromiter((zlib.crc32(s.encode()) for s in shingles(normalized)), dtype=np.uint64)
+    hashed = (_A[:, None] * x[None, :] + _B[:, None]) >> np.uint64(32)
+    return hashed.min(axis=1).astype(np.uint32)
+
+
+def band_buckets(normalized):
+    # band number in the high bits, so one indexed column holds every band
+    sig = signature(normalized)
+    return [band << 32 | zlib.crc32(sig[band * ROWS:(band + 1) * ROWS].tobytes()) for band in range(BANDS)]
+
+
+class QuestionStore(MutableMapping):
+
+    def __init__(self, path, seed=None):
+        self.path = path
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS questions (
+                    id INTEGER PRIMARY KEY,
+                    question TEXT NOT NULL UNIQUE,
+                    normalized_hash INTEGER NOT NULL UNIQUE,
+                    options TEXT NOT NULL,
+                    topic TEXT
+                )
+            """)
+            if 'topic' not in {row[1] for row in self.conn.execute("PRAGMA table_info(questions)")}:
+                self.conn.execute("ALTER TABLE questions ADD COLUMN topic TEXT")  # a bank saved before topics
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS bands (
+                    bucket INTEGER NOT NULL,
+                    question_id INTEGER NOT NULL,
+                    PRIMARY KEY (bucket, question_id)
+                ) WITHOUT ROWID
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS terms (
+                    term TEXT NOT NULL,
+                    question_id INTEGER NOT NULL,
+                    PRIMARY KEY (term, question_id)
+                ) WITHOUT ROWID
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS terms_question ON terms (question_id, term)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        if seed:
+            self._seed(seed.items())
+        if not self.conn.execute("SELECT 1 FROM terms LIMIT 1").fetchone():
+            self._build_terms()  # a bank saved before search existed
+
+    # dict interface, what quiz.py / add.py / update.py use
+
+    def __getitem__(self, question):
+        row = self.conn.execute("SELECT options FROM questions WHERE question = ?", (question,)).fetchone()
+        if row is None:
+            raise KeyError(question)
+        return json.loads(row[0])
+
+    def __setitem__(self, question, options):
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            updated = self.conn.execute("UPDATE questions SET options = ? WHERE question = ?",
+                                        (json.dumps(options), question))
+            if not updated.rowcount:
+                self._insert(question, options)
+
+    def __delitem__(self, question):
+        row = self.conn.execute("SELECT id FROM questions WHERE question = ?", (question,)).fetchone()
+        if row is None:
+            raise KeyError(question)
+        self.delete(row[0])
+
+    def __contains__(self, question):
+        return self.conn.execute("SELECT 1 FROM questions WHERE question = ?", (question,)).fetchone() is not None
+
+    def __iter__(self):
+        for (question,) in self.conn.execute("SELECT question FROM questions ORDER BY id"):
+            yield question
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+
+    def items(self):
+        return [(question, json.loads(options))
+                for question, options in self.conn.execute("SELECT question, options FROM questions ORDER BY id")]
+
+    # by id: stable across edits, and what search results and pages refer to
+
+    def get_by_id(self, question_id):
+        # (question, options) or None
+        row = self.conn.execute("SELECT question, options FROM questions WHERE id = ?", (question_id,)).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def page(self, after_id=0, limit=20):
+        # [(id, question, options)] after the given id; pass the last id back for the next page
+        rows = self.conn.execute("SELECT id, question, options FROM questions WHERE id > ? ORDER BY id LIMIT ?",
+                                 (after_id, limit))
+        return [(question_id, question, json.loads(options)) for question_id, question, options in rows]
+
+    def search(self, text, limit=20, after_id=0, prefix=True):
+        # questions containing every word of text, the last word as a prefix
+        # ('capital can' finds 'capital of Canada'); paged like page()
+        words = [word for word in normalize(text).split() if word not in STOPWORDS]
+        if not words:
+            return []
+        last = words.pop() if prefix else None
+        exact = sorted(set(words), key=len, reverse=True)
+
+        # walk the posting list of one term in id order and check the others by
+        # index lookup; a long word is the likely shortest list
+        if exact:
+            driver, driver_params = "t.term = ?", [exact.pop(0)]
+        else:
+            driver, driver_params = "t.term >= ? AND t.term < ?", [last, last + '\U0010ffff']
+            last = None
+        checks = ["EXISTS (SELECT 1 FROM terms WHERE question_id = t.question_id AND term = ?)"] * len(exact)
+        check_params = exact
+        if last is not None:
+            checks.append("EXISTS (SELECT 1 FROM terms WHERE question_id = t.question_id AND term >= ? AND term < ?)")
+            check_params += [last, last + '\U0010ffff']
+        rows = self.conn.execute(f"""
+            SELECT DISTINCT q.id, q.question, q.options FROM terms t JOIN questions q ON q.id = t.question_id
+            WHERE {driver} AND t.question_id > ? {''.join(' AND ' + check for check in checks)}
+            ORDER BY t.question_id LIMIT ?
+        """, driver_params + [after_id] + check_params + [limit])
+        return [(question_id, question, json.loads(options)) for question_id, question, options in rows]
+
+    def get_many(self, question_ids):
+        # {id: (question, options)} for a selection, e.g. the questions of one exam
+        found = {}
+        question_ids = [int(question_id) for question_id in question_ids]
+        for start in range(0, len(question_ids), 500):
+            chunk = question_ids[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT id, question, options FROM questions WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+            found.update((question_id, (question, json.loads(options))) for question_id, question, options in rows)
+        return found
+
+    def ids_by_topic(self):
+        # {topic: sorted array of ids}, None for questions without a topic; reads ids only, no text
+        grouped = {}
+        for topic, question_id in self.conn.execute("SELECT topic, id FROM questions ORDER BY id"):
+            grouped.setdefault(topic, []).append(question_id)
+        return {topic: np.array(ids, dtype=np.int64) for topic, ids in grouped.items()}
+
+    def update(self, question_id, question=None, options=None, topic=None):
+        # edit in place: the id and position stay; raises KeyError or DuplicateQuestionError
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            row = self.conn.execute("SELECT question FROM questions WHERE id = ?", (question_id,)).fetchone()
+            if row is None:
+                raise KeyError(question_id)
+            if options is not None:
+                self.conn.execute("UPDATE questions SET options = ? WHERE id = ?", (json.dumps(options), question_id))
+            if topic is not None:
+                self.conn.execute("UPDATE questions SET topic = ? WHERE id = ?", (topic or None, question_id))
+            if question is not None and question != row[0]:
+                normalized = normalize(question)
+                try:
+                    self.conn.execute("UPDATE questions SET question = ?, normalized_hash = ? WHERE id = ?",
+                                      (question, question_hash(normalized), question_id))
+                except sqlite3.IntegrityError:
+                    raise DuplicateQuestionError(f'already in the bank: {self.find_duplicate(question)!r}') from None
+                self._unindex(question_id, normalize(row[0]))
+                self._index(question_id, normalized)
+
+    def delete(self, question_id):
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            row = self.conn.execute("SELECT question FROM questions WHERE id = ?", (question_id,)).fetchone()
+            if row is None:
+                raise KeyError(question_id)
+            self._unindex(question_id, normalize(row[0]))
+            self.conn.execute("DELETE FROM questions WHERE id = ?", (question_id,))
+
+    # duplicate checks
+
+    def find_duplicate(self, question):
+        # the stored question that normalizes the same way, or None
+        row = self.conn.execute("SELECT question FROM questions WHERE normalized_hash = ?",
+                                (question_hash(normalize(question)),)).fetchone()
+        return row[0] if row else None
+
+    def near_duplicates(self, question, threshold=NEAR_DUPLICATE):
+        # [(stored question, similarity)], most similar first
+        normalized = normalize(question)
+        buckets = band_buckets(normalized)
+        rows = self.conn.execute(f"""
+            SELECT question FROM questions WHERE id IN (
+                SELECT question_id FROM bands WHERE bucket IN ({', '.join('?' * len(buckets))})
+            )
+        """, buckets)
+        matches = []
+        for (candidate,) in rows:
+            score = similarity(normalized, normalize(candidate))
+            if score >= threshold:
+                matches.append((candidate, score))
+        return sorted(matches, key=lambda match: -match[1])
+
+    def add(self, question, options, topic=None):
+        # insert a new question; raises DuplicateQuestionError for an exact duplicate
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            return self._insert(question, options, topic)
+
+    def add_many(self, questions):
+        # bulk import in one transaction, exact duplicates are skipped; returns the count added
+        added = 0
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            for question, options in questions:
+                try:
+                    self._insert(question, options)
+                    added += 1
+                except DuplicateQuestionError:
+                    pass
+        return added
+
+    def _seed(self, questions):
+        # the first open of a file seeds it; a bank saved before the meta table
+        # counts as seeded if it has questions
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            if self.conn.execute("SELECT 1 FROM meta WHERE key = 'seeded'").fetchone():
+                return
+            if not self.conn.execute("SELECT 1 FROM questions LIMIT 1").fetchone():
+                for question, options in questions:
+                    try:
+                        self._insert(question, options)
+                    except DuplicateQuestionError:
+                        pass
+            self.conn.execute("INSERT INTO meta VALUES ('seeded', '1')")
+
+    def _insert(self, question, options, topic=None):
+        normalized = normalize(question)
+        try:
+            cursor = self.conn.execute(
+                "INSERT INTO questions (question, normalized_hash, options, topic) VALUES (?, ?, ?, ?)",
+                (question, question_hash(normalized), json.dumps(options), topic))
+        except sqlite3.IntegrityError:
+            raise DuplicateQuestionError(f'already in the bank: {self.find_duplicate(question)!r}') from None
+        self._index(cursor.lastrowid, normalized)
+        return cursor.lastrowid
+
+    def _index(self, question_id, normalized):
+        self.conn.executemany("INSERT OR IGNORE INTO bands VALUES (?, ?)",
+                              [(bucket, question_id) for bucket in band_buckets(normalized)])
+        self.conn.executemany("INSERT OR IGNORE INTO terms VALUES (?, ?)",
+                              [(term, question_id) for term in terms(normalized)])
+
+    def _unindex(self, question_id, normalized):
+        self.conn.executemany("DELETE FROM bands WHERE bucket = ? AND question_id = ?",
+                              [(bucket, question_id) for bucket in band_buckets(normalized)])
+        self.conn.execute("DELETE FROM terms WHERE question_id = ?", (question_id,))
+
+    def _build_terms(self):
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            for question_id, question in self.conn.execute("SELECT id, question FROM questions").fetchall():
+                self.conn.executemany("INSERT OR IGNORE INTO terms VALUES (?, ?)",
+                                      [(term, question_id) for term in terms(normalize(question))])
+
+    def close(self):
+        self.conn.close()
+
+
+if __name__ == '__main__':
+    import os
+    import random
+    import tempfile
+    import time
+
+    words = ('capital currency language population river mountain president city country largest '
+             'official smallest oldest longest highest famous national').split()
+    places = [f'Country{n}' for n in range(5000)]
+    rng = random.Random(0)
+    bank = {f'What is the {rng.choice(words)} {rng.choice(words)} of {rng.choice(places)} in {year}?':
+            ['A', 'B', 'C', 'D'] for year in range(100_000)}
+
+    path = os.path.join(tempfile.mkdtemp(), 'questions.db')
+    start = time.perf_counter()
+    store = QuestionStore(path)
+    print(f'imported {store.add_many(bank.items())} questions in {time.perf_counter() - start:.1f}s')
+    store.close()
+
+    start = time.perf_counter()
+    store = QuestionStore(path)
+    print(f'startup with {len(store)} questions: {(time.perf_counter() - start) * 1000:.1f}ms')
+
+    start = time.perf_counter()
+    found = store.search('oldest country33')
+    last_page = store.page(after_id=99_980)
+    print(f'search ({len(found)} hits) + last page: {(time.perf_counter() - start) * 1000:.1f}ms')
+
+    probe = next(iter(bank))
+    start = time.perf_counter()
+    duplicate = store.find_duplicate(probe.upper().rstrip('?'))
+    near = store.near_duplicates(probe.replace('What is', 'Whats'))
+    print(f'exact + near duplicate check: {(time.perf_counter() - start) * 1000:.1f}ms')
+    buckets = band_buckets(normalize(probe))
+    candidates = store.conn.execute(f"SELECT COUNT(DISTINCT question_id) FROM bands WHERE bucket IN ({', '.join('?' * len(buckets))})", buckets).fetchone()[0]
+    print(f'{candidates} candidates compared')
+    print(duplicate)
+    print(near[:3])
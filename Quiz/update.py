@@ -1,16 +1,35 @@
 from data import Question_bank
+from store import DuplicateQuestionError
+
+PAGE_SIZE = 10
 
 def update_questions():
-    question = list(Question_bank.keys())  
+    text = input("Search questions (Enter to list all) >> ").strip()
     
-    for num, que in enumerate(question):
-        print(f"\n{num} {que}?") 
+    # one page at a time, by id, so a large bank is never printed or loaded whole
+    after = 0
+    while True:
+        if text:
+            rows = Question_bank.search(text, limit=PAGE_SIZE, after_id=after)
+        else:
+            rows = Question_bank.page(after_id=after, limit=PAGE_SIZE)
+        for que_id, que, _ in rows:
+            print(f"\n{que_id} {que}")
+        if not rows:
+            print("No more questions.")
+        
+        choice = input("Select question id to update, n for next page ").strip().lower()
+        if choice == 'n' and rows:
+            after = rows[-1][0]
+            continue
+        break
     
     try:
-        no = int(input("Select question number to update "))
-        que_update = question[no]
-        opt_update = Question_bank[que_update]
-    except (ValueError, IndexError):
+        que_id = int(choice)
+    except ValueError:
+        print("Invalid selection.")
+        return
+    if Question_bank.get_by_id(que_id) is None:
         print("Invalid selection.")
         return
     
@@ -18,8 +37,11 @@ def update_questions():
     def q():
         new = input(f"Write question >>").strip().capitalize()
         
-        Question_bank[new] = opt_update
-        del Question_bank[que_update]
+        try:
+            Question_bank.update(que_id, question=new)
+        except DuplicateQuestionError as e:
+            print(f"Not updated, {e}")
+            return
         print("Question updated")
         
     def o():
@@ -35,7 +57,7 @@ def update_questions():
 
         new.remove(correct)
         new.insert(0, correct)
-        Question_bank[que_update] = new
+        Question_bank.update(que_id, options=new)
         print("Options updated")
             
     def b():
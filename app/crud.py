@@ -1,12 +1,15 @@
 """xReusable CRUD Module for PostgreSQL"""
 import os
 import logging
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Type, Union
 from contextlib import contextmanager
+from functools import lru_cache
 import psycopg2
-from psycopg2.extras import RealDictCursor
+import psycopg2.extensions
+from psycopg2.extras import RealDictCursor, execute_values
 from psycopg2.pool import ThreadedConnectionPool
 from dataclasses import dataclass
+from pydantic import BaseModel
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,6 +26,38 @@ class DatabaseConfig:
     min_connections: int = 1
     max_connections: int = 20
 
+@lru_cache(maxsize=None)
+def row_mapper(model: Type, columns: Tuple[str, ...]) -> Callable[[Sequence[Any]], Any]:
+    """Compile a function building `model` instances from tuple rows without validation
+
+    Only for rows the database has already typed. When the columns are exactly
+    the fields of a frozen model, instances are assembled directly; otherwise
+    (extra or missing columns, private attributes) this falls back to model_construct.
+    """
+    fields = set(model.model_fields)
+    if set(columns) != fields or not model.model_config.get('frozen') or model.__private_attributes__:
+        return lambda row: model.model_construct(**dict(zip(columns, row)))
+
+    # What model_construct does per row, minus defaults and aliases. Frozen models
+    # cannot be assigned to, so every instance can share one fields-set.
+    new = object.__new__
+    set_dict = object.__setattr__
+    slots = BaseModel.__dict__
+    set_fields_set = slots['__pydantic_fields_set__'].__set__
+    set_extra = slots['__pydantic_extra__'].__set__
+    set_private = slots['__pydantic_private__'].__set__
+    fields_set = set(columns)
+
+    def build(row):
+        instance = new(model)
+        set_dict(instance, '__dict__', dict(zip(columns, row)))
+        set_fields_set(instance, fields_set)
+        set_extra(instance, None)
+        set_private(instance, None)
+        return instance
+
+    return build
+
 class CRUDManager:
    
     def __init__(self, config: DatabaseConfig):
@@ -65,6 +100,14 @@ class CRUDManager:
             if conn:
                 self.pool.putconn(conn)
     
+    @contextmanager
+    def transaction(self):
+        """A cursor whose statements are committed together, or rolled back on error"""
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                yield cursor
+            conn.commit()
+    
     def execute_query(self, query: str, params: Optional[tuple] = None, fetch: bool = True) -> Optional[List[Dict]]:
 
         with self.get_connection() as conn:
@@ -77,6 +120,32 @@ class CRUDManager:
                     conn.commit()
                     return None
     
+    def fetch_models(self, query: str, model: Type, params: Optional[tuple] = None) -> List[Any]:
+        """Run a query and map its rows to `model` instances, skipping validation"""
+        with self.get_connection() as conn:
+            # a plain cursor returns tuples, no dict is built per row
+            with conn.cursor(cursor_factory=psycopg2.extensions.cursor) as cursor:
+                cursor.execute(query, params)
+                build = row_mapper(model, tuple(column.name for column in cursor.description))
+                return [build(row) for row in cursor.fetchall()]
+    
+    def iter_models(self, query: str, model: Type, params: Optional[tuple] = None,
+                    batch_size: int = 1000) -> Iterator[Any]:
+        """Stream a query's rows as `model` instances through a server-side cursor"""
+        with self.get_connection() as conn:
+            with conn.cursor(name=f"iter_models_{id(conn)}", cursor_factory=psycopg2.extensions.cursor) as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(query, params)
+                build = None
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    if build is None:
+                        build = row_mapper(model, tuple(column.name for column in cursor.description))
+                    for row in rows:
+                        yield build(row)
+    
     def create_item(self, table: str, data: Dict[str, Any]) -> Dict[str, Any]:
 
         if not data:
@@ -95,16 +164,33 @@ class CRUDManager:
         result = self.execute_query(query, tuple(data.values()))
         return result[0] if result else None
     
-    def get_item(self, table: str, item_id: Any, id_column: str = 'id') -> Optional[Dict[str, Any]]:
+    def get_item(self, table: str, item_id: Any, id_column: str = 'id',
+                 model: Optional[Type] = None) -> Optional[Union[Dict[str, Any], Any]]:
        
         query = f"SELECT * FROM {table} WHERE {id_column} = %s"
-        result = self.execute_query(query, (item_id,))
+        if model is not None:
+            result = self.fetch_models(query, model, (item_id,))
+        else:
+            result = self.execute_query(query, (item_id,))
         return result[0] if result else None
     
     def get_items(self, table: str, conditions: Optional[Dict[str, Any]] = None, 
                   limit: Optional[int] = None, offset: Optional[int] = None,
-                  order_by: Optional[str] = None) -> List[Dict[str, Any]]:
-       
+                  order_by: Optional[str] = None, model: Optional[Type] = None) -> List[Union[Dict[str, Any], Any]]:
+        """Rows as dicts, or as `model` instances (see app/models.py) when a model is given"""
+        query, params = self._select_query(table, conditions, limit, offset, order_by)
+        if model is not None:
+            return self.fetch_models(query, model, params)
+        return self.execute_query(query, params)
+    
+    def iter_items(self, table: str, model: Type, conditions: Optional[Dict[str, Any]] = None,
+                   order_by: Optional[str] = None, batch_size: int = 1000) -> Iterator[Any]:
+        """Stream a whole table as `model` instances without loading it into memory"""
+        query, params = self._select_query(table, conditions, None, None, order_by)
+        return self.iter_models(query, model, params, batch_size)
+    
+    def _select_query(self, table: str, conditions: Optional[Dict[str, Any]], limit: Optional[int],
+                      offset: Optional[int], order_by: Optional[str]) -> Tuple[str, Optional[tuple]]:
         query = f"SELECT * FROM {table}"
         params = []
         
@@ -124,7 +210,7 @@ class CRUDManager:
         if offset:
             query += f" OFFSET {offset}"
         
-        return self.execute_query(query, tuple(params) if params else None)
+        return query, tuple(params) if params else None
     
     def update_item(self, table: str, item_id: Any, data: Dict[str, Any], 
                     id_column: str = 'id') -> Optional[Dict[str, Any]]:
@@ -151,6 +237,48 @@ class CRUDManager:
         result = self.execute_query(query, tuple(params))
         return result[0] if result else None
     
+    def upsert_items(self, table: str, rows: Sequence[Dict[str, Any]], conflict_columns: Sequence[str],
+                     increment_columns: Sequence[str] = (), cursor=None, page_size: int = 1000) -> int:
+        """Insert rows, updating the ones whose conflict_columns already exist, one statement per page
+
+        Columns in increment_columns are added to the stored value instead of
+        replacing it. Rows must have distinct conflict keys (Postgres rejects a
+        statement that updates the same row twice), so merge them first.
+        """
+        if not rows:
+            return 0
+        columns = list(rows[0])
+        updates = [f"{column} = {table}.{column} + EXCLUDED.{column}" if column in increment_columns
+                   else f"{column} = EXCLUDED.{column}"
+                   for column in columns if column not in conflict_columns]
+        action = f"UPDATE SET {', '.join(updates)}" if updates else "NOTHING"
+        query = f"""
+            INSERT INTO {table} ({', '.join(columns)}) VALUES %s
+            ON CONFLICT ({', '.join(conflict_columns)}) DO {action}
+        """
+        values = [tuple(row[column] for column in columns) for row in rows]
+        
+        if cursor is not None:
+            execute_values(cursor, query, values, page_size=page_size)
+        else:
+            with self.transaction() as cursor:
+                execute_values(cursor, query, values, page_size=page_size)
+        return len(values)
+    
+    def delete_items(self, table: str, keys: Sequence[tuple], key_columns: Sequence[str],
+                     cursor=None, page_size: int = 1000) -> int:
+        """Delete the rows whose key_columns match any of `keys`, one statement per page"""
+        if not keys:
+            return 0
+        query = f"DELETE FROM {table} WHERE ({', '.join(key_columns)}) IN (VALUES %s)"
+        
+        if cursor is not None:
+            execute_values(cursor, query, keys, page_size=page_size)
+        else:
+            with self.transaction() as cursor:
+                execute_values(cursor, query, keys, page_size=page_size)
+        return len(keys)
+    
     def delete_item(self, table: str, item_id: Any, id_column: str = 'id') -> bool:
         
         query = f"DELETE FROM {table} WHERE {id_column} = %s"
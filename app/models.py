@@ -0,0 +1,63 @@
+"""Typed row models for the tables in init.sql"""
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Type
+
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+
+class UserRow(BaseModel):
+    """A row of `users`, as psycopg2 returns it"""
+    # Frozen: rows are read-only results, and CRUDManager's row mapper relies on it
+    model_config = ConfigDict(frozen=True)
+
+    id: int
+    name: str
+    email: str
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class ProductRow(BaseModel):
+    """A row of `products`, as psycopg2 returns it (DECIMAL comes back as Decimal)"""
+    model_config = ConfigDict(frozen=True)
+
+    id: int
+    name: str
+    description: Optional[str] = None
+    price: Optional[Decimal] = None
+    stock_quantity: Optional[int] = 0
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+TABLE_MODELS = {
+    'users': UserRow,
+    'products': ProductRow
+}
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+def iter_json(rows: Iterable[BaseModel], batch_size: int = 500) -> Iterator[bytes]:
+    """Serialize rows of one model as a JSON array, a batch at a time
+
+    Suits streaming responses: memory stays at one batch however many rows
+    the iterable yields, and each batch is a single dump_json call instead of
+    one model_dump_json per row.
+    """
+    yield b'['
+    batch = []
+    first = True
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield (b'' if first else b',') + _list_adapter(type(batch[0])).dump_json(batch)[1:-1]
+            batch = []
+            first = False
+    if batch:
+        yield (b'' if first else b',') + _list_adapter(type(batch[0])).dump_json(batch)[1:-1]
+    yield b']'
+
+def dump_json(rows: Iterable[BaseModel], batch_size: int = 500) -> bytes:
+    """The whole JSON array at once"""
+    return b''.join(iter_json(rows, batch_size))
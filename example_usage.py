@@ -10,6 +10,8 @@ in different scenarios and applications.
 import os
 from dotenv import load_dotenv
 from CRUD.app.crud import CRUDManager, DatabaseConfig, create_crud_manager_from_env
+from CRUD.app.models import ProductRow, UserRow, iter_json
+from CRUD.app.pricing import CartPricing
 
 # Load environment variables
 load_dotenv()
@@ -136,6 +138,56 @@ def example_product_management():
     finally:
         crud.close()
 
+def example_typed_rows():
+    """Typed row models example"""
+    print("\n=== Typed Rows Example ===")
+    
+    crud = create_crud_manager_from_env()
+    
+    try:
+        # Rows come back as model instances, built without re-validation
+        print("\n1. Getting products as ProductRow models...")
+        products = crud.get_items('products', order_by='name', model=ProductRow)
+        for product in products:
+            print(f"  - {product.name}: ${product.price} (Stock: {product.stock_quantity})")
+        
+        # Stream a table straight to JSON, one batch of rows in memory at a time
+        print("\n2. Streaming users as JSON...")
+        for chunk in iter_json(crud.iter_items('users', UserRow, order_by='id')):
+            print(chunk.decode())
+        
+    except Exception as e:
+        print(f"Error: {e}")
+    finally:
+        crud.close()
+
+def example_cart_pricing():
+    """Batch cart pricing example"""
+    print("\n=== Cart Pricing Example ===")
+    
+    crud = create_crud_manager_from_env()
+    
+    try:
+        # One price index for all carts, loaded from products once
+        pricing = CartPricing(crud)
+        carts = [
+            {'user_id': 1, 'items': ['Laptop', 'Mouse']},
+            {'user_id': 2, 'items': ['Keyboard', 'Mouse', 'Mouse', 'Monitor']},
+        ]
+        priced = pricing.price_carts(carts)
+        print(f"\n1. Priced with index version {priced.version}:")
+        for n, (cart, total) in enumerate(zip(carts, priced.totals)):
+            print(f"  - user {cart['user_id']}: ${total} (not priced: {priced.unpriced_items(n) or 'none'})")
+        
+        # Later refreshes only read products changed since the last one
+        print("\n2. Refreshing prices...")
+        print(f"Index version now {pricing.refresh().version}")
+        
+    except Exception as e:
+        print(f"Error: {e}")
+    finally:
+        crud.close()
+
 def example_with_custom_config():
     """Example using custom database configuration"""
     print("\n=== Custom Configuration Example ===")
@@ -207,6 +259,8 @@ if __name__ == "__main__":
     example_basic_usage()
     example_advanced_queries()
     example_product_management()
+    example_typed_rows()
+    example_cart_pricing()
     example_with_custom_config()
     example_table_creation()
     
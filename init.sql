@@ -2,6 +2,7 @@
 
 -- Create extensions if needed
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
 
 -- Create a sample table for testing
 CREATE TABLE IF NOT EXISTS users (
@@ -39,6 +40,29 @@ FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 CREATE TRIGGER update_products_updated_at BEFORE UPDATE ON products
 FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Create a function to publish changed row ids for the app's live views
+CREATE OR REPLACE FUNCTION notify_row_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    row_id INTEGER;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        row_id = OLD.id;
+    ELSE
+        row_id = NEW.id;
+    END IF;
+    PERFORM pg_notify('table_changes', json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'id', row_id)::text);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Create triggers for change notifications
+CREATE TRIGGER notify_users_change AFTER INSERT OR UPDATE OR DELETE ON users
+FOR EACH ROW EXECUTE FUNCTION notify_row_change();
+
+CREATE TRIGGER notify_products_change AFTER INSERT OR UPDATE OR DELETE ON products
+FOR EACH ROW EXECUTE FUNCTION notify_row_change();
+
 -- Insert some sample data
 INSERT INTO users (name, email) VALUES 
     ('Alice Johnson', 'alice@example.com'),
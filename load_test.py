@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Load test for the Streamlit CRUD application
+============================================
+
+Simulates concurrent operators by replaying the page flows of
+streamlit_app.py (view, add, update, delete, info) through the same
+data-access functions the pages call, then reports throughput, latency
+percentiles and connection counts.
+
+The request mix is a JSONL file, one flow per line:
+
+    {"flow": "view", "weight": 50, "table": "users"}
+    {"flow": "update", "weight": 10, "submit": true}
+
+Usage:
+    DB_HOST=localhost python load_test.py --users 200 --duration 60 --mix load_mix.jsonl
+"""
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+import psycopg2
+
+import streamlit_app as app
+
+# The pages' st.* calls have no session in these threads; drop the bare-mode warnings
+class _BareModeFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        return 'missing ScriptRunContext' not in record.getMessage()
+
+for name in list(logging.root.manager.loggerDict):
+    if name.startswith('streamlit'):
+        logging.getLogger(name).addFilter(_BareModeFilter())
+
+FLOWS = ['view', 'add', 'update', 'delete', 'info']
+TABLES = ['users', 'products']
+LOADTEST_PREFIX = 'loadtest-'
+
+DEFAULT_MIX = [
+    {'flow': 'view', 'weight': 50},
+    {'flow': 'add', 'weight': 10},
+    {'flow': 'update', 'weight': 15, 'submit': True},
+    {'flow': 'delete', 'weight': 10, 'submit': True},
+    {'flow': 'info', 'weight': 15}
+]
+
+def load_mix(path: Optional[str]) -> List[Dict[str, Any]]:
+    """Read flow definitions from a JSONL file"""
+    if not path:
+        return DEFAULT_MIX
+
+    mix = []
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            step = json.loads(line)
+            if step.get('flow') not in FLOWS:
+                raise ValueError(f"{path}:{line_number}: 'flow' must be one of {', '.join(FLOWS)}")
+            if step.get('table') not in (None, *TABLES):
+                raise ValueError(f"{path}:{line_number}: 'table' must be one of {', '.join(TABLES)}")
+            step.setdefault('weight', 1)
+            mix.append(step)
+
+    if not mix:
+        raise ValueError(f"{path}: no flows defined")
+    return mix
+
+# Page flows, mirroring what each page of streamlit_app.py queries on render
+
+def view_flow(rng: random.Random, step: Dict[str, Any]) -> bool:
+    table = step.get('table') or rng.choice(TABLES)
+    return app.fetch_table(table) is not None
+
+def add_flow(rng: random.Random, step: Dict[str, Any]) -> bool:
+    table = step.get('table') or rng.choice(TABLES)
+    tag = f"{LOADTEST_PREFIX}{uuid.uuid4().hex[:12]}"
+    if table == 'users':
+        return app.insert_user(tag, f"{tag}@example.com") is not None
+    return app.insert_product(tag, "Created by load_test.py", round(rng.uniform(1, 500), 2), rng.randint(0, 100)) is not None
+
+def update_flow(rng: random.Random, step: Dict[str, Any]) -> bool:
+    table = step.get('table') or rng.choice(TABLES)
+    rows = app.list_users() if table == 'users' else app.list_products()
+    if rows is None:
+        return False
+    if not rows:
+        return True
+
+    row_id = rng.choice(rows)['id']
+    current = app.get_user(row_id) if table == 'users' else app.get_product(row_id)
+    if not current or not step.get('submit'):
+        return current is not None
+
+    # Submitting rewrites the row with its current values, so data is unchanged
+    row = current[0]
+    if table == 'users':
+        return app.update_user(row_id, row['name'], row['email']) is not None
+    return app.update_product(row_id, row['name'], row['description'], row['price'], row['stock_quantity']) is not None
+
+def delete_flow(rng: random.Random, step: Dict[str, Any]) -> bool:
+    table = step.get('table') or rng.choice(TABLES)
+    rows = app.list_users() if table == 'users' else app.list_products()
+    if rows is None:
+        return False
+    if not step.get('submit'):
+        return True
+
+    # Only rows created by the load test are ever deleted
+    own_rows = [row for row in rows if row['name'].startswith(LOADTEST_PREFIX)]
+    if not own_rows:
+        return True
+    row_id = rng.choice(own_rows)['id']
+    result = app.delete_user(row_id) if table == 'users' else app.delete_product(row_id)
+    return result is not None
+
+def info_flow(rng: random.Random, step: Dict[str, Any]) -> bool:
+    conn = app.db.get_connection()
+    if not conn:
+        return False
+    conn.close()
+    results = [app.count_rows('users'), app.count_rows('products'),
+               app.get_recent_users(), app.get_recent_products()]
+    return all(result is not None for result in results)
+
+FLOW_FUNCTIONS: Dict[str, Callable[[random.Random, Dict[str, Any]], bool]] = {
+    'view': view_flow,
+    'add': add_flow,
+    'update': update_flow,
+    'delete': delete_flow,
+    'info': info_flow
+}
+
+class LoadTest:
+    """Runs simulated users against the app's data-access functions"""
+
+    def __init__(self, mix: List[Dict[str, Any]], users: int, duration: float,
+                 think_time: float = 0.0, seed: int = 0):
+        self.mix = mix
+        self.users = users
+        self.duration = duration
+        self.think_time = think_time
+        self.seed = seed
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {step['flow']: [] for step in mix}
+        self.errors: Dict[str, int] = {step['flow']: 0 for step in mix}
+        self.server_connections: List[int] = []
+        self.elapsed = 0.0
+
+    def simulate_user(self, number: int):
+        rng = random.Random(self.seed + number)
+        weights = [step['weight'] for step in self.mix]
+        while not self.stop.is_set():
+            step = rng.choices(self.mix, weights=weights)[0]
+            start = time.perf_counter()
+            try:
+                ok = FLOW_FUNCTIONS[step['flow']](rng, step)
+            except Exception:
+                ok = False
+            seconds = time.perf_counter() - start
+            with self.lock:
+                self.latencies[step['flow']].append(seconds)
+                if not ok:
+                    self.errors[step['flow']] += 1
+            if self.think_time:
+                self.stop.wait(rng.expovariate(1 / self.think_time))
+
+    def monitor_connections(self):
+        """Sample server-side connections to the app database once a second"""
+        try:
+            conn = psycopg2.connect(**app.DB_CONFIG)
+        except psycopg2.Error as e:
+            print(f"Connection monitor disabled: {e}")
+            return
+        conn.autocommit = True
+        try:
+            while not self.stop.is_set():
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT COUNT(*) FROM pg_stat_activity WHERE datname = current_database()")
+                    self.server_connections.append(cursor.fetchone()[0])
+                self.stop.wait(1)
+        finally:
+            conn.close()
+
+    def run(self):
+        threads = [threading.Thread(target=self.monitor_connections, daemon=True)]
+        threads += [threading.Thread(target=self.simulate_user, args=(n,), daemon=True) for n in range(self.users)]
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        self.stop.wait(self.duration)
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.perf_counter() - start
+
+    def report(self) -> Dict[str, Any]:
+        flows = []
+        for flow, samples in sorted(self.latencies.items()):
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            flows.append({
+                'flow': flow,
+                'count': len(ordered),
+                'errors': self.errors[flow],
+                'per_sec': round(len(ordered) / self.elapsed, 1),
+                'p50_ms': round(app.QueryStats.percentile(ordered, 50) * 1000, 1),
+                'p95_ms': round(app.QueryStats.percentile(ordered, 95) * 1000, 1),
+                'p99_ms': round(app.QueryStats.percentile(ordered, 99) * 1000, 1),
+                'max_ms': round(ordered[-1] * 1000, 1)
+            })
+
+        total = sum(flow['count'] for flow in flows)
+        samples = self.server_connections
+        return {
+            'users': self.users,
+            'duration_s': round(self.elapsed, 1),
+            'flows_total': total,
+            'errors_total': sum(flow['errors'] for flow in flows),
+            'throughput_per_s': round(total / self.elapsed, 1) if self.elapsed else 0.0,
+            'flows': flows,
+            'queries': app.db.stats.latency_summary(),
+            'connections': {
+                'opened_by_app': app.db.stats.connections_opened,
+                'peak_in_flight': app.db.stats.peak_in_flight,
+                'server_peak': max(samples) if samples else None,
+                'server_mean': round(sum(samples) / len(samples), 1) if samples else None
+            }
+        }
+
+def print_table(rows: List[Dict[str, Any]]):
+    if not rows:
+        return
+    columns = list(rows[0].keys())
+    widths = {c: max(len(str(c)), *(len(str(row[c])) for row in rows)) for c in columns}
+    print("  ".join(str(c).ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(str(row[c]).ljust(widths[c]) for c in columns))
+
+def print_report(report: Dict[str, Any]):
+    print(f"\n=== Load test: {report['users']} users for {report['duration_s']}s ===")
+    print(f"Flows: {report['flows_total']} ({report['errors_total']} errors), "
+          f"{report['throughput_per_s']} flows/s")
+
+    print("\n--- Page flows ---")
+    print_table(report['flows'])
+    print("\n--- Queries ---")
+    print_table(report['queries'])
+
+    connections = report['connections']
+    print("\n--- Connections ---")
+    print(f"Opened by app: {connections['opened_by_app']}, peak in flight: {connections['peak_in_flight']}")
+    print(f"Server-side: peak {connections['server_peak']}, mean {connections['server_mean']}")
+
+def cleanup():
+    """Remove rows created by add flows"""
+    conn = psycopg2.connect(**app.DB_CONFIG)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM users WHERE name LIKE %s", (LOADTEST_PREFIX + '%',))
+            users = cursor.rowcount
+            cursor.execute("DELETE FROM products WHERE name LIKE %s", (LOADTEST_PREFIX + '%',))
+            products = cursor.rowcount
+        conn.commit()
+        print(f"\nRemoved {users} users and {products} products created by the load test")
+    finally:
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent operators of streamlit_app.py")
+    parser.add_argument('--users', type=int, default=20, help="concurrent simulated users")
+    parser.add_argument('--duration', type=float, default=30, help="test length in seconds")
+    parser.add_argument('--mix', help="JSONL file with one flow per line (default: built-in mix)")
+    parser.add_argument('--think-time', type=float, default=0.0, help="mean pause between flows in seconds")
+    parser.add_argument('--seed', type=int, default=0, help="random seed for reproducible runs")
+    parser.add_argument('--json', help="also write the report to this file")
+    parser.add_argument('--keep-data', action='store_true', help="keep rows created by add flows")
+    args = parser.parse_args()
+
+    test = LoadTest(load_mix(args.mix), args.users, args.duration, args.think_time, args.seed)
+    test.run()
+    report = test.report()
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=str)
+
+    if not args.keep_data:
+        cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,26 @@
+from __future__ import annotations
+
+import time
+
+# Measured before anything else so the first render time includes our imports
+SCRIPT_START = time.perf_counter()
+
 import streamlit as st
-import psycopg2
 import pandas as pd
 from datetime import datetime
+import importlib
+import io
+import json
+import logging
+import math
 import os
-from typing import Optional, List, Dict, Any
+import re
+import select
+import sys
+import tempfile
+import threading
+from collections import deque
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 
 # Database connection configuration
 DB_CONFIG = {
@@ -14,16 +31,174 @@ DB_CONFIG = {
     'password': os.getenv('DB_PASSWORD', 'db_123')
 }
 
-class DatabaseManager:
+# Columns accepted by the bulk importer, in COPY order
+IMPORT_COLUMNS = {
+    'users': ['name', 'email'],
+    'products': ['name', 'description', 'price', 'stock_quantity']
+}
+REQUIRED_IMPORT_COLUMNS = {
+    'users': ['name', 'email'],
+    'products': ['name']
+}
+IMPORT_CHUNK_SIZE = 5000
+EXPORT_CHUNK_SIZE = 5000
+
+# Channel used by the notify_row_change() triggers in init.sql
+CHANGE_CHANNEL = 'table_changes'
+LIVE_TABLES = ['users', 'products']
+LIVE_REFRESH_SECONDS = 2
+
+logger = logging.getLogger(__name__)
+
+class StartupReport:
+    """First-import timings and time to first render for this process"""
+    
     def __init__(self):
+        self.lock = threading.Lock()
+        self.imports: Dict[str, float] = {}
+        self.first_render: Optional[float] = None
+        self.warmup: Optional[float] = None
+    
+    def record_import(self, name: str, seconds: float):
+        with self.lock:
+            self.imports.setdefault(name, seconds)
+    
+    def record_first_render(self, seconds: float):
+        with self.lock:
+            if self.first_render is not None:
+                return
+            self.first_render = seconds
+        imports = ', '.join(f"{name} {ms} ms" for name, ms in self.import_rows())
+        logger.info(f"First render after {seconds * 1000:.1f} ms (imports: {imports or 'none'})")
+    
+    def import_rows(self) -> List[Tuple[str, float]]:
+        with self.lock:
+            timings = sorted(self.imports.items(), key=lambda item: item[1], reverse=True)
+        return [(name, round(seconds * 1000, 1)) for name, seconds in timings]
+
+@st.cache_resource
+def get_startup_report() -> StartupReport:
+    return StartupReport()
+
+def timed_import(name: str):
+    """Import a module on first use, recording how long that first import took"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    get_startup_report().record_import(name, time.perf_counter() - start)
+    return module
+
+def record_first_render():
+    get_startup_report().record_first_render(time.perf_counter() - SCRIPT_START)
+
+# pandas is imported by Streamlit itself, so only the database driver is worth timing here;
+# pyarrow goes through timed_import where Parquet import and export first need it
+psycopg2 = timed_import('psycopg2')
+
+QUERY_TYPE_PATTERN = re.compile(r'^\s*(UPDATE)\s+(\w+)|^\s*(\w+)(?:.*?\b(?:FROM|INTO)\s+(\w+))?', re.IGNORECASE | re.DOTALL)
+
+class QueryStats:
+    """Rolling latency samples for the app's own database calls"""
+    
+    def __init__(self, samples_per_type: int = 1000, recent_statements: int = 500):
+        self.lock = threading.Lock()
+        self.samples_per_type = samples_per_type
+        self.samples: Dict[str, deque] = {}
+        self.calls: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.recent: deque = deque(maxlen=recent_statements)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.connections_opened = 0
+    
+    @staticmethod
+    def query_type(query: str) -> str:
+        """Classify a statement as verb plus table, e.g. 'SELECT users'"""
+        match = QUERY_TYPE_PATTERN.match(query)
+        if not match:
+            return 'OTHER'
+        update_verb, update_table, verb, table = match.groups()
+        verb, table = (update_verb, update_table) if update_verb else (verb, table)
+        return f"{verb.upper()} {table}" if table else verb.upper()
+    
+    def record(self, query_type: str, seconds: float, statement: str, failed: bool = False):
+        with self.lock:
+            if query_type not in self.samples:
+                self.samples[query_type] = deque(maxlen=self.samples_per_type)
+            self.samples[query_type].append(seconds)
+            self.calls[query_type] = self.calls.get(query_type, 0) + 1
+            if failed:
+                self.errors[query_type] = self.errors.get(query_type, 0) + 1
+            self.recent.append((seconds, datetime.now(), query_type, statement))
+    
+    def connection_opened(self):
+        with self.lock:
+            self.connections_opened += 1
+    
+    def query_started(self):
+        with self.lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+    
+    def query_finished(self):
+        with self.lock:
+            self.in_flight -= 1
+    
+    @staticmethod
+    def percentile(ordered: List[float], pct: float) -> float:
+        """Nearest-rank percentile of an already sorted list"""
+        rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+        return ordered[rank - 1]
+    
+    def latency_summary(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            snapshot = {key: sorted(values) for key, values in self.samples.items()}
+            calls = dict(self.calls)
+            errors = dict(self.errors)
+        
+        summary = []
+        for query_type, ordered in sorted(snapshot.items()):
+            summary.append({
+                'query type': query_type,
+                'calls': calls[query_type],
+                'errors': errors.get(query_type, 0),
+                'p50 ms': round(self.percentile(ordered, 50) * 1000, 2),
+                'p95 ms': round(self.percentile(ordered, 95) * 1000, 2),
+                'p99 ms': round(self.percentile(ordered, 99) * 1000, 2),
+                'max ms': round(ordered[-1] * 1000, 2)
+            })
+        return summary
+    
+    def slowest(self, limit: int = 10) -> List[Dict[str, Any]]:
+        with self.lock:
+            recent = list(self.recent)
+        recent.sort(key=lambda sample: sample[0], reverse=True)
+        return [{'ms': round(seconds * 1000, 2), 'at': at.strftime('%H:%M:%S'),
+                 'query type': query_type, 'statement': statement}
+                for seconds, at, query_type, statement in recent[:limit]]
+
+@st.cache_resource
+def get_query_stats() -> QueryStats:
+    """Latency samples survive script reruns and are shared by every session"""
+    return QueryStats()
+
+class DatabaseManager:
+    def __init__(self, stats: Optional[QueryStats] = None):
         self.config = DB_CONFIG
+        self.stats = stats or QueryStats()
         
     def get_connection(self):
         """Create and return database connection"""
+        start = time.perf_counter()
         try:
             conn = psycopg2.connect(**self.config)
+            self.stats.record('CONNECT', time.perf_counter() - start, 'connect')
+            self.stats.connection_opened()
             return conn
         except Exception as e:
+            self.stats.record('CONNECT', time.perf_counter() - start, 'connect', failed=True)
             st.error(f"Error connecting to database: {str(e)}")
             return None
     
@@ -32,7 +207,10 @@ class DatabaseManager:
         conn = self.get_connection()
         if not conn:
             return None
-            
+        
+        self.stats.query_started()
+        start = time.perf_counter()
+        failed = False
         try:
             with conn.cursor() as cursor:
                 cursor.execute(query, params)
@@ -44,14 +222,220 @@ class DatabaseManager:
                     conn.commit()
                     return []
         except Exception as e:
+            failed = True
             st.error(f"Database error: {str(e)}")
             conn.rollback()
             return None
         finally:
+            self.stats.record(QueryStats.query_type(query), time.perf_counter() - start,
+                              ' '.join(query.split()), failed=failed)
             conn.close()
+            self.stats.query_finished()
+
+class ChangeFeed:
+    """Per-process table frames kept current by LISTEN/NOTIFY row patches"""
+    
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.frames: Dict[str, pd.DataFrame] = {}
+        # One set per load in progress, so concurrent loaders each see every change
+        self.loading: Dict[str, List[set]] = {}
+        self.version = 0
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._listen, name="change-feed", daemon=True)
+        self.thread.start()
+    
+    def get_frame(self, table: str) -> Tuple[Optional[pd.DataFrame], int]:
+        """Return the cached frame for a table, loading it once if needed"""
+        with self.condition:
+            if table in self.frames:
+                return self.frames[table], self.version
+            missed = set()
+            self.loading.setdefault(table, []).append(missed)
+        
+        try:
+            results = fetch_table(table)
+        except Exception:
+            with self.condition:
+                self._end_load(table, missed)
+            raise
+        
+        # Stop collecting under the same lock that publishes the frame, so every
+        # change lands either in missed or in the patch of the published frame
+        with self.condition:
+            self._end_load(table, missed)
+            if results is None:
+                return None, self.version
+            if results:
+                self.frames[table] = pd.DataFrame(results).set_index('id', drop=False)
+            else:
+                self.frames[table] = pd.DataFrame(columns=['id']).set_index('id', drop=False)
+        
+        # Rows that changed while the full load was running are re-fetched
+        if missed:
+            conn = db.get_connection()
+            if conn:
+                try:
+                    self._patch(conn, table, missed)
+                finally:
+                    conn.close()
+        
+        with self.condition:
+            return self.frames[table], self.version
+    
+    def _end_load(self, table: str, missed: set):
+        # Called with the lock held; sets are compared by identity, two loads may hold equal ones
+        loads = self.loading[table]
+        del loads[next(n for n, load in enumerate(loads) if load is missed)]
+        if not loads:
+            del self.loading[table]
+    
+    def wait_for_change(self, version: int, timeout: float) -> int:
+        """Block until the feed moves past version or timeout expires"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+    
+    def _listen(self):
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(**self.config)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANGE_CHANNEL}")
+                
+                # Anything cached before (re)connecting may have missed events
+                with self.condition:
+                    self.frames.clear()
+                    self.version += 1
+                    self.condition.notify_all()
+                
+                while True:
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    changes: Dict[str, set] = {}
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            payload = json.loads(notify.payload)
+                            changes.setdefault(payload['table'], set()).add(payload['id'])
+                        except (ValueError, KeyError):
+                            logger.warning(f"Ignoring malformed change payload: {notify.payload}")
+                    for table, ids in changes.items():
+                        self._patch(conn, table, ids)
+            except Exception as e:
+                logger.error(f"Change feed listener failed, reconnecting: {e}")
+                time.sleep(5)
+            finally:
+                if conn:
+                    conn.close()
+    
+    def _patch(self, conn, table: str, ids: set):
+        """Replace the changed rows of a cached frame with their current state"""
+        with self.condition:
+            if table in self.loading:
+                for missed in self.loading[table]:
+                    missed.update(ids)
+                return
+            if table not in self.frames:
+                return
+        
+        with conn.cursor() as cursor:
+            cursor.execute(f"SELECT * FROM {table} WHERE id = ANY(%s)", (list(ids),))
+            columns = [desc[0] for desc in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        if not conn.autocommit:
+            conn.commit()
+        
+        with self.condition:
+            frame = self.frames.get(table)
+            if frame is None:
+                return
+            # Build a new frame so sessions still rendering the old one are unaffected
+            frame = frame.drop(index=list(ids), errors='ignore')
+            if rows:
+                updated = pd.DataFrame(rows).set_index('id', drop=False)
+                frame = updated if frame.empty else pd.concat([frame, updated])
+            self.frames[table] = frame.sort_index()
+            self.version += 1
+            self.condition.notify_all()
+
+def warm_database(manager: DatabaseManager, report: StartupReport):
+    """Open and check one connection so the first page does not pay for it"""
+    start = time.perf_counter()
+    try:
+        conn = psycopg2.connect(**manager.config)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        finally:
+            conn.close()
+        report.warmup = time.perf_counter() - start
+    except Exception as e:
+        logger.warning(f"Database warm-up failed: {e}")
+
+@st.cache_resource
+def get_database_manager() -> DatabaseManager:
+    """Created once per process; warm-up runs in the background"""
+    manager = DatabaseManager(get_query_stats())
+    threading.Thread(target=warm_database, args=(manager, get_startup_report()),
+                     name="db-warmup", daemon=True).start()
+    return manager
 
 # Initialize database manager
-db = DatabaseManager()
+db = get_database_manager()
+
+# Data access used by the pages; load_test.py replays these same calls
+def fetch_table(table: str) -> Optional[List[Dict[Any, Any]]]:
+    return db.execute_query(f"SELECT * FROM {table} ORDER BY id")
+
+def list_users() -> Optional[List[Dict[Any, Any]]]:
+    return db.execute_query("SELECT id, name, email FROM users ORDER BY name")
+
+def list_products() -> Optional[List[Dict[Any, Any]]]:
+    return db.execute_query("SELECT id, name, price FROM products ORDER BY name")
+
+def get_user(user_id: int) -> Optional[List[Dict[Any, Any]]]:
+    return db.execute_query("SELECT * FROM users WHERE id = %s", (user_id,))
+
+def get_product(product_id: int) -> Optional[List[Dict[Any, Any]]]:
+    return db.execute_query("SELECT * FROM products WHERE id = %s", (product_id,))
+
+def insert_user(name: str, email: str) -> Optional[List[Dict[Any, Any]]]:
+    return db.execute_query("INSERT INTO users (name, email) VALUES (%s, %s)", (name, email))
+
+def insert_product(name: str, description: str, price: float, stock: int) -> Optional[List[Dict[Any, Any]]]:
+    query = "INSERT INTO products (name, description, price, stock_quantity) VALUES (%s, %s, %s, %s)"
+    return db.execute_query(query, (name, description, price, stock))
+
+def update_user(user_id: int, name: str, email: str) -> Optional[List[Dict[Any, Any]]]:
+    return db.execute_query("UPDATE users SET name = %s, email = %s WHERE id = %s", (name, email, user_id))
+
+def update_product(product_id: int, name: str, description: str, price: float, stock: int) -> Optional[List[Dict[Any, Any]]]:
+    query = "UPDATE products SET name = %s, description = %s, price = %s, stock_quantity = %s WHERE id = %s"
+    return db.execute_query(query, (name, description, price, stock, product_id))
+
+def delete_user(user_id: int) -> Optional[List[Dict[Any, Any]]]:
+    return db.execute_query("DELETE FROM users WHERE id = %s", (user_id,))
+
+def delete_product(product_id: int) -> Optional[List[Dict[Any, Any]]]:
+    return db.execute_query("DELETE FROM products WHERE id = %s", (product_id,))
+
+def count_rows(table: str) -> Optional[List[Dict[Any, Any]]]:
+    return db.execute_query(f"SELECT COUNT(*) as count FROM {table}")
+
+def get_recent_users(limit: int = 5) -> Optional[List[Dict[Any, Any]]]:
+    return db.execute_query("SELECT name, email, created_at FROM users ORDER BY created_at DESC LIMIT %s", (limit,))
+
+def get_recent_products(limit: int = 5) -> Optional[List[Dict[Any, Any]]]:
+    return db.execute_query("SELECT name, price, created_at FROM products ORDER BY created_at DESC LIMIT %s", (limit,))
+
+@st.cache_resource
+def get_change_feed() -> ChangeFeed:
+    """One listener per process, shared by every session"""
+    return ChangeFeed(DB_CONFIG)
 
 def main():
     st.set_page_config(page_title="CRUD Application", page_icon="🗃️", layout="wide")
@@ -61,7 +445,7 @@ def main():
     
     # Sidebar navigation
     st.sidebar.title("Navigation")
-    page = st.sidebar.radio("Choose Operation", ["View Data", "Add Records", "Update Records", "Delete Records", "Database Info"])
+    page = st.sidebar.radio("Choose Operation", ["View Data", "Add Records", "Update Records", "Delete Records", "Import / Export", "Database Info", "Performance"])
     
     if page == "View Data":
         view_data_page()
@@ -71,8 +455,14 @@ def main():
         update_records_page()
     elif page == "Delete Records":
         delete_records_page()
+    elif page == "Import / Export":
+        import_export_page()
     elif page == "Database Info":
         database_info_page()
+    elif page == "Performance":
+        performance_page()
+    
+    record_first_render()
 
 def view_data_page():
     st.header("📊 View Data")
@@ -80,40 +470,65 @@ def view_data_page():
     col1, col2 = st.columns([1, 3])
     
     with col1:
-        table_choice = st.selectbox("Select Table", ["users", "products"])
-        
-        if st.button("Refresh Data", type="primary"):
-            st.rerun()
+        table_choice = st.selectbox("Select Table", LIVE_TABLES)
+        live = st.toggle("Live updates", value=True)
     
     with col2:
-        if table_choice == "users":
-            display_users_table()
+        if live:
+            live_table(table_choice)
         else:
-            display_products_table()
+            frame, _ = get_change_feed().get_frame(table_choice)
+            render_table(st.empty(), table_choice, frame)
 
-def display_users_table():
-    st.subheader("👥 Users Table")
+def live_fragment(func):
+    """Re-run func on its own every LIVE_REFRESH_SECONDS, without holding a script thread in between
+
+    st.fragment (Streamlit 1.37+) re-runs just the fragment. On older versions
+    the run waits up to one interval for the change feed to move and then asks
+    for a rerun, so each run still ends. That run never gets back to the end
+    of main(), so the first render is recorded once func has drawn.
+    """
+    fragment = getattr(st, 'fragment', None)
+    if fragment is not None:
+        return fragment(run_every=LIVE_REFRESH_SECONDS)(func)
     
-    query = "SELECT * FROM users ORDER BY id"
-    results = db.execute_query(query)
+    def rerun_on_change(*args, **kwargs):
+        version = func(*args, **kwargs)
+        record_first_render()
+        get_change_feed().wait_for_change(version, timeout=LIVE_REFRESH_SECONDS)
+        st.rerun()
+    return rerun_on_change
+
+@live_fragment
+def live_table(table: str) -> int:
+    # Reading the cached frame is cheap, patches arrive through the change feed
+    frame, version = get_change_feed().get_frame(table)
+    st.caption(f"🟢 Live · checked {datetime.now().strftime('%H:%M:%S')}")
+    render_table(st.empty(), table, frame)
+    return version
+
+def render_table(placeholder, table: str, frame: Optional[pd.DataFrame]):
+    with placeholder.container():
+        if table == "users":
+            display_users_table(frame)
+        else:
+            display_products_table(frame)
+
+def display_users_table(frame: Optional[pd.DataFrame]):
+    st.subheader("👥 Users Table")
     
-    if results:
-        df = pd.DataFrame(results)
-        st.dataframe(df, use_container_width=True)
-        st.info(f"Total users: {len(results)}")
+    if frame is not None and not frame.empty:
+        st.dataframe(frame.reset_index(drop=True), use_container_width=True)
+        st.info(f"Total users: {len(frame)}")
     else:
         st.warning("No users found or error retrieving data.")
 
-def display_products_table():
+def display_products_table(frame: Optional[pd.DataFrame]):
     st.subheader("📦 Products Table")
     
-    query = "SELECT * FROM products ORDER BY id"
-    results = db.execute_query(query)
-    
-    if results:
-        df = pd.DataFrame(results)
-        st.dataframe(df, use_container_width=True)
-        st.info(f"Total products: {len(results)}")
+    if frame is not None and not frame.empty:
+        st.dataframe(frame.reset_index(drop=True), use_container_width=True)
+        st.info(f"Total products: {len(frame)}")
     else:
         st.warning("No products found or error retrieving data.")
 
@@ -139,8 +554,7 @@ def add_user_form():
         
         if submitted:
             if name and email:
-                query = "INSERT INTO users (name, email) VALUES (%s, %s)"
-                result = db.execute_query(query, (name, email))
+                result = insert_user(name, email)
                 
                 if result is not None:
                     st.success("✅ User added successfully!")
@@ -163,8 +577,7 @@ def add_product_form():
         
         if submitted:
             if name:
-                query = "INSERT INTO products (name, description, price, stock_quantity) VALUES (%s, %s, %s, %s)"
-                result = db.execute_query(query, (name, description, price, stock))
+                result = insert_product(name, description, price, stock)
                 
                 if result is not None:
                     st.success("✅ Product added successfully!")
@@ -189,8 +602,7 @@ def update_user_form():
     st.subheader("Update User")
     
     # Get all users for selection
-    users_query = "SELECT id, name, email FROM users ORDER BY name"
-    users = db.execute_query(users_query)
+    users = list_users()
     
     if users:
         user_options = {f"{user['name']} ({user['email']})": user['id'] for user in users}
@@ -200,8 +612,7 @@ def update_user_form():
             user_id = user_options[selected_user]
             
             # Get current user data
-            current_user_query = "SELECT * FROM users WHERE id = %s"
-            current_user = db.execute_query(current_user_query, (user_id,))
+            current_user = get_user(user_id)
             
             if current_user:
                 user_data = current_user[0]
@@ -214,8 +625,7 @@ def update_user_form():
                     
                     if submitted:
                         if name and email:
-                            update_query = "UPDATE users SET name = %s, email = %s WHERE id = %s"
-                            result = db.execute_query(update_query, (name, email, user_id))
+                            result = update_user(user_id, name, email)
                             
                             if result is not None:
                                 st.success("✅ User updated successfully!")
@@ -231,8 +641,7 @@ def update_product_form():
     st.subheader("Update Product")
     
     # Get all products for selection
-    products_query = "SELECT id, name, price FROM products ORDER BY name"
-    products = db.execute_query(products_query)
+    products = list_products()
     
     if products:
         product_options = {f"{product['name']} (${product['price']})": product['id'] for product in products}
@@ -242,8 +651,7 @@ def update_product_form():
             product_id = product_options[selected_product]
             
             # Get current product data
-            current_product_query = "SELECT * FROM products WHERE id = %s"
-            current_product = db.execute_query(current_product_query, (product_id,))
+            current_product = get_product(product_id)
             
             if current_product:
                 product_data = current_product[0]
@@ -258,8 +666,7 @@ def update_product_form():
                     
                     if submitted:
                         if name:
-                            update_query = "UPDATE products SET name = %s, description = %s, price = %s, stock_quantity = %s WHERE id = %s"
-                            result = db.execute_query(update_query, (name, description, price, stock, product_id))
+                            result = update_product(product_id, name, description, price, stock)
                             
                             if result is not None:
                                 st.success("✅ Product updated successfully!")
@@ -286,8 +693,7 @@ def delete_records_page():
 def delete_user_form():
     st.subheader("Delete User")
     
-    users_query = "SELECT id, name, email FROM users ORDER BY name"
-    users = db.execute_query(users_query)
+    users = list_users()
     
     if users:
         user_options = {f"{user['name']} ({user['email']})": user['id'] for user in users}
@@ -299,8 +705,7 @@ def delete_user_form():
             col1, col2 = st.columns([1, 1])
             with col1:
                 if st.button("🗑️ Delete User", type="secondary"):
-                    delete_query = "DELETE FROM users WHERE id = %s"
-                    result = db.execute_query(delete_query, (user_id,))
+                    result = delete_user(user_id)
                     
                     if result is not None:
                         st.success("✅ User deleted successfully!")
@@ -313,8 +718,7 @@ def delete_user_form():
 def delete_product_form():
     st.subheader("Delete Product")
     
-    products_query = "SELECT id, name, price FROM products ORDER BY name"
-    products = db.execute_query(products_query)
+    products = list_products()
     
     if products:
         product_options = {f"{product['name']} (${product['price']})": product['id'] for product in products}
@@ -326,8 +730,7 @@ def delete_product_form():
             col1, col2 = st.columns([1, 1])
             with col1:
                 if st.button("🗑️ Delete Product", type="secondary"):
-                    delete_query = "DELETE FROM products WHERE id = %s"
-                    result = db.execute_query(delete_query, (product_id,))
+                    result = delete_product(product_id)
                     
                     if result is not None:
                         st.success("✅ Product deleted successfully!")
@@ -337,6 +740,263 @@ def delete_product_form():
     else:
         st.info("No products available to delete.")
 
+def import_export_page():
+    st.header("📥 Import / Export")
+    
+    tab1, tab2 = st.tabs(["Import", "Export"])
+    
+    with tab1:
+        import_data_form()
+    
+    with tab2:
+        export_data_form()
+
+def read_upload_chunks(uploaded_file, chunk_size: int) -> Iterator[Tuple[pd.DataFrame, float]]:
+    """Yield (chunk, fraction done) pairs from an uploaded CSV or Parquet file"""
+    if uploaded_file.name.lower().endswith('.parquet'):
+        pq = timed_import('pyarrow.parquet')
+        
+        parquet_file = pq.ParquetFile(uploaded_file)
+        total_rows = parquet_file.metadata.num_rows or 1
+        rows_read = 0
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            rows_read += batch.num_rows
+            yield batch.to_pandas(), rows_read / total_rows
+    else:
+        total_bytes = uploaded_file.size or 1
+        reader = pd.read_csv(uploaded_file, chunksize=chunk_size, dtype=str, keep_default_na=False)
+        for chunk in reader:
+            yield chunk, min(uploaded_file.tell() / total_bytes, 1.0)
+
+def validate_import_chunk(table: str, chunk: pd.DataFrame, first_row: int) -> Tuple[pd.DataFrame, List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Split a chunk into valid rows, validation errors and email conflicts"""
+    df = chunk.reindex(columns=IMPORT_COLUMNS[table])
+    df.index = pd.RangeIndex(first_row, first_row + len(df))
+    problems = pd.Series('', index=df.index)
+    
+    def flag(mask, message):
+        problems[mask & (problems == '')] = message
+    
+    def text(column):
+        return df[column].fillna('').astype(str).str.strip()
+    
+    name = text('name')
+    flag(name == '', "name is required")
+    df['name'] = name
+    
+    if table == 'users':
+        flag(name.str.len() > 100, "name is longer than 100 characters")
+        email = text('email')
+        flag(email == '', "email is required")
+        flag((email != '') & ~email.str.match(r'^[^@\s]+@[^@\s]+$'), "email is not valid")
+        flag(email.str.len() > 100, "email is longer than 100 characters")
+        df['email'] = email
+    else:
+        flag(name.str.len() > 200, "name is longer than 200 characters")
+        description = text('description')
+        df['description'] = description.where(description != '', None)
+        
+        price_text = text('price')
+        price = pd.to_numeric(price_text, errors='coerce')
+        flag((price_text != '') & price.isna(), "price is not a number")
+        flag(price < 0, "price must not be negative")
+        flag(price >= 10 ** 8, "price does not fit DECIMAL(10, 2)")
+        df['price'] = price.round(2)
+        
+        stock_text = text('stock_quantity')
+        stock = pd.to_numeric(stock_text, errors='coerce')
+        flag((stock_text != '') & (stock.isna() | (stock % 1 != 0)), "stock_quantity is not a whole number")
+        flag(stock < 0, "stock_quantity must not be negative")
+        flag(stock > 2 ** 31 - 1, "stock_quantity is too large")
+    
+    errors = [{'row': row, 'error': message} for row, message in problems[problems != ''].items()]
+    valid = df[problems == ''].copy()
+    conflicts = []
+    
+    if table == 'users':
+        # Only the first occurrence of an email inside the chunk can be inserted
+        duplicated = valid['email'].duplicated()
+        conflicts = [{'row': row, 'email': email, 'conflict': "duplicate email in file"}
+                     for row, email in valid.loc[duplicated, 'email'].items()]
+        valid = valid[~duplicated]
+    else:
+        valid['stock_quantity'] = stock[valid.index].fillna(0).astype('int64')
+    
+    return valid, errors, conflicts
+
+def copy_import_chunk(cursor, table: str, valid: pd.DataFrame) -> Tuple[int, List[Dict[str, Any]]]:
+    """COPY validated rows into the table and return (inserted, email conflicts)"""
+    buffer = io.StringIO()
+    valid.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    columns = ', '.join(valid.columns)
+    
+    if table == 'products':
+        cursor.copy_expert(f"COPY products ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        return len(valid), []
+    
+    # Stage users first so existing emails are skipped instead of failing the whole COPY
+    cursor.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS users_import (name VARCHAR(100), email VARCHAR(100)) ON COMMIT DELETE ROWS"
+    )
+    cursor.copy_expert(f"COPY users_import ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    cursor.execute(
+        "INSERT INTO users (name, email) SELECT name, email FROM users_import "
+        "ON CONFLICT (email) DO NOTHING RETURNING email"
+    )
+    inserted = {row[0] for row in cursor.fetchall()}
+    conflicts = [{'row': row, 'email': email, 'conflict': "email already exists"}
+                 for row, email in valid['email'].items() if email not in inserted]
+    return len(inserted), conflicts
+
+def import_data_form():
+    st.subheader("Import Records")
+    
+    table = st.selectbox("Target Table", list(IMPORT_COLUMNS.keys()), key="import_table")
+    st.caption(f"Accepted columns: {', '.join(IMPORT_COLUMNS[table])} "
+               f"(required: {', '.join(REQUIRED_IMPORT_COLUMNS[table])})")
+    uploaded_file = st.file_uploader("CSV or Parquet file", type=["csv", "parquet"])
+    
+    if not uploaded_file or not st.button("Import", type="primary"):
+        return
+    
+    conn = db.get_connection()
+    if not conn:
+        return
+    
+    progress = st.progress(0.0, text="Importing...")
+    summary = []
+    first_row = 1
+    
+    try:
+        for number, (chunk, done) in enumerate(read_upload_chunks(uploaded_file, IMPORT_CHUNK_SIZE), start=1):
+            missing = [c for c in REQUIRED_IMPORT_COLUMNS[table] if c not in chunk.columns]
+            if missing:
+                st.error(f"❌ Missing required columns: {', '.join(missing)}")
+                break
+            
+            valid, errors, conflicts = validate_import_chunk(table, chunk, first_row)
+            inserted = 0
+            
+            if not valid.empty:
+                try:
+                    with conn.cursor() as cursor:
+                        inserted, copy_conflicts = copy_import_chunk(cursor, table, valid)
+                    conn.commit()
+                    conflicts += copy_conflicts
+                except psycopg2.Error as e:
+                    conn.rollback()
+                    errors.append({'row': f"{first_row}-{first_row + len(chunk) - 1}", 'error': str(e).strip()})
+            
+            summary.append({
+                'chunk': number,
+                'rows': len(chunk),
+                'inserted': inserted,
+                'invalid': len(errors),
+                'conflicts': len(conflicts),
+                'errors': errors,
+                'conflict_rows': conflicts
+            })
+            first_row += len(chunk)
+            progress.progress(done, text=f"Imported {first_row - 1} rows...")
+    except Exception as e:
+        st.error(f"Error reading file: {str(e)}")
+    finally:
+        conn.close()
+    
+    if not summary:
+        return
+    
+    progress.progress(1.0, text="Import finished")
+    total_inserted = sum(c['inserted'] for c in summary)
+    st.success(f"✅ Inserted {total_inserted} of {first_row - 1} rows into {table}")
+    st.dataframe(pd.DataFrame(summary).drop(columns=['errors', 'conflict_rows']), use_container_width=True)
+    
+    for chunk in summary:
+        if chunk['errors'] or chunk['conflict_rows']:
+            with st.expander(f"Chunk {chunk['chunk']}: {chunk['invalid']} invalid, {chunk['conflicts']} conflicts"):
+                if chunk['errors']:
+                    st.write("**Validation errors:**")
+                    st.dataframe(pd.DataFrame(chunk['errors']), use_container_width=True)
+                if chunk['conflict_rows']:
+                    st.write("**Email conflicts:**")
+                    st.dataframe(pd.DataFrame(chunk['conflict_rows']), use_container_width=True)
+
+def export_table_csv(conn, table: str, target) -> None:
+    """Write a table into a binary file object with COPY ... TO STDOUT, row data never held in memory"""
+    with conn.cursor() as cursor:
+        cursor.copy_expert(f"COPY (SELECT * FROM {table} ORDER BY id) TO STDOUT WITH (FORMAT csv, HEADER)", target)
+
+def export_table_parquet(conn, table: str, target) -> None:
+    """Write a table into a Parquet file in batches from a server-side cursor"""
+    pa = timed_import('pyarrow')
+    pq = timed_import('pyarrow.parquet')
+    
+    timestamp = pa.timestamp('us')
+    if table == 'users':
+        schema = pa.schema([('id', pa.int32()), ('name', pa.string()), ('email', pa.string()),
+                            ('created_at', timestamp), ('updated_at', timestamp)])
+    else:
+        schema = pa.schema([('id', pa.int32()), ('name', pa.string()), ('description', pa.string()),
+                            ('price', pa.decimal128(10, 2)), ('stock_quantity', pa.int32()),
+                            ('created_at', timestamp), ('updated_at', timestamp)])
+    
+    columns = ', '.join(schema.names)
+    with conn.cursor(name=f"export_{table}") as cursor:
+        cursor.itersize = EXPORT_CHUNK_SIZE
+        cursor.execute(f"SELECT {columns} FROM {table} ORDER BY id")
+        with pq.ParquetWriter(target, schema) as writer:
+            while True:
+                rows = cursor.fetchmany(EXPORT_CHUNK_SIZE)
+                if not rows:
+                    break
+                batch = {name: [row[i] for row in rows] for i, name in enumerate(schema.names)}
+                writer.write_table(pa.Table.from_pydict(batch, schema=schema))
+
+def export_data_form():
+    st.subheader("Export Records")
+    
+    table = st.selectbox("Table", list(IMPORT_COLUMNS.keys()), key="export_table")
+    file_format = st.radio("Format", ["CSV", "Parquet"], horizontal=True)
+    
+    if not st.button("Prepare Export", type="primary"):
+        return
+    
+    conn = db.get_connection()
+    if not conn:
+        return
+    
+    # COPY and the Parquet writer fill a temporary file as rows arrive, so the
+    # database side never holds the table in memory; download_button needs the
+    # payload as bytes, so the finished file is read once to hand it over
+    export_file = tempfile.NamedTemporaryFile(suffix=f".{file_format.lower()}")
+    try:
+        try:
+            with st.spinner("Exporting..."):
+                if file_format == "CSV":
+                    export_table_csv(conn, table, export_file)
+                else:
+                    export_table_parquet(conn, table, export_file)
+            conn.commit()
+        except Exception as e:
+            st.error(f"Export failed: {str(e)}")
+            return
+        finally:
+            conn.close()
+        
+        export_file.seek(0)
+        data = export_file.read()
+    finally:
+        export_file.close()
+    
+    extension = file_format.lower()
+    st.download_button(
+        f"⬇️ Download {table}.{extension}",
+        data=data,
+        file_name=f"{table}.{extension}",
+        mime="text/csv" if file_format == "CSV" else "application/octet-stream"
+    )
+
 def database_info_page():
     st.header("💾 Database Information")
     
@@ -362,12 +1022,10 @@ def database_info_page():
         st.subheader("📊 Table Statistics")
         
         # Users statistics
-        users_count_query = "SELECT COUNT(*) as count FROM users"
-        users_count = db.execute_query(users_count_query)
+        users_count = count_rows('users')
         
         # Products statistics  
-        products_count_query = "SELECT COUNT(*) as count FROM products"
-        products_count = db.execute_query(products_count_query)
+        products_count = count_rows('products')
         
         col1, col2 = st.columns(2)
         
@@ -381,8 +1039,8 @@ def database_info_page():
                 
         # Recent activity
         st.subheader("🕐 Recent Activity")
-        recent_users = db.execute_query("SELECT name, email, created_at FROM users ORDER BY created_at DESC LIMIT 5")
-        recent_products = db.execute_query("SELECT name, price, created_at FROM products ORDER BY created_at DESC LIMIT 5")
+        recent_users = get_recent_users()
+        recent_products = get_recent_products()
         
         col1, col2 = st.columns(2)
         
@@ -405,5 +1063,93 @@ def database_info_page():
     else:
         st.error("❌ Failed to connect to database")
 
+def performance_page():
+    st.header("📈 Performance & Health")
+    
+    if st.button("Refresh Metrics", type="primary"):
+        st.rerun()
+    
+    stats = db.stats
+    
+    # Latency sampled from this process's own calls
+    st.subheader("⏱️ Query Latency (this app)")
+    latency = stats.latency_summary()
+    if latency:
+        st.dataframe(latency, use_container_width=True)
+    else:
+        st.info("No queries sampled yet.")
+    
+    st.subheader("🐢 Slowest Recent Statements")
+    slowest = stats.slowest()
+    if slowest:
+        st.dataframe(slowest, use_container_width=True)
+    else:
+        st.info("No statements recorded yet.")
+    
+    # Connection usage, app side and server side
+    st.subheader("🔌 Connection Usage")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Queries in flight", stats.in_flight)
+    with col2:
+        st.metric("Peak in flight", stats.peak_in_flight)
+    with col3:
+        st.metric("Connections opened", stats.connections_opened)
+    
+    server_connections = db.execute_query(
+        "SELECT COALESCE(state, 'background') AS state, COUNT(*) AS connections "
+        "FROM pg_stat_activity WHERE datname = current_database() GROUP BY 1 ORDER BY 2 DESC"
+    )
+    max_connections = db.execute_query("SELECT setting::int AS max_connections FROM pg_settings WHERE name = 'max_connections'")
+    if server_connections:
+        total = sum(row['connections'] for row in server_connections)
+        limit = max_connections[0]['max_connections'] if max_connections else None
+        st.write(f"**Server:** {total} connections to this database" + (f" (max_connections = {limit})" if limit else ""))
+        st.dataframe(server_connections, use_container_width=True)
+    
+    # Top statements, only when pg_stat_statements is installed
+    st.subheader("🏆 Top Queries (pg_stat_statements)")
+    extension = db.execute_query("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")
+    if extension:
+        top_queries = db.execute_query(
+            "SELECT calls, ROUND(total_exec_time::numeric, 2) AS total_ms, "
+            "ROUND(mean_exec_time::numeric, 2) AS mean_ms, rows, query "
+            "FROM pg_stat_statements WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database()) "
+            "ORDER BY total_exec_time DESC LIMIT 10"
+        )
+        if top_queries:
+            st.dataframe(top_queries, use_container_width=True)
+        else:
+            st.info("pg_stat_statements has no entries yet.")
+    else:
+        st.info("pg_stat_statements is not installed. Add it to shared_preload_libraries and run CREATE EXTENSION pg_stat_statements.")
+    
+    # Cold start cost of this process
+    st.subheader("🚀 Startup")
+    report = get_startup_report()
+    col1, col2 = st.columns(2)
+    with col1:
+        if report.first_render is not None:
+            st.metric("First render", f"{report.first_render * 1000:.0f} ms")
+    with col2:
+        if report.warmup is not None:
+            st.metric("Database warm-up", f"{report.warmup * 1000:.0f} ms")
+    import_rows = report.import_rows()
+    if import_rows:
+        st.dataframe([{'module': name, 'first import ms': ms} for name, ms in import_rows], use_container_width=True)
+    
+    # Sessions currently blocked on a lock
+    st.subheader("🔒 Lock Waits")
+    lock_waits = db.execute_query(
+        "SELECT pid, pg_blocking_pids(pid) AS blocked_by, wait_event, "
+        "NOW() - query_start AS waiting_for, LEFT(query, 200) AS query "
+        "FROM pg_stat_activity WHERE wait_event_type = 'Lock' AND datname = current_database() "
+        "ORDER BY query_start"
+    )
+    if lock_waits:
+        st.dataframe(lock_waits, use_container_width=True)
+    elif lock_waits is not None:
+        st.success("✅ No sessions are waiting on locks")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,33 @@
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# app/ is a package with relative imports, imported as app.<module>
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def load_module(path):
+    # a script directory's module by path, e.g. load_module('Basket/store.py')
+    #
+    # the directories import their siblings by bare name (`from data import basket`)
+    # and Basket and Quiz both have a store.py and a data.py, so the directory is put
+    # first on sys.path while loading and its siblings are dropped from sys.modules
+    # again afterwards; the loaded module keeps its own references to them
+    directory, filename = os.path.split(os.path.join(ROOT, path))
+    name = f"{os.path.basename(directory)}_{filename[:-3]}"
+    siblings = {entry[:-3] for entry in os.listdir(directory) if entry.endswith('.py')}
+    saved = {sibling: sys.modules.pop(sibling) for sibling in siblings if sibling in sys.modules}
+    sys.path.insert(0, directory)
+    try:
+        spec = importlib.util.spec_from_file_location(name, os.path.join(directory, filename))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+        return module
+    finally:
+        sys.path.remove(directory)
+        for sibling in siblings:
+            sys.modules.pop(sibling, None)
+        sys.modules.update(saved)
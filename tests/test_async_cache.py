@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from conftest import load_module
+
+async_cache = load_module('Decorator/cache_return.py').async_cache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_awaits_share_one_call():
+    calls = []
+
+    @async_cache
+    async def slow(n):
+        calls.append(n)
+        await asyncio.sleep(0.01)
+        return n * 2
+
+    async def main():
+        return await asyncio.gather(*(slow(4) for _ in range(10)))
+
+    assert run(main()) == [8] * 10
+    assert calls == [4]
+    assert slow.cache_info().coalesced == 9
+
+
+def test_cancelling_one_waiter_leaves_the_others_running():
+    started = []
+
+    @async_cache
+    async def slow(n):
+        started.append(n)
+        await asyncio.sleep(0.05)
+        return n
+
+    async def main():
+        first = asyncio.ensure_future(slow(1))
+        second = asyncio.ensure_future(slow(1))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert run(main()) == 1
+    assert started == [1]
+
+
+def test_call_after_last_waiter_cancelled_starts_fresh():
+    started = []
+    release = None
+
+    @async_cache
+    async def slow(n):
+        started.append(n)
+        try:
+            await release.wait()
+        except asyncio.CancelledError:
+            # cleanup that outlives the cancel, so the old fill ends after the new call starts
+            await asyncio.sleep(0.02)
+            raise
+        return n
+
+    async def main():
+        nonlocal release
+        release = asyncio.Event()
+        waiter = asyncio.ensure_future(slow(1))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        # the next call must not await the cancelled task
+        retry = asyncio.ensure_future(slow(1))
+        await asyncio.sleep(0.05)
+        # and the old fill ending must not drop the new flight
+        again = asyncio.ensure_future(slow(1))
+        release.set()
+        return await asyncio.gather(retry, again)
+
+    assert run(main()) == [1, 1]
+    assert started == [1, 1]
+
+
+def test_exception_is_not_cached():
+    calls = []
+
+    @async_cache
+    async def flaky(n):
+        calls.append(n)
+        if len(calls) == 1:
+            raise RuntimeError('first call fails')
+        return n
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await flaky(1)
+        return await flaky(1)
+
+    assert run(main()) == 1
+    assert calls == [1, 1]
@@ -0,0 +1,306 @@
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+from conftest import load_module
+
+shards = load_module('Basket/shards.py')
+store = load_module('Basket/store.py')
+eventlog = load_module('Basket/eventlog.py')
+
+
+# write-behind store
+
+class FakeCrud:
+    # the CRUDManager calls BasketStore makes, against a dict of (basket_id, fruit) -> quantity
+    def __init__(self):
+        self.rows = {}
+        self.transactions = 0
+        self.fail_next = False
+
+    def create_table(self, table, schema):
+        pass
+
+    def get_items(self, table, conditions, order_by=None):
+        return [{'fruit': fruit, 'quantity': qty} for (basket_id, fruit), qty in sorted(self.rows.items())
+                if basket_id == conditions['basket_id']]
+
+    @contextmanager
+    def transaction(self):
+        staged = dict(self.rows)
+        yield staged
+        if self.fail_next:
+            self.fail_next = False
+            raise ConnectionError('database went away')
+        self.rows = staged
+        self.transactions += 1
+
+    def delete_items(self, table, keys, key_columns, cursor):
+        for key in keys:
+            cursor.pop(key, None)
+
+    def upsert_items(self, table, rows, conflict_columns, increment_columns=(), cursor=None):
+        for row in rows:
+            key = (row['basket_id'], row['fruit'])
+            base = cursor.get(key, 0) if 'quantity' in increment_columns else 0
+            cursor[key] = base + row['quantity']
+
+
+def stored(crud, basket_id='default'):
+    return {fruit: qty for (owner, fruit), qty in crud.rows.items() if owner == basket_id}
+
+
+def test_writes_are_held_until_a_flush():
+    crud = FakeCrud()
+    basket = store.BasketStore(crud, batch_size=100, flush_interval=3600)
+    basket.add('Apple', 1)
+    basket.add('Apple', 2)
+    basket['Pear'] = 5
+    basket.add('Pear', 1)
+    basket['Kiwi'] = 1
+    del basket['Kiwi']
+    assert crud.rows == {}
+    assert basket.pending == 3
+    assert basket.flush() == 3
+    assert stored(crud) == {'Apple': 3, 'Pear': 6}
+    assert crud.transactions == 1
+    basket.close()
+
+
+def test_batch_size_triggers_a_flush():
+    crud = FakeCrud()
+    basket = store.BasketStore(crud, batch_size=3, flush_interval=3600)
+    basket.add('Apple', 1)
+    basket.add('Pear', 1)
+    assert crud.rows == {}
+    basket.add('Kiwi', 1)
+    assert stored(crud) == {'Apple': 1, 'Pear': 1, 'Kiwi': 1}
+    basket.close()
+
+
+def test_failed_flush_is_requeued_under_later_changes():
+    crud = FakeCrud()
+    basket = store.BasketStore(crud, flush_interval=3600)
+    basket.add('Apple', 2)
+    basket['Pear'] = 4
+    crud.fail_next = True
+    with pytest.raises(ConnectionError):
+        basket.flush()
+    assert crud.rows == {}
+    basket.add('Apple', 1)
+    del basket['Pear']
+    basket.flush()
+    assert stored(crud) == {'Apple': 3}
+    basket.close()
+
+
+def test_increments_from_two_stores_add_up():
+    crud = FakeCrud()
+    crud.rows[('default', 'Apple')] = 1
+    first = store.BasketStore(crud, flush_interval=3600)
+    second = store.BasketStore(crud, flush_interval=3600)
+    first.add('Apple', 2)
+    second.add('Apple', 5)
+    first.close()
+    second.close()
+    assert stored(crud) == {'Apple': 8}
+    assert dict(store.BasketStore(crud, flush_interval=3600)) == {'Apple': 8}
+
+
+# shards
+
+def test_apply_checks_only_final_totals():
+    baskets = shards.ShardedBaskets()
+    assert baskets.apply([('ana', 'Apple', -2), ('ana', 'Apple', 5)]) == 2
+    assert baskets.snapshot('ana') == {'Apple': 3}
+
+
+def test_apply_is_all_or_nothing():
+    baskets = shards.ShardedBaskets()
+    baskets.increment('ana', 'Apple', 1)
+    with pytest.raises(shards.InsufficientQuantity):
+        baskets.apply([('bo', 'Pear', 4), ('ana', 'Apple', -2)])
+    assert baskets.snapshot_all() == {'ana': {'Apple': 1}}
+
+
+def test_decrement_below_floor_changes_nothing():
+    baskets = shards.ShardedBaskets()
+    baskets.increment('ana', 'Apple', 3)
+    with pytest.raises(shards.InsufficientQuantity):
+        baskets.decrement('ana', 'Apple', 5)
+    assert baskets.snapshot('ana') == {'Apple': 3}
+
+
+def test_no_lost_updates_under_threads():
+    baskets = shards.ShardedBaskets(stripes=4)
+    users = [f'user{n}' for n in range(10)]
+
+    def churn(seed):
+        for n in range(2_000):
+            user = users[(seed + n) % len(users)]
+            baskets.increment(user, 'Apple', 1)
+            baskets.apply([(user, 'Pear', 1), (user, 'Apple', -1)])
+
+    threads = [threading.Thread(target=churn, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(basket.get('Pear', 0) for basket in baskets.snapshot_all().values()) == 8 * 2_000
+    assert all('Apple' not in basket for basket in baskets.snapshot_all().values())
+
+
+def test_replace_and_delete_act_only_on_present_fruit():
+    baskets = shards.ShardedBaskets()
+    assert not baskets.replace('ana', 'Apple', 4)
+    assert baskets.snapshot('ana') == {}
+    baskets.increment('ana', 'Apple', 1)
+    assert baskets.replace('ana', 'Apple', 4)
+    assert baskets.delete('ana', 'Apple')
+    assert not baskets.delete('ana', 'Apple')
+
+
+def test_user_basket_has_the_store_api():
+    baskets = shards.ShardedBaskets()
+    basket = baskets.basket('ana')
+    basket.add('Apple', 2)
+    basket['Pear'] = 1
+    assert dict(basket) == {'Apple': 2, 'Pear': 1}
+    assert basket.replace('Pear', 5) and not basket.replace('Kiwi', 1)
+    assert basket.discard('Apple') and not basket.discard('Apple')
+    with pytest.raises(KeyError):
+        del basket['Apple']
+    assert baskets.snapshot_all() == {'ana': {'Pear': 5}}
+
+
+@pytest.mark.parametrize('make', [lambda tmp_path: store.BasketStore(),
+                                  lambda tmp_path: eventlog.BasketLog(str(tmp_path / 'log')),
+                                  lambda tmp_path: shards.ShardedBaskets().basket('ana')])
+def test_every_basket_replaces_and_discards_atomically(make, tmp_path):
+    basket = make(tmp_path)
+    try:
+        assert not basket.replace('Apple', 1)
+        assert 'Apple' not in basket
+        basket.add('Apple', 2)
+        assert basket.replace('Apple', 7)
+        assert basket['Apple'] == 7
+        assert basket.discard('Apple')
+        assert not basket.discard('Apple')
+        assert basket.snapshot() == {}
+    finally:
+        basket.close()
+
+
+# eventlog
+
+def log_files(directory, kind):
+    return sorted(path for path in directory.iterdir() if path.name.startswith(kind))
+
+
+def test_log_recovers_after_a_crash(tmp_path):
+    log = eventlog.BasketLog(str(tmp_path))
+    log.add('Apple', 3)
+    log['Pear'] = 2
+    log.add('Apple', -1)
+    del log['Pear']
+    log.close(snapshot=False)
+
+    log = eventlog.BasketLog(str(tmp_path))
+    assert log.snapshot() == {'Apple': 2}
+    assert log.recovered_events == 4
+    log.close()
+
+
+def test_torn_tail_is_dropped_and_truncated(tmp_path):
+    log = eventlog.BasketLog(str(tmp_path))
+    log.add('Apple', 3)
+    log.add('Pear', 1)
+    log.close(snapshot=False)
+    segment = log_files(tmp_path, 'log')[-1]
+    whole = segment.stat().st_size
+    with open(segment, 'ab') as f:
+        f.write(eventlog._encode(eventlog.ADD, 'Kiwi', 5)[:-2])  # the crash hit mid-write
+
+    log = eventlog.BasketLog(str(tmp_path))
+    assert log.snapshot() == {'Apple': 3, 'Pear': 1}
+    assert segment.stat().st_size == whole
+    log.add('Kiwi', 1)
+    log.close(snapshot=False)
+    assert eventlog.BasketLog(str(tmp_path)).snapshot() == {'Apple': 3, 'Pear': 1, 'Kiwi': 1}
+
+
+def test_corrupt_record_ends_the_log(tmp_path):
+    log = eventlog.BasketLog(str(tmp_path))
+    log.add('Apple', 3)
+    log.add('Pear', 1)
+    log.close(snapshot=False)
+    segment = log_files(tmp_path, 'log')[-1]
+    data = bytearray(segment.read_bytes())
+    data[-1] ^= 0xFF
+    segment.write_bytes(bytes(data))
+
+    assert eventlog.BasketLog(str(tmp_path)).snapshot() == {'Apple': 3}
+
+
+def test_restart_replays_only_the_log_after_the_snapshot(tmp_path):
+    log = eventlog.BasketLog(str(tmp_path), segment_bytes=256)
+    for n in range(200):
+        log.add(f'Fruit{n % 7}', 1)
+    expected = log.snapshot()
+    log.close()
+    assert len(log_files(tmp_path, 'snapshot')) == 1
+
+    log = eventlog.BasketLog(str(tmp_path), segment_bytes=256)
+    assert log.snapshot() == expected
+    assert log.recovered_events == 0
+    log.close()
+
+
+def test_refused_changes_leave_the_basket_unchanged(tmp_path):
+    log = eventlog.BasketLog(str(tmp_path))
+    log.add('Apple', 1)
+    with pytest.raises(ValueError):
+        log.add('x' * 70_000, 1)
+    with pytest.raises(ValueError):
+        log['Apple'] = 2**63
+    assert log.snapshot() == {'Apple': 1}
+    log.close()
+    with pytest.raises(ValueError):
+        log.add('Pear', 1)
+    with pytest.raises(ValueError):
+        log['Apple'] = 5
+    assert log.snapshot() == {'Apple': 1}
+    assert eventlog.BasketLog(str(tmp_path)).snapshot() == {'Apple': 1}
+
+
+def test_snapshot_is_little_endian(tmp_path):
+    log = eventlog.BasketLog(str(tmp_path))
+    log.add('Apple', 258)
+    log.close()
+    data = log_files(tmp_path, 'snapshot')[-1].read_bytes()
+    header = eventlog._SNAPSHOT.size
+    assert data[header:header + 8] == (258).to_bytes(8, 'little')
+
+
+def test_write_error_stops_the_log(tmp_path):
+    log = eventlog.BasketLog(str(tmp_path))
+    log.add('Apple', 1)
+
+    def broken():
+        raise OSError('disk full')
+
+    log._segment = broken
+    with pytest.raises(OSError):
+        log.add('Pear', 1)
+    before = log.snapshot()
+    with pytest.raises(OSError):
+        log.add('Kiwi', 1)
+    with pytest.raises(OSError):
+        log['Apple'] = 5
+    assert log.snapshot() == before
+    with pytest.raises(OSError):
+        log.close()
+    assert not log._writer.is_alive() and not log._compactor.is_alive()
+    assert log._file is None
+    assert eventlog.BasketLog(str(tmp_path)).snapshot() == {'Apple': 1}
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from conftest import load_module
+
+booking_batch = load_module('Pydantic/booking_batch.py')
+Booking, BookingBatch = booking_batch.Booking, booking_batch.BookingBatch
+
+RECORDS = [
+    {'user_id': 1, 'room_id': 10, 'nights': 3, 'rate_per_night': 100.0},
+    {'user_id': 2, 'room_id': 10, 'nights': 0, 'rate_per_night': 80.0},
+    {'user_id': 3, 'room_id': 11, 'nights': 1.5, 'rate_per_night': 90.0},
+    {'user_id': '4', 'room_id': '11', 'nights': '2', 'rate_per_night': '75.5'},
+    {'user_id': 5, 'room_id': 12, 'nights': 2.0, 'rate_per_night': 60},
+    {'user_id': 6, 'room_id': 12, 'nights': '2.5', 'rate_per_night': 60},
+    {'user_id': 7, 'room_id': 10, 'nights': -1, 'rate_per_night': 50.0},
+]
+
+
+def per_row(records):
+    valid, rejected = [], []
+    for n, record in enumerate(records):
+        try:
+            valid.append(Booking(**record))
+        except ValidationError:
+            rejected.append(n)
+    return valid, rejected
+
+
+def test_validate_matches_booking_row_by_row():
+    valid, rejected = BookingBatch.from_records(RECORDS).validate()
+    expected, expected_rejected = per_row(RECORDS)
+    assert rejected.tolist() == expected_rejected
+    assert [valid[n] for n in range(len(valid))] == expected
+
+
+def test_totals_match_booking():
+    valid, _ = BookingBatch.from_records(RECORDS).validate()
+    expected, _ = per_row(RECORDS)
+    assert valid.total_price.tolist() == [booking.total_price for booking in expected]
+    assert valid.revenue() == pytest.approx(sum(booking.total_price for booking in expected))
+
+
+def test_random_batch_matches_booking():
+    batch = booking_batch.random_batch(2_000, seed=1)
+    records = [{column: getattr(batch, column)[n].item() for column in booking_batch.COLUMNS}
+               for n in range(len(batch))]
+    valid, rejected = batch.validate()
+    expected, expected_rejected = per_row(records)
+    assert rejected.tolist() == expected_rejected
+    assert valid.revenue() == pytest.approx(sum(booking.total_price for booking in expected))
+
+
+def test_group_by_room():
+    valid, _ = BookingBatch.from_records(RECORDS).validate()
+    groups = valid.group_by('room_id')
+    assert groups['room_id'].tolist() == [10, 11, 12]
+    assert groups['bookings'].tolist() == [1, 1, 1]
+    assert groups['nights'].tolist() == [3, 2, 2]
+
+
+def test_fractional_id_is_refused():
+    with pytest.raises(ValueError):
+        BookingBatch(user_id=[1.5], room_id=[1], nights=[1], rate_per_night=[1.0])
+
+
+def test_min_nights_comes_from_booking():
+    assert booking_batch.MIN_NIGHTS == 1
+    assert np.array_equal(BookingBatch([1, 2], [1, 1], [0, 1], [1.0, 1.0]).invalid_mask(), [True, False])
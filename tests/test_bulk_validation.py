@@ -0,0 +1,56 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from conftest import load_module
+
+bulk_validation = load_module('Pydantic/bulk_validation.py')
+
+RECORDS = [
+    {'id': 1, 'name': 'Esp32', 'price': 500, 'in_stock': 'True'},
+    {'id': 2, 'name': 'Esp8266', 'price': 'cheap', 'in_stock': 'False'},
+    {'id': '3', 'name': 'Pico', 'price': 400.0, 'in_stock': 1},
+    {'id': 4, 'name': 'Uno', 'in_stock': True},
+    {'id': 5, 'name': None, 'price': 300, 'in_stock': False},
+    'not a record',
+    {'id': 6.5, 'name': 'Nano', 'price': 200, 'in_stock': 'yes'},
+]
+
+
+def per_row(model, records):
+    valid, failed = [], []
+    for line, record in enumerate(records):
+        try:
+            valid.append(model.model_validate(record))
+        except ValidationError:
+            failed.append(line)
+    return valid, failed
+
+
+@pytest.mark.parametrize('as_dict', [False, True])
+def test_validate_many_matches_model_per_row(as_dict):
+    result = bulk_validation.validate_many(bulk_validation.Model, RECORDS, as_dict=as_dict)
+    valid, failed = per_row(bulk_validation.Model, RECORDS)
+    assert [error['line'] for error in result.errors] == failed
+    assert result.valid == ([model.model_dump() for model in valid] if as_dict else valid)
+
+
+def test_jsonl_file_matches_model_per_row(tmp_path):
+    path = tmp_path / 'products.jsonl'
+    lines = [json.dumps(record) for record in RECORDS] + ['{"id": 7, "name": "broken']
+    path.write_text('\n'.join(lines) + '\n')
+    results = list(bulk_validation.validate_file(str(path), bulk_validation.Model, chunk_size=3))
+    valid, failed = per_row(bulk_validation.Model, RECORDS)
+    assert [model for result in results for model in result.valid] == valid
+    # file lines count from 1, and the broken last line fails as well
+    assert [error['line'] for result in results for error in result.errors] == [n + 1 for n in failed] + [len(lines)]
+
+
+def test_csv_file_fills_defaults_like_the_model(tmp_path):
+    path = tmp_path / 'employees.csv'
+    path.write_text('id,name,department,salary\n1,Riya,,20000\n2,Al,IT,30000\n3,Smita,HR,5000\n4,Kapil,Sales,15000\n')
+    results = list(bulk_validation.validate_file(str(path), bulk_validation.Employee, chunk_size=2))
+    valid = [model for result in results for model in result.valid]
+    assert [(employee.id, employee.department) for employee in valid] == [(1, 'General'), (4, 'Sales')]
+    assert [error['line'] for result in results for error in result.errors] == [3, 4]
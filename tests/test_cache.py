@@ -0,0 +1,172 @@
+import threading
+import time
+
+import pytest
+
+from conftest import load_module
+
+cache_return = load_module('Decorator/cache_return.py')
+Cache, cache, make_key = cache_return.Cache, cache_return.cache, cache_return.make_key
+
+
+def fill(store, count, value=lambda n: n):
+    for n in range(count):
+        key, hashvalue = make_key((n,), {})
+        store.set(key, hashvalue, value(n))
+
+
+@pytest.mark.parametrize('maxsize', [1, 3, 4, 5, 8, 13, 100])
+@pytest.mark.parametrize('stripes', [1, 8, 64])
+def test_maxsize_is_never_exceeded(maxsize, stripes):
+    store = Cache(maxsize=maxsize, stripes=stripes)
+    fill(store, maxsize * 10)
+    assert store.info().currsize <= maxsize
+    assert len(store.stripes) <= maxsize
+
+
+def test_strided_int_keys_use_the_whole_cache():
+    # hash(n) == n, so keys 8 apart all share their low three bits
+    @cache(maxsize=1024)
+    def same(n):
+        return n
+
+    for n in range(0, 200 * 8, 8):
+        same(n)
+    info = same.cache_info()
+    assert info.currsize == 200
+    assert info.evictions == 0
+
+
+def test_maxsize_counts_every_stripe():
+    @cache(maxsize=2)
+    def same(n):
+        return n
+
+    same(0), same(2)
+    assert same.cache_info().currsize == 2
+    same(4)
+    assert same.cache_info().currsize == 2
+    assert same.cache_info().evictions == 1
+
+
+def test_value_within_max_bytes_is_cached():
+    store = Cache(max_bytes=1000, stripes=8, sizeof=lambda value: value)
+    key, hashvalue = make_key(('big',), {})
+    store.set(key, hashvalue, 900)
+    assert store.get(key, hashvalue) == 900
+
+
+def test_max_bytes_below_stripes_still_caches():
+    store = Cache(max_bytes=4, stripes=8, sizeof=lambda value: 1)
+    fill(store, 10)
+    info = store.info()
+    assert info.currsize == 4
+    assert info.currbytes == 4
+
+
+def test_max_bytes_is_never_exceeded():
+    store = Cache(max_bytes=100, sizeof=lambda value: value)
+    fill(store, 50, value=lambda n: n % 30)
+    assert store.info().currbytes <= 100
+
+
+def test_value_over_max_bytes_is_not_cached():
+    store = Cache(max_bytes=10, sizeof=lambda value: value)
+    key, hashvalue = make_key(('big',), {})
+    store.set(key, hashvalue, 11)
+    assert store.get(key, hashvalue) is cache_return._MISSING
+
+
+def test_lru_evicts_least_recently_used():
+    calls = []
+
+    @cache(maxsize=2, stripes=1)
+    def double(n):
+        calls.append(n)
+        return n * 2
+
+    double(1), double(2), double(1), double(3)
+    double(1)
+    double(2)
+    assert calls == [1, 2, 3, 2]
+
+
+def test_list_and_tuple_arguments_are_distinct_keys():
+    calls = []
+
+    @cache
+    def first(value):
+        calls.append(value)
+        return value[0]
+
+    first([1, 2])
+    first((1, 2))
+    first([1, 2])
+    assert calls == [[1, 2], (1, 2)]
+
+
+def test_string_tags_do_not_collide():
+    calls = []
+
+    @cache
+    def echo(*args):
+        calls.append(args)
+        return args
+
+    assert echo([1, 2]) == ([1, 2],)
+    assert echo('tuple', (('list', (1, 2)),)) == ('tuple', (('list', (1, 2)),))
+    assert echo('list', (1, 2), []) == ('list', (1, 2), [])
+    assert echo(('list', (1, 2)), []) == (('list', (1, 2)), [])
+    assert len(calls) == 4
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_concurrent_misses_share_one_call():
+    calls = []
+    release = threading.Event()
+
+    @cache
+    def slow(n):
+        calls.append(n)
+        release.wait(5)
+        return n * 2
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(slow(21))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    wait_until(lambda: slow.cache_info().coalesced == 7)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert calls == [21]
+    assert results == [42] * 8
+    assert slow.cache_info().misses == 1
+
+
+def test_stale_value_is_served_while_one_refresh_runs():
+    calls = []
+    release = threading.Event()
+
+    @cache(ttl=0.2, stale_ttl=60)
+    def version(key):
+        calls.append(key)
+        if len(calls) > 1:
+            release.wait(5)
+        return len(calls)
+
+    assert version('a') == 1
+    time.sleep(0.3)
+    # the refresh is held up, yet every caller gets the stale value at once
+    assert [version('a') for _ in range(5)] == [1] * 5
+    wait_until(lambda: len(calls) == 2)
+    release.set()
+    wait_until(lambda: version('a') == 2)
+    assert calls == ['a', 'a']
+    assert version.cache_info().stale_hits >= 5
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from conftest import load_module
+
+debugging_calls = load_module('Decorator/debugging_calls.py')
+
+
+def traced(**options):
+    tracer = debugging_calls.Tracer(maxstring=20, maxother=20)
+
+    @debugging_calls.debugging(tracer=tracer, **options)
+    def call(*args, **kwargs):
+        pass
+
+    return call, tracer
+
+
+def test_every_argument_is_a_bounded_repr():
+    call, tracer = traced()
+    frame = pd.DataFrame({'salary': range(1000)})
+    call(frame, 'x' * 1000, 7 ** 10_000, data=b'y' * 1000)
+    arguments = tracer.calls[-1][3]
+    assert arguments.lstrip().startswith('sal')
+    assert 'object at 0x' not in arguments
+    assert '<int of ' in arguments
+    assert len(arguments) < 200
+
+
+def test_arguments_are_shown_as_passed():
+    call, tracer = traced()
+    values = [1, 2]
+    call(values)
+    values.append(3)
+    assert tracer.calls[-1][3] == '[1, 2]'
+
+
+def test_sampling_records_one_call_in_every():
+    call, tracer = traced(sample_rate=0.25)
+    for _ in range(8):
+        call()
+    assert len(tracer.calls) == 2
+
+
+@pytest.mark.parametrize('sample_rate', [0, -1, 2])
+def test_sample_rate_outside_zero_to_one_is_refused(sample_rate):
+    with pytest.raises(ValueError):
+        traced(sample_rate=sample_rate)
@@ -0,0 +1,122 @@
+import threading
+import time
+
+from conftest import load_module
+
+disk_cache = load_module('Decorator/disk_cache.py')
+cache_return = load_module('Decorator/cache_return.py')
+DiskCache, cache = disk_cache.DiskCache, cache_return.cache
+
+
+class Raw:
+    # stores bytes as they are, so sizes are exact
+    dumps = staticmethod(lambda value: value)
+    loads = staticmethod(lambda data: data)
+
+
+def total_bytes(disk):
+    conn = disk.connection()
+    return conn.execute("SELECT value FROM meta WHERE name = 'total_bytes'").fetchone()[0]
+
+
+def test_round_trip(tmp_path):
+    disk = DiskCache(str(tmp_path / 'cache.db'))
+    key = disk.key('ns', (1, [2, 3]), {'b': {'x': 1}, 'a': None})
+    assert key == disk.key('ns', (1, [2, 3]), {'a': None, 'b': {'x': 1}})
+    assert disk.get(key) == (False, None)
+    disk.set(key, {'rows': [1, 2, 3]})
+    assert disk.get(key) == (True, {'rows': [1, 2, 3]})
+    assert disk.info()['entries'] == 1
+
+
+def test_expired_entries_are_misses(tmp_path):
+    disk = DiskCache(str(tmp_path / 'cache.db'))
+    disk.set('old', 1, ttl=0)
+    disk.set('new', 2, ttl=60)
+    assert disk.get('old') == (False, None)
+    found, value, expires_at = disk.lookup('new')
+    assert (found, value) == (True, 2)
+    assert 59 < expires_at - time.time() <= 60
+
+
+def test_least_recently_used_is_evicted_at_the_limit(tmp_path):
+    disk = DiskCache(str(tmp_path / 'cache.db'), max_bytes=250, serializer=Raw, touch_interval=0)
+    disk.set('a', b'a' * 100)
+    time.sleep(0.01)
+    disk.set('b', b'b' * 100)
+    time.sleep(0.01)
+    assert disk.get('a')[0]
+    time.sleep(0.01)
+    disk.set('c', b'c' * 100)
+    assert [disk.get(key)[0] for key in 'abc'] == [True, False, True]
+    assert disk.info()['bytes'] == total_bytes(disk) == 200
+    disk.set('big', b'x' * 251)
+    assert not disk.get('big')[0]
+
+
+def test_entries_survive_a_new_instance(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    DiskCache(path).set('answer', 42, ttl=60)
+    reopened = DiskCache(path)
+    assert reopened.get('answer') == (True, 42)
+    assert total_bytes(reopened) == reopened.info()['bytes']
+
+
+def test_concurrent_writers_keep_the_byte_total(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    disks = [DiskCache(path, serializer=Raw), DiskCache(path, serializer=Raw)]
+    start = threading.Barrier(2)
+
+    def write(disk, fill):
+        start.wait()
+        for n in range(200):
+            disk.set(f'key{n % 50}', fill * (n + 1))
+
+    threads = [threading.Thread(target=write, args=(disk, fill)) for disk, fill in zip(disks, (b'a', b'b'))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert disks[0].info()['entries'] == 50
+    assert total_bytes(disks[0]) == disks[1].info()['bytes']
+
+
+def make_cached(disk, ttl, stale_ttl=None):
+    # a fresh memory tier over the same disk namespace, as after a restart
+    calls = []
+
+    @cache(ttl=ttl, stale_ttl=stale_ttl, disk=disk)
+    def version(key):
+        calls.append(key)
+        return len(calls)
+
+    return version, calls
+
+
+def test_disk_hit_keeps_its_remaining_ttl(tmp_path):
+    disk = DiskCache(str(tmp_path / 'cache.db'))
+    first, _ = make_cached(disk, ttl=0.5)
+    assert first('a') == 1
+    time.sleep(0.3)
+    second, calls = make_cached(disk, ttl=0.5)
+    assert second('a') == 1
+    assert calls == []
+    time.sleep(0.35)
+    # a full ttl from the disk hit would still be serving the old value here
+    assert second('a') == 1
+    assert calls == ['a']
+
+
+def test_stale_refresh_calls_the_function(tmp_path):
+    disk = DiskCache(str(tmp_path / 'cache.db'))
+    version, calls = make_cached(disk, ttl=0.2, stale_ttl=60)
+    assert version('a') == 1
+    time.sleep(0.3)
+    assert version('a') == 1
+    deadline = time.monotonic() + 5
+    while version('a') != 2:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+    assert calls == ['a', 'a']
+    restarted, _ = make_cached(disk, ttl=0.2, stale_ttl=60)
+    assert restarted('a') == 2
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from conftest import load_module
+
+exams = load_module('Quiz/exams.py')
+
+
+class Bank:
+    # the part of QuestionStore that exam_questions reads
+    def __init__(self, questions):
+        self.questions = questions
+
+    def get_many(self, question_ids):
+        return {int(question_id): self.questions[int(question_id)] for question_id in question_ids}
+
+
+STRATA = {'capitals': np.arange(1, 11), 'currency': np.arange(11, 16)}
+
+
+def test_exam_is_the_same_alone_or_in_a_batch():
+    batch = exams.generate_exams(STRATA, 4, exams=50, seed=7)
+    alone = exams.generate_exams(STRATA, 4, exams=1, seed=7, first=31)
+    assert (alone.question_ids[0] == batch.question_ids[31]).all()
+    assert (alone.permutations[0] == batch.permutations[31]).all()
+
+
+def test_every_option_is_shown_and_the_correct_label_points_at_it():
+    bank = Bank({n: (f'Q{n}', [f'right{n}', 'x', 'y'][:2 + n % 2]) for n in range(1, 16)})
+    batch = exams.generate_exams(STRATA, 5, exams=3, seed=1)
+    for question, labeled, correct in exams.exam_questions(bank, batch, 2):
+        n = int(question[1:])
+        assert sorted(option for _, option in labeled) == sorted(bank.questions[n][1])
+        assert dict(labeled)[correct] == f'right{n}'
+
+
+def test_options_wider_than_the_batch_are_refused():
+    bank = Bank({n: (f'Q{n}', ['a', 'b', 'c', 'd', 'e']) for n in range(1, 16)})
+    batch = exams.generate_exams(STRATA, 3, exams=1, seed=1, options=4)
+    with pytest.raises(ValueError, match='5 options'):
+        exams.exam_questions(bank, batch, 0)
+    wide = exams.generate_exams(STRATA, 3, exams=1, seed=1, options=5)
+    assert all(len(labeled) == 5 for _, labeled, _ in exams.exam_questions(bank, wide, 0))
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field, field_validator
+
+from conftest import load_module
+
+frame_validation = load_module('Pydantic/frame_validation.py')
+
+
+def test_random_frame_matches_employee_per_row():
+    frame = frame_validation.random_employees(3_000, seed=4)
+    result = frame_validation.validate_frame(frame)
+    assert (result.valid == frame_validation.validate_rows(frame)).all()
+    assert not result.valid.all() and result.valid.any()
+
+
+def test_edge_cells_match_employee_per_row():
+    frame = pd.DataFrame({
+        'id': [1, 2, 3, 4, 5, 6],
+        'name': ['Riya', 'Al', None, 'Smita', 'X' * 51, 'Kapil'],
+        'department': [None, 'IT', 'HR', np.nan, 'Sales', 'Ops'],
+        'salary': [10_000, 20_000.5, 30_000, 9_999.99, 15_000, np.nan],
+    })
+    result = frame_validation.validate_frame(frame)
+    assert result.valid.tolist() == frame_validation.validate_rows(frame).tolist()
+    assert result.valid.tolist() == [True, False, False, False, False, False]
+    assert result.data['department'].tolist()[0] == 'General'
+    assert result.field_errors['salary'].tolist() == [False, False, False, True, False, True]
+
+
+class Product(BaseModel):
+    id: int
+    name: str = Field(min_length=2)
+    price: float = Field(gt=0)
+
+    @field_validator('name')
+    @classmethod
+    def no_test_products(cls, name):
+        if name.startswith('test'):
+            raise ValueError('test product')
+        return name
+
+
+def test_custom_validators_are_honoured():
+    frame = pd.DataFrame({'id': [1, 2, 3, 4], 'name': ['Pico', 'test board', 'U', 'Nano'],
+                          'price': [4.0, 5.0, 6.0, 0.0]})
+    result = frame_validation.validate_frame(frame, Product)
+    assert result.valid.tolist() == frame_validation.validate_rows(frame, Product).tolist()
+    assert result.valid.tolist() == [True, False, False, False]
@@ -0,0 +1,64 @@
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+
+from app.models import ProductRow
+from app.pricing import PriceIndex, price_carts
+
+PRODUCTS = [
+    ProductRow(id=1, name='Apple', price=Decimal('0.35'), updated_at=datetime(2024, 1, 1)),
+    ProductRow(id=2, name='Pear', price=Decimal('1.10'), updated_at=datetime(2024, 1, 1)),
+    ProductRow(id=3, name='Kiwi', price=None, updated_at=datetime(2024, 1, 1)),
+    ProductRow(id=5, name='Apple', price=Decimal('9.99'), updated_at=datetime(2024, 1, 2)),
+]
+
+
+def per_item(products, carts):
+    # a price dict and one lookup per item; the lowest id wins a repeated name
+    price = {}
+    for row in sorted(products, key=lambda row: row.id):
+        price.setdefault(row.name, row.price)
+    totals, unpriced = [], []
+    for cart in carts:
+        items = cart['items']
+        totals.append(sum((price[name] for name in items if price.get(name) is not None), Decimal(0)))
+        unpriced.append(sum(1 for name in items if price.get(name) is None))
+    return totals, unpriced
+
+
+def test_batch_totals_match_per_item_lookup():
+    rng = np.random.default_rng(0)
+    names = ['Apple', 'Pear', 'Kiwi', 'Mango']
+    carts = [{'user_id': n, 'items': [names[i] for i in rng.integers(0, len(names), rng.integers(0, 6))]}
+             for n in range(300)]
+    priced = price_carts(PriceIndex.from_rows(PRODUCTS), carts)
+    totals, unpriced = per_item(PRODUCTS, carts)
+    assert priced.totals == totals
+    assert priced.unpriced.tolist() == unpriced
+    assert priced.item_counts.tolist() == [len(cart['items']) for cart in carts]
+    for n, cart in enumerate(carts):
+        assert priced.unpriced_items(n) == [name for name in cart['items'] if name in ('Kiwi', 'Mango')]
+
+
+def test_updated_index_matches_a_fresh_one():
+    index = PriceIndex.from_rows(PRODUCTS)
+    changes = [ProductRow(id=2, name='Pear', price=Decimal('0.99'), updated_at=datetime(2024, 1, 3)),
+               ProductRow(id=4, name='Kiwi', price=Decimal('2.00'), updated_at=datetime(2024, 1, 3)),
+               ProductRow(id=0, name='Pear', price=Decimal('5.00'), updated_at=datetime(2024, 1, 3))]
+    updated = index.updated(changes)
+    rows = {row.id: row for row in PRODUCTS}
+    rows.update({row.id: row for row in changes})
+    fresh = PriceIndex.from_rows(rows.values())
+    carts = [{'items': ['Apple', 'Pear', 'Kiwi']}, {'items': []}]
+    assert updated.version == index.version + 1
+    assert price_carts(updated, carts).totals == price_carts(fresh, carts).totals == [
+        Decimal('5.35'), Decimal('0')]
+    assert updated.watermark == datetime(2024, 1, 3)
+
+
+def test_unchanged_rows_only_move_the_watermark():
+    index = PriceIndex.from_rows(PRODUCTS)
+    same = index.updated([PRODUCTS[0].model_copy(update={'updated_at': datetime(2024, 2, 1)})])
+    assert same.version == index.version
+    assert same.watermark == datetime(2024, 2, 1)
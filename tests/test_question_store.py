@@ -0,0 +1,36 @@
+from conftest import load_module
+
+store = load_module('Quiz/store.py')
+
+SEED = {
+    'What is the capital of Australia?': ['Canberra', 'Sydney', 'Melbourne', 'Brisbane'],
+    'What is the currency of Japan?': ['Yen', 'Won', 'Dollar', 'Ruble'],
+}
+
+
+def test_seed_goes_in_once(tmp_path):
+    path = str(tmp_path / 'questions.db')
+    bank = store.QuestionStore(path, seed=SEED)
+    assert dict(bank.items()) == SEED
+    for question in list(bank):
+        del bank[question]
+    bank.close()
+
+    bank = store.QuestionStore(path, seed=SEED)
+    assert len(bank) == 0
+
+
+def test_bank_saved_before_meta_is_not_reseeded(tmp_path):
+    path = str(tmp_path / 'questions.db')
+    bank = store.QuestionStore(path)
+    bank.add('Which planet is largest?', ['Jupiter', 'Saturn', 'Earth', 'Mars'])
+    bank.conn.execute("DROP TABLE meta")
+    bank.close()
+
+    bank = store.QuestionStore(path, seed=SEED)
+    assert list(bank) == ['Which planet is largest?']
+
+
+def test_importing_data_does_not_open_the_store():
+    data = load_module('Quiz/data.py')
+    assert data._bank is None
@@ -0,0 +1,36 @@
+import asyncio
+
+from conftest import load_module
+
+server = load_module('Quiz/server.py')
+
+QUESTIONS = (('What is the capital of Australia?', ['Canberra', 'Sydney', 'Melbourne', 'Brisbane']),)
+
+
+async def talk(questions, *lines):
+    quiz = server.QuizServer(questions)
+    port = await quiz.start(port=0)
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        for line in lines:
+            writer.write(line)
+        await writer.drain()
+        return (await asyncio.wait_for(reader.read(), 5)).decode(), quiz
+    finally:
+        writer.close()
+        await quiz.close()
+
+
+def test_empty_bank_is_reported():
+    text, quiz = asyncio.run(talk(()))
+    assert text == "There are no questions in the bank yet\n"
+    assert quiz.active == 0
+
+
+def test_over_long_line_is_refused_and_the_quiz_goes_on():
+    answers = [b'x' * 100_000 + b'\n', b'z\n'] + [f'{label}\n'.encode() for label in 'abcd']
+    text, quiz = asyncio.run(talk(QUESTIONS, *answers))
+    assert "Please answer with one letter" in text
+    assert "Please enter from the following a, b, c, d" in text
+    assert "Quiz complete Final score:" in text
+    assert quiz.completed == 1
@@ -0,0 +1,34 @@
+import html
+import io
+
+import pytest
+
+from conftest import load_module
+
+render = load_module('String/render.py')
+
+
+def test_profile_matches_escaping_value_by_value():
+    subjects = {'Maths': '90', 'Art & Design': '75', 'C++ <intro>': '"A"', 'Null\0byte': "it's"}
+    out = io.StringIO()
+    render.write_profile(out, 'Riya', '<Devaliya>', 21, subjects, batch=3)
+    escaped = {html.escape(sub): html.escape(mark) for sub, mark in subjects.items()}
+    assert out.getvalue() == render.fstring_style('Riya', '&lt;Devaliya&gt;', 21, escaped)
+
+
+@pytest.mark.parametrize('field', ['class', 'rows', 'render', 'values', 'zip', '_escape', '_escape_rows', '_v0'])
+def test_any_identifier_is_a_field(field):
+    page = render.compile_template(f'<p>{{{field}}}</p>')
+    assert page(**{field: '<b>'}) == '<p>&lt;b&gt;</p>'
+    rows = render.compile_rows(f'<li>{{{field}}}:{{mark}}</li>', (field, 'mark'))
+    assert rows([('<a>', 1), ('b', 2)]) == '<li>&lt;a&gt;:1</li>\n<li>b:2</li>'
+
+
+def test_fields_must_match_the_template():
+    page = render.compile_template('<p>{first} {last}</p>')
+    with pytest.raises(TypeError):
+        page(first='a')
+    with pytest.raises(TypeError):
+        page(first='a', lats='b')
+    with pytest.raises(ValueError):
+        render.compile_template('{a.b}')
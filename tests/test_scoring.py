@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from conftest import load_module
+
+scoring = load_module('Quiz/scoring.py')
+
+
+def sheet_by_sheet(sheets, options=4):
+    # the report worked out with plain loops, one sheet at a time
+    takers, questions = sheets.shape
+    scores = [sum(int(answer == 0) for answer in sheet) for sheet in sheets]
+    difficulty = [sum(int(sheet[q] == 0) for sheet in sheets) / takers for q in range(questions)]
+    discrimination = []
+    for q in range(questions):
+        item = [int(sheet[q] == 0) for sheet in sheets]
+        rest = [score - right for score, right in zip(scores, item)]
+        discrimination.append(np.corrcoef(item, rest)[0, 1])
+    choices = [[sum(int(sheet[q] == choice) for sheet in sheets) / takers for choice in range(-1, options)]
+               for q in range(questions)]
+    return scores, difficulty, discrimination, choices
+
+
+@pytest.fixture
+def sheets():
+    return scoring.simulate_sheets(500, 8, seed=3)
+
+
+def test_chunked_report_matches_sheet_by_sheet(sheets):
+    analysis = scoring.ItemAnalysis(8)
+    scores = np.concatenate([analysis.update(sheets[start:start + 64]) for start in range(0, len(sheets), 64)])
+    report = analysis.report()
+    expected_scores, difficulty, discrimination, choices = sheet_by_sheet(sheets)
+    assert scores.tolist() == expected_scores
+    assert report['difficulty'] == pytest.approx(difficulty)
+    assert report['discrimination'] == pytest.approx(discrimination)
+    assert report['choices'] == pytest.approx(np.array(choices))
+    assert report['mean_score'] == pytest.approx(np.mean(expected_scores))
+
+
+def test_csv_and_npy_files_grade_the_same(sheets, tmp_path):
+    npy = str(tmp_path / 'sheets.npy')
+    csv = str(tmp_path / 'sheets.csv')
+    np.save(npy, sheets)
+    with open(csv, 'w') as f:
+        for sheet in sheets:
+            f.write(','.join('' if answer == -1 else str(answer) for answer in sheet) + '\n')
+
+    from_npy = scoring.score_file(npy, 8, chunk_rows=100).report()
+    from_csv = scoring.score_file(csv, 8, chunk_rows=100).report()
+    assert from_csv['takers'] == len(sheets)
+    assert from_csv['score_distribution'].tolist() == from_npy['score_distribution'].tolist()
+    assert from_csv['choices'] == pytest.approx(from_npy['choices'])
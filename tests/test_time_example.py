@@ -0,0 +1,91 @@
+import json
+import threading
+
+import pytest
+
+from conftest import load_module
+
+time_example = load_module('Decorator/time_example.py')
+
+
+class Clock:
+    # stands in for perf_counter_ns; timed functions move it forward themselves
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(time_example, 'perf_counter_ns', clock)
+    return clock
+
+
+def timed(clock, **options):
+    profiler = time_example.Profiler()
+
+    @time_example.timer(name='work', profiler=profiler, **options)
+    def work(ns):
+        clock.now += ns
+
+    return work, profiler
+
+
+def test_count_total_and_percentiles(clock):
+    work, profiler = timed(clock)
+    for us in range(1, 101):
+        work(us * 1000)
+    stats = profiler.snapshot()['work']
+    assert (stats.calls, stats.count) == (100, 100)
+    assert stats.total == stats.exclusive == stats.elapsed == 5050 * 1000
+    assert (stats.min, stats.max) == (1000, 100_000)
+    for pct in (50, 90, 99):
+        assert stats.percentile(pct) == pytest.approx(pct * 1000, rel=1 / 16)
+
+
+def test_sampling_times_one_call_in_every_and_scales_the_total(clock):
+    work, profiler = timed(clock, sample_rate=0.1)
+    for _ in range(100):
+        work(1000)
+    stats = profiler.snapshot()['work']
+    assert (stats.calls, stats.count) == (100, 10)
+    row, = json.loads(profiler.report('json'))
+    assert row['total_ms'] == 0.1
+    assert row['mean_us'] == 1.0
+
+
+@pytest.mark.parametrize('sample_rate', [0, -0.5, 1.5])
+def test_sample_rate_outside_zero_to_one_is_refused(sample_rate):
+    with pytest.raises(ValueError):
+        time_example.timer(lambda: None, sample_rate=sample_rate)
+
+
+def test_recursion_counts_inclusive_time_once(clock):
+    profiler = time_example.Profiler()
+
+    @time_example.timer(name='factorial', profiler=profiler)
+    def factorial(n):
+        clock.now += 10
+        return n * factorial(n - 1) if n else 1
+
+    assert factorial(4) == 24
+    stats = profiler.snapshot()['factorial']
+    assert stats.count == 5
+    assert stats.total == 50
+    assert stats.exclusive == 50
+    assert stats.elapsed == 50 + 40 + 30 + 20 + 10
+
+
+def test_exited_threads_are_merged(clock):
+    work, profiler = timed(clock)
+    for _ in range(20):
+        thread = threading.Thread(target=work, args=(1000,))
+        thread.start()
+        thread.join()
+    assert len(profiler.thread_stats) <= 1
+    stats = profiler.snapshot()['work']
+    assert profiler.thread_stats == {}
+    assert (stats.calls, stats.total) == (20, 20_000)